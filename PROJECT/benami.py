@@ -0,0 +1,117 @@
+# benami.py
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+FARMER_ID_COLUMNS = {"phone_no": "phone", "aadhar_no": "aadhar"}  # column -> identifier namespace
+
+
+def _clean(values):
+    """Identifier values as stripped strings, NaN where missing."""
+    values = pd.Series(values)
+    if values.dtype.kind == "f":  # numbers read with NaNs, e.g. 9.25e9 -> "9252716854"
+        values = values.astype("Int64")
+    values = values.astype(object).astype(str).str.strip()
+    return values.where(~values.isin(["", "nan", "None", "NaN"]))
+
+
+def _members(ids, labels, n_clusters):
+    """List of ids per cluster label 0..n_clusters-1 (one sort, no groupby)."""
+    if n_clusters == 0:
+        return []
+    inside = labels >= 0
+    order = np.argsort(labels[inside], kind="stable")
+    counts = np.bincount(labels[inside], minlength=n_clusters)
+    return [list(chunk) for chunk in np.split(ids[inside][order], np.cumsum(counts)[:-1])]
+
+
+def find_identity_clusters(farmers_df, relations_df=None, dealers_df=None, progress=None):
+    """
+    Benami detection: connected components over shared identifiers.
+
+    Builds one undirected graph whose nodes are farmers, dealers and
+    identifier values (phone numbers, aadhar numbers), with an edge from every
+    farmer/dealer to each identifier it carries. Farmers and dealers share the
+    aadhar namespace, so a dealer_aadhar equal to a farmer's aadhar links them.
+    Components come from scipy's sparse connected_components, near-linear in
+    the number of edges, so farmers linked transitively (A shares a phone
+    with B, B shares an aadhar with C) end up in the same cluster.
+
+    Returns {
+        "labels": cluster_id per farmers_df row (-1 when not suspicious),
+        "clusters": DataFrame(cluster_id, farmer_count, dealer_count,
+                              farmer_ids, dealer_ids), largest first
+    }
+    A cluster is suspicious when it holds 2+ farmers, or a farmer and a dealer.
+    `progress(fraction, message)` is called between the steps.
+    """
+    n_farmers = len(farmers_df)
+    farmer_ids = farmers_df["farmer_id"].to_numpy()
+
+    # Dealer identities: (dealer_id, aadhar) pairs from relations and registry
+    dealer_pairs = []
+    if relations_df is not None and {"dealer_id", "dealer_aadhar"} <= set(relations_df.columns):
+        dealer_pairs.append(relations_df[["dealer_id", "dealer_aadhar"]].set_axis(["dealer_id", "aadhar"], axis=1))
+    if dealers_df is not None and {"dealer_id", "aadhar_no"} <= set(dealers_df.columns):
+        dealer_pairs.append(dealers_df[["dealer_id", "aadhar_no"]].set_axis(["dealer_id", "aadhar"], axis=1))
+    if dealer_pairs:
+        dealer_pairs = pd.concat(dealer_pairs, ignore_index=True).drop_duplicates()
+        dealer_codes, dealer_ids = pd.factorize(dealer_pairs["dealer_id"])
+        dealer_aadhar = _clean(dealer_pairs["aadhar"].to_numpy())
+    else:
+        dealer_codes, dealer_ids = np.array([], dtype=np.int64), np.array([], dtype=object)
+        dealer_aadhar = _clean([])
+    n_dealers = len(dealer_ids)
+
+    # Edges entity -> identifier node, one namespace at a time
+    src, dst = [], []
+    next_node = n_farmers + n_dealers
+    for col, namespace in FARMER_ID_COLUMNS.items():
+        if col not in farmers_df.columns:
+            continue
+        farmer_values = _clean(farmers_df[col].to_numpy())
+        if namespace == "aadhar":
+            values = pd.concat([farmer_values, dealer_aadhar], ignore_index=True)
+            owners = np.concatenate([np.arange(n_farmers), n_farmers + dealer_codes])
+        else:
+            values = farmer_values
+            owners = np.arange(n_farmers)
+        codes, uniques = pd.factorize(values)
+        present = codes >= 0
+        src.append(owners[present])
+        dst.append(next_node + codes[present])
+        next_node += len(uniques)
+
+    src = np.concatenate(src) if src else np.array([], dtype=np.int64)
+    dst = np.concatenate(dst) if dst else np.array([], dtype=np.int64)
+    if progress is not None:
+        progress(0.4, "Linking shared identities")
+    graph = coo_matrix((np.ones(len(src), dtype=np.int8), (src, dst)), shape=(next_node, next_node)).tocsr()
+    _, components = connected_components(graph, directed=False)
+
+    if progress is not None:
+        progress(0.8, "Collecting clusters")
+    farmer_comp = components[:n_farmers]
+    dealer_comp = components[n_farmers:n_farmers + n_dealers]
+    farmer_count = np.bincount(farmer_comp, minlength=next_node)
+    dealer_count = np.bincount(dealer_comp, minlength=next_node)
+    suspicious = (farmer_count >= 2) | ((farmer_count >= 1) & (dealer_count >= 1))
+
+    # Renumber suspicious components 0..k-1, largest first
+    comps = np.flatnonzero(suspicious)
+    comps = comps[np.argsort(-(farmer_count[comps] + dealer_count[comps]), kind="stable")]
+    relabel = np.full(next_node, -1, dtype=np.int64)
+    relabel[comps] = np.arange(len(comps))
+    labels = relabel[farmer_comp]
+
+    clusters = pd.DataFrame({
+        "cluster_id": np.arange(len(comps)),
+        "farmer_count": farmer_count[comps],
+        "dealer_count": dealer_count[comps],
+        "farmer_ids": _members(farmer_ids, labels, len(comps)),
+        "dealer_ids": _members(np.asarray(dealer_ids), relabel[dealer_comp], len(comps)),
+    })
+
+    return {"labels": labels, "clusters": clusters}
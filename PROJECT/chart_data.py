@@ -0,0 +1,105 @@
+# chart_data.py
+
+import numpy as np
+import pandas as pd
+
+from farmer_index import lookup_farmer_columns
+from velocity import DATE_COLUMNS
+
+HIGH_RISK_KG_PER_ACRE = 1500  # Same cutoff as the dashboard's high-risk table
+MAX_SCATTER_POINTS = 5_000    # Points sent to the browser for the scatter view
+MAX_BARS = 25                 # Categories shown per bar chart (largest first)
+HIST_BINS = 60
+
+
+def enrich_transactions(transactions_df, farmers_df):
+    """Transactions plus land, village, crop, kg/acre and month (indexed lookup, no merge)."""
+    looked_up = lookup_farmer_columns(transactions_df, farmers_df, ("land_size_acres", "village", "kharif_crop"))
+    claimed = transactions_df["claimed_fertiliser_qty_kg"].to_numpy(dtype="float64")
+    land = looked_up.get("land_size_acres", np.full(len(claimed), np.nan)).astype("float64")
+
+    frame = pd.DataFrame({
+        "dealer_id": transactions_df["dealer_id"].to_numpy() if "dealer_id" in transactions_df.columns else None,
+        "village": looked_up.get("village"),
+        "crop": looked_up.get("kharif_crop"),
+        "claimed_kg": claimed,
+        "land_size_acres": land,
+    })
+    with np.errstate(divide="ignore", invalid="ignore"):
+        frame["kg_per_acre"] = claimed / land
+    frame["high_risk"] = frame["kg_per_acre"] > HIGH_RISK_KG_PER_ACRE
+
+    date_col = next((c for c in DATE_COLUMNS if c in transactions_df.columns), None)
+    if date_col is not None:
+        frame["month"] = pd.to_datetime(transactions_df[date_col], errors="coerce").dt.to_period("M").dt.to_timestamp().to_numpy()
+    return frame
+
+
+def aggregate_by(frame, key, limit=MAX_BARS):
+    """Transactions, total kg, mean kg/acre and high-risk count per `key`, largest first."""
+    if key not in frame.columns or frame[key].isna().all():
+        return pd.DataFrame()
+    finite = frame["kg_per_acre"].where(np.isfinite(frame["kg_per_acre"]))
+    grouped = (
+        frame.assign(kg_per_acre=finite)
+        .groupby(key, observed=True, sort=False)
+        .agg(transactions=("claimed_kg", "size"), total_kg=("claimed_kg", "sum"),
+             mean_kg_per_acre=("kg_per_acre", "mean"), high_risk=("high_risk", "sum"))
+        .reset_index()
+    )
+    if key == "month":
+        return grouped.sort_values("month").reset_index(drop=True)
+    grouped = grouped.sort_values("total_kg", ascending=False, kind="stable")
+    return grouped.head(limit).reset_index(drop=True) if limit else grouped.reset_index(drop=True)
+
+
+def histogram(values, bins=HIST_BINS, log=True):
+    """Server-side histogram: (bin left edge, bin right edge, count) for finite positive values."""
+    values = np.asarray(values, dtype="float64")
+    values = values[np.isfinite(values) & ((values > 0) if log else True)]
+    if len(values) == 0:
+        return pd.DataFrame(columns=["left", "right", "count"])
+    if log:
+        edges = np.geomspace(values.min(), values.max() * (1 + 1e-9), bins + 1)
+    else:
+        edges = np.linspace(values.min(), values.max(), bins + 1)
+    counts, edges = np.histogram(values, bins=edges)
+    return pd.DataFrame({"left": edges[:-1], "right": edges[1:], "count": counts})
+
+
+def downsample_points(frame, x, y, max_points=MAX_SCATTER_POINTS, keep_top=None, seed=0):
+    """
+    At most `max_points` rows for a scatter plot.
+
+    The `keep_top` highest-y rows (default: a fifth of the budget) are always
+    kept so outliers stay visible; the rest is a uniform random sample.
+    Returns (points, total rows) so the chart can say what was dropped.
+    """
+    points = frame[[c for c in frame.columns if c in (x, y, "dealer_id", "village", "high_risk")]]
+    points = points[np.isfinite(points[x]) & np.isfinite(points[y])]
+    total = len(points)
+    if total <= max_points:
+        return points.reset_index(drop=True), total
+
+    keep_top = max_points // 5 if keep_top is None else keep_top
+    yv = points[y].to_numpy()
+    top = np.argpartition(-yv, keep_top - 1)[:keep_top] if keep_top else np.array([], dtype=np.int64)
+    rest = np.setdiff1d(np.arange(total), top, assume_unique=True)
+    rng = np.random.default_rng(seed)
+    sample = rng.choice(rest, max_points - len(top), replace=False)
+    return points.iloc[np.sort(np.concatenate([top, sample]))].reset_index(drop=True), total
+
+
+def build_chart_data(farmers_df, transactions_df):
+    """Everything the analytics charts need, as small pre-aggregated frames."""
+    frame = enrich_transactions(transactions_df, farmers_df)
+    scatter, scatter_total = downsample_points(frame, "land_size_acres", "claimed_kg")
+    return {
+        "by_village": aggregate_by(frame, "village"),
+        "by_dealer": aggregate_by(frame, "dealer_id"),
+        "by_crop": aggregate_by(frame, "crop"),
+        "by_month": aggregate_by(frame, "month", limit=None),
+        "kg_per_acre_hist": histogram(frame["kg_per_acre"]),
+        "scatter": scatter,
+        "scatter_total": scatter_total,
+    }
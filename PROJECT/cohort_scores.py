@@ -0,0 +1,225 @@
+# cohort_scores.py
+
+import time
+
+import numpy as np
+import pandas as pd
+
+COHORT_COLUMNS = ["kharif_crop", "soil_type", "village"]  # Cohort = crop x soil x village
+MIN_COHORT_SIZE = 30      # Smaller cohorts fall back to the global statistics
+IQR_TO_SIGMA = 1.349      # IQR of a normal distribution in standard deviations
+MIN_REL_SIGMA = 0.05      # Sigma floor as a fraction of the median (avoids z blow-ups)
+OUTLIER_Z = 3.5           # Robust z above this is an outlier
+
+# Streaming mode: log-spaced kg/acre histogram per cohort
+HIST_MIN, HIST_MAX, HIST_BINS = 1.0, 1e6, 2048
+_EDGES = np.geomspace(HIST_MIN, HIST_MAX, HIST_BINS + 1)
+
+
+def cohort_codes(frame, columns=None):
+    """Integer cohort code per row plus the cohort labels, from whichever COHORT_COLUMNS exist."""
+    columns = [c for c in (columns or COHORT_COLUMNS) if c in frame.columns]
+    if not columns:
+        return np.zeros(len(frame), dtype=np.int64), pd.DataFrame(index=[0])
+    codes, labels = pd.MultiIndex.from_frame(frame[columns].astype(object).fillna("Unknown")).factorize()
+    return codes.astype(np.int64), labels.to_frame(index=False).set_axis(columns, axis=1)
+
+
+def _sorted_quantiles(values, codes, n_cohorts, qs=(0.25, 0.5, 0.75)):
+    """Per-cohort quantiles with one lexsort over (cohort, value); linear interpolation."""
+    order = np.lexsort((values, codes))
+    values = values[order]
+    counts = np.bincount(codes, minlength=n_cohorts)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    out = np.full((n_cohorts, len(qs)), np.nan)
+    has = counts > 0
+    for j, q in enumerate(qs):
+        pos = starts[has] + q * (counts[has] - 1)
+        lo = np.floor(pos).astype(np.int64)
+        hi = np.minimum(lo + 1, starts[has] + counts[has] - 1)
+        frac = pos - lo
+        out[has, j] = values[lo] * (1 - frac) + values[hi] * frac
+    return out, counts
+
+
+def _finish_stats(quantiles, counts, global_quantiles, labels):
+    small = counts < MIN_COHORT_SIZE
+    quantiles = quantiles.copy()
+    quantiles[small] = global_quantiles
+    median = quantiles[:, 1]
+    sigma = np.maximum((quantiles[:, 2] - quantiles[:, 0]) / IQR_TO_SIGMA, MIN_REL_SIGMA * np.abs(median))
+    stats = labels.copy()
+    stats["count"] = counts
+    stats["median"] = median
+    stats["q25"] = quantiles[:, 0]
+    stats["q75"] = quantiles[:, 2]
+    stats["sigma"] = sigma
+    stats["global_fallback"] = small
+    return stats
+
+
+def fit_cohort_stats(kg_per_acre, codes, labels):
+    """
+    Batch mode: robust statistics per cohort in one sorted pass.
+
+    Median and IQR-based sigma of claimed kg/acre for every cohort, from a
+    single lexsort over (cohort, value). NaN/inf values are ignored.
+    """
+    kg_per_acre = np.asarray(kg_per_acre, dtype="float64")
+    valid = np.isfinite(kg_per_acre)
+    values, valid_codes = kg_per_acre[valid], codes[valid]
+    quantiles, counts = _sorted_quantiles(values, valid_codes, len(labels))
+    global_quantiles, _ = _sorted_quantiles(values, np.zeros(len(values), dtype=np.int64), 1)
+    return _finish_stats(quantiles, counts, global_quantiles[0], labels)
+
+
+def robust_z(kg_per_acre, codes, stats):
+    """(x - cohort median) / cohort sigma for every row."""
+    median = stats["median"].to_numpy()[codes]
+    sigma = stats["sigma"].to_numpy()[codes]
+    return (np.asarray(kg_per_acre, dtype="float64") - median) / sigma
+
+
+def score_cohorts(transactions_df, farmers_df, columns=None):
+    """
+    Batch scoring: every transaction gets kg_per_acre, its cohort and robust z.
+
+    Cohorts are factorized once per farmer, then gathered per transaction
+    through a farmer_id hash index (no merge, no per-transaction strings).
+    Returns (scored DataFrame, per-cohort stats DataFrame).
+    """
+    columns = [c for c in (columns or COHORT_COLUMNS) if c in farmers_df.columns]
+    registry = farmers_df.drop_duplicates("farmer_id")
+    pos = pd.Index(registry["farmer_id"]).get_indexer(transactions_df["farmer_id"])
+
+    # Unknown farmers point one past the registry: NaN land, "Unknown" cohort
+    safe = np.where(pos >= 0, pos, len(registry))
+    land = np.append(registry["land_size_acres"].to_numpy(dtype="float64"), np.nan).take(safe)
+    kg_per_acre = transactions_df["claimed_fertiliser_qty_kg"].to_numpy(dtype="float64") / land
+
+    farmer_codes, labels = cohort_codes(registry, columns)
+    if columns:
+        labels = pd.concat([labels, pd.DataFrame([["Unknown"] * len(columns)], columns=columns)], ignore_index=True)
+    codes = np.append(farmer_codes, len(labels) - 1).take(safe)
+    stats = fit_cohort_stats(kg_per_acre, codes, labels)
+
+    scored = pd.DataFrame({"farmer_id": transactions_df["farmer_id"].to_numpy()})
+    if "dealer_id" in transactions_df.columns:
+        scored["dealer_id"] = transactions_df["dealer_id"].to_numpy()
+    scored["kg_per_acre"] = kg_per_acre
+    for c in columns:
+        scored[c] = labels[c].to_numpy()[codes]
+    scored["cohort_median"] = stats["median"].to_numpy()[codes]
+    scored["robust_z"] = robust_z(kg_per_acre, codes, stats)
+    return scored, stats
+
+
+def _hist_quantiles(hist):
+    """Quartiles read off the cumulative histogram(s) along the last axis (bin midpoints)."""
+    mids = np.sqrt(_EDGES[:-1] * _EDGES[1:])
+    cum = np.cumsum(hist, axis=-1)
+    total = cum[..., -1:]
+    out = [mids[np.minimum((cum < q * np.maximum(total, 1)).sum(axis=-1), HIST_BINS - 1)] for q in (0.25, 0.5, 0.75)]
+    return np.stack(out, axis=-1)
+
+
+class StreamingCohortStats:
+    """
+    Streaming mode: mergeable per-cohort histograms of kg/acre.
+
+    Memory is O(cohorts x HIST_BINS) however many rows are fed; quantiles
+    are read off the cumulative histogram (log bins, ~0.7% resolution).
+    Cohort labels are tuples of COHORT_COLUMNS values.
+    """
+
+    def __init__(self, columns=None):
+        self.columns = list(columns or COHORT_COLUMNS)
+        self.cohorts = {}  # label tuple -> row in self.hist
+        self.hist = np.zeros((0, HIST_BINS), dtype=np.int64)
+
+    def _codes(self, frame, register=True):
+        """Cohort row per frame row; unseen cohorts are added, or -1 when register is False."""
+        if not self.cohorts and register:  # fixed by the first chunk
+            self.columns = [c for c in self.columns if c in frame.columns]
+        codes, labels = cohort_codes(frame, self.columns)
+        keys = [tuple(row) for row in labels.itertuples(index=False)]
+        mapping = np.empty(len(keys), dtype=np.int64)
+        for i, key in enumerate(keys):
+            if key not in self.cohorts:
+                if not register:
+                    mapping[i] = -1
+                    continue
+                self.cohorts[key] = len(self.cohorts)
+            mapping[i] = self.cohorts[key]
+        if len(self.cohorts) > len(self.hist):
+            self.hist = np.vstack([self.hist, np.zeros((len(self.cohorts) - len(self.hist), HIST_BINS), dtype=np.int64)])
+        return mapping[codes]
+
+    def update(self, frame, kg_per_acre):
+        """Adds one chunk: `frame` holds the cohort columns, aligned with kg_per_acre."""
+        kg_per_acre = np.asarray(kg_per_acre, dtype="float64")
+        codes = self._codes(frame)
+        valid = np.isfinite(kg_per_acre)
+        bins = np.clip(np.searchsorted(_EDGES, kg_per_acre[valid], side="right") - 1, 0, HIST_BINS - 1)
+        flat = np.bincount(codes[valid] * HIST_BINS + bins, minlength=self.hist.size)
+        self.hist += flat.reshape(self.hist.shape)
+        return self
+
+    def stats(self):
+        labels = pd.DataFrame(list(self.cohorts), columns=self.columns) if self.cohorts else pd.DataFrame(columns=self.columns)
+        counts = self.hist.sum(axis=1)
+        return _finish_stats(_hist_quantiles(self.hist), counts, _hist_quantiles(self.hist.sum(axis=0)), labels)
+
+    def score(self, frame, kg_per_acre, stats=None):
+        """
+        Robust z for a chunk against the statistics accumulated so far.
+        Cohorts not seen by `update` are scored against the global statistics
+        (and not added, so scoring never changes the accumulated state).
+        """
+        stats = self.stats() if stats is None else stats
+        codes = self._codes(frame, register=False)
+        fallback = _finish_stats(np.zeros((1, 3)), np.zeros(1), _hist_quantiles(self.hist.sum(axis=0)), pd.DataFrame(index=[0]))
+        stats = pd.concat([stats[["median", "sigma"]], fallback[["median", "sigma"]]], ignore_index=True)
+        return robust_z(kg_per_acre, np.where(codes >= 0, codes, len(stats) - 1), stats)
+
+
+def benchmark(n_transactions=10_000_000, n_farmers=1_000_000, seed=0):
+    """Times batch and streaming scoring on synthetic data; returns rows/sec."""
+    rng = np.random.default_rng(seed)
+    villages = np.array([f"Village_{i}" for i in range(200)], dtype=object)
+    farmers = pd.DataFrame({
+        "farmer_id": np.arange(n_farmers),
+        "land_size_acres": rng.uniform(0.5, 15, n_farmers),
+        "kharif_crop": rng.choice(np.array(["Paddy", "Jowar"], dtype=object), n_farmers),
+        "soil_type": rng.choice(np.array(["Alluvial", "Clay", "Loamy", "Red"], dtype=object), n_farmers),
+        "village": villages[rng.integers(0, len(villages), n_farmers)],
+    })
+    transactions = pd.DataFrame({
+        "farmer_id": rng.integers(0, n_farmers, n_transactions),
+        "claimed_fertiliser_qty_kg": rng.lognormal(6, 0.5, n_transactions),
+    })
+
+    start = time.perf_counter()
+    score_cohorts(transactions, farmers)
+    batch = time.perf_counter() - start
+
+    start = time.perf_counter()
+    stream = StreamingCohortStats()
+    chunk = 1_000_000
+    pos = transactions["farmer_id"].to_numpy()
+    land = farmers["land_size_acres"].to_numpy()
+    for i in range(0, n_transactions, chunk):
+        rows = pos[i:i + chunk]
+        stream.update(farmers.iloc[rows][COHORT_COLUMNS], transactions["claimed_fertiliser_qty_kg"].to_numpy()[i:i + chunk] / land[rows])
+    stream.stats()
+    streaming = time.perf_counter() - start
+
+    return {
+        "rows": n_transactions,
+        "batch_rows_per_sec": round(n_transactions / batch),
+        "streaming_rows_per_sec": round(n_transactions / streaming),
+    }
+
+
+if __name__ == "__main__":
+    print(benchmark())
@@ -0,0 +1,94 @@
+# datastore.py
+
+import threading
+import weakref
+from collections import OrderedDict
+
+import pandas as pd
+
+MAX_IDLE_DATASETS = 4  # Unreferenced datasets kept for quick re-upload, least recently used evicted first
+
+
+class DatasetHandle:
+    """
+    A session's reference to one shared dataset.
+
+    `frame` is a shallow view of the stored DataFrame: with copy-on-write
+    (the default from pandas 3) edits made through it are copied on first
+    write and never reach the shared frame. The store counts live handles;
+    dropping the last one (e.g. the session ends) releases the dataset.
+    """
+
+    __slots__ = ("digest", "source_id", "_frame", "__weakref__")
+
+    def __init__(self, digest, frame, source_id=None):
+        self.digest = digest
+        self.source_id = source_id
+        self._frame = frame
+
+    @property
+    def frame(self):
+        return self._frame.copy(deep=False)
+
+
+class DatasetStore:
+    """
+    Process-wide store of immutable datasets keyed by content hash.
+
+    Sessions that load the same bytes share one DataFrame and hold only
+    DatasetHandle references. Each entry is reference counted through the
+    handles' finalizers; entries with no references stay in an LRU of
+    `max_idle` datasets and are evicted beyond that.
+    """
+
+    def __init__(self, max_idle=MAX_IDLE_DATASETS):
+        self.max_idle = max_idle
+        self._lock = threading.RLock()  # handle finalizers can run during GC while it is held
+        self._entries = {}          # digest -> {"frame", "refs", "nbytes"}
+        self._idle = OrderedDict()  # digest -> None, least recently released first
+
+    def acquire(self, digest, loader, source_id=None):
+        """Handle for `digest`, calling `loader()` only if it is not stored yet."""
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                self._ref(digest, entry)
+        if entry is None:
+            # Parse outside the lock; if two sessions race, the first insert wins
+            frame = loader()
+            nbytes = int(frame.memory_usage(deep=True).sum())
+            with self._lock:
+                entry = self._entries.setdefault(digest, {"frame": frame, "refs": 0, "nbytes": nbytes})
+                self._ref(digest, entry)
+        handle = DatasetHandle(digest, entry["frame"], source_id)
+        weakref.finalize(handle, self._release, digest)
+        return handle
+
+    def _ref(self, digest, entry):
+        entry["refs"] += 1
+        self._idle.pop(digest, None)
+
+    def _release(self, digest):
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return
+            entry["refs"] -= 1
+            if entry["refs"] > 0:
+                return
+            self._idle[digest] = None
+            while len(self._idle) > self.max_idle:
+                evicted, _ = self._idle.popitem(last=False)
+                del self._entries[evicted]
+
+    def __contains__(self, digest):
+        return digest in self._entries
+
+    def stats(self):
+        """One row per stored dataset: digest, rows, live references, bytes."""
+        with self._lock:
+            rows = [
+                {"digest": digest[:12], "rows": len(e["frame"]), "refs": e["refs"], "nbytes": e["nbytes"]}
+                for digest, e in self._entries.items()
+            ]
+        return pd.DataFrame(rows, columns=["digest", "rows", "refs", "nbytes"])
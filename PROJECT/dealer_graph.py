@@ -0,0 +1,186 @@
+# dealer_graph.py
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix, csr_matrix, triu
+from scipy.sparse.csgraph import connected_components
+from scipy.stats import poisson
+
+MIN_SHARED_FARMERS = 5   # Dealer pairs sharing fewer farmers are never flagged
+MIN_LIFT = 3.0           # ...nor pairs sharing < 3x the overlap expected by chance
+MAX_P_VALUE = 1e-6       # ...nor pairs whose overlap is plausible under a Poisson model
+HUB_FARMER_DEGREE = 50   # Farmers with more dealers than this are left out of pair counts
+MIN_FARMER_DEALERS = 4   # Farmer flagged when served by this many dealers...
+MIN_FARMER_VILLAGES = 3  # ...spread over this many villages
+
+
+def build_bipartite(relations_df):
+    """
+    Dealer x farmer CSR adjacency from the relationships file.
+
+    Repeated (dealer, farmer) rows collapse to a single 1, so row sums are
+    distinct farmers per dealer. Memory is O(edges).
+    """
+    dealer_codes, dealer_ids = pd.factorize(relations_df["dealer_id"])
+    farmer_codes, farmer_ids = pd.factorize(relations_df["farmer_id"])
+    known = (dealer_codes >= 0) & (farmer_codes >= 0)
+    matrix = coo_matrix(
+        (np.ones(int(known.sum()), dtype=np.int32), (dealer_codes[known], farmer_codes[known])),
+        shape=(len(dealer_ids), len(farmer_ids)),
+    ).tocsr()
+    matrix.sum_duplicates()
+    matrix.data[:] = 1
+    return {"matrix": matrix, "dealer_ids": np.asarray(dealer_ids), "farmer_ids": np.asarray(farmer_ids)}
+
+
+def dealer_degrees(graph):
+    """Distinct farmers per dealer, highest first."""
+    degree = np.diff(graph["matrix"].indptr)
+    return (
+        pd.DataFrame({"dealer_id": graph["dealer_ids"], "farmer_count": degree})
+        .sort_values("farmer_count", ascending=False, kind="stable")
+        .reset_index(drop=True)
+    )
+
+
+def shared_farmer_pairs(graph, min_shared=MIN_SHARED_FARMERS, min_lift=MIN_LIFT, max_p_value=MAX_P_VALUE):
+    """
+    Dealer pairs sharing unusually many farmers.
+
+    Shared counts come from the sparse product A @ A.T (upper triangle only).
+    Hub farmers (> HUB_FARMER_DEGREE dealers) are dropped first so one farmer
+    cannot make the product quadratic. `lift` is shared / expected, where
+    expected = deg_a * deg_b / n_farmers is the overlap of two random dealers,
+    and `p_value` the Poisson probability of sharing at least that many.
+    """
+    matrix = graph["matrix"]
+    farmer_degree = np.diff(matrix.tocsc().indptr)
+    if (farmer_degree > HUB_FARMER_DEGREE).any():
+        keep = np.flatnonzero(farmer_degree <= HUB_FARMER_DEGREE)
+        matrix = matrix[:, keep]
+
+    co = triu(matrix @ matrix.T, k=1).tocoo()
+    hit = co.data >= min_shared
+    a, b, shared = co.row[hit], co.col[hit], co.data[hit]
+
+    degree = np.diff(graph["matrix"].indptr).astype("float64")
+    n_farmers = max(graph["matrix"].shape[1], 1)
+    expected = degree[a] * degree[b] / n_farmers
+    lift = shared / np.maximum(expected, 1e-9)
+    p_value = poisson.sf(shared - 1, expected)
+    hit = (lift >= min_lift) & (p_value <= max_p_value)
+
+    return (
+        pd.DataFrame({
+            "dealer_a": graph["dealer_ids"][a[hit]],
+            "dealer_b": graph["dealer_ids"][b[hit]],
+            "shared_farmers": shared[hit],
+            "expected": expected[hit].round(2),
+            "lift": lift[hit].round(2),
+            "p_value": p_value[hit],
+        })
+        .sort_values(["shared_farmers", "lift"], ascending=False, kind="stable")
+        .reset_index(drop=True)
+    )
+
+
+def dense_dealer_groups(graph, pairs):
+    """
+    Dense subgraphs: dealer groups connected by suspicious shared-farmer pairs.
+
+    Connected components of the flagged pair graph; for each group of 2+
+    dealers, the farmers served by at least two of them and the density of
+    that induced bipartite block (edges / (dealers x farmers)). One sparse
+    product (group membership x adjacency) counts every group at once.
+    """
+    dealer_pos = pd.Index(graph["dealer_ids"])
+    a = dealer_pos.get_indexer(pairs["dealer_a"])
+    b = dealer_pos.get_indexer(pairs["dealer_b"])
+    n = len(dealer_pos)
+    pair_graph = csr_matrix((np.ones(len(a), dtype=np.int8), (a, b)), shape=(n, n))
+    _, labels = connected_components(pair_graph, directed=False)
+
+    # Groups of 2+ dealers, numbered 0..k-1; per group, how many of its dealers serve each farmer
+    sizes = np.bincount(labels, minlength=n)
+    comps = np.flatnonzero(sizes >= 2)
+    group_of = np.full(n, -1, dtype=np.int64)
+    group_of[comps] = np.arange(len(comps))
+    group_of = group_of[labels]
+    members = np.flatnonzero(group_of >= 0)
+    membership = csr_matrix((np.ones(len(members), dtype=np.int32), (group_of[members], members)), shape=(len(comps), n))
+    hits = (membership @ graph["matrix"]).tocoo()
+    shared = hits.data >= 2
+    farmer_count = np.bincount(hits.row[shared], minlength=len(comps))
+    edges = np.bincount(hits.row[shared], weights=hits.data[shared], minlength=len(comps))
+    dealer_count = sizes[comps]
+
+    order = members[np.argsort(group_of[members], kind="stable")]
+    dealer_lists = np.split(graph["dealer_ids"][order], np.cumsum(dealer_count)[:-1]) if len(comps) else []
+    with np.errstate(divide="ignore", invalid="ignore"):
+        density = np.where(farmer_count > 0, edges / (dealer_count * farmer_count), 0.0)
+    rows = {
+        "dealer_count": dealer_count,
+        "shared_farmer_count": farmer_count,
+        "density": density.round(3),
+        "dealer_ids": [list(ids) for ids in dealer_lists],
+    }
+    groups = pd.DataFrame(rows, columns=["dealer_count", "shared_farmer_count", "density", "dealer_ids"])
+    return groups.sort_values(["density", "shared_farmer_count"], ascending=False, kind="stable").reset_index(drop=True)
+
+
+def multi_village_farmers(graph, dealers_df, farmers_df=None,
+                          min_dealers=MIN_FARMER_DEALERS, min_villages=MIN_FARMER_VILLAGES):
+    """
+    Farmers served by many dealers spread across villages.
+
+    Distinct dealer villages per farmer come from the sparse product
+    A.T @ V, where V is the dealer x village one-hot matrix. When farmers_df
+    is given, dealers outside the farmer's own village are counted too.
+    """
+    matrix_t = graph["matrix"].T.tocsr()
+    dealer_count = np.diff(matrix_t.indptr)
+
+    dealer_village = pd.Series(dealers_df["village"].to_numpy(), index=dealers_df["dealer_id"].to_numpy())
+    dealer_village = dealer_village[~dealer_village.index.duplicated()]
+    village_codes, villages = pd.factorize(dealer_village.reindex(graph["dealer_ids"]).to_numpy())
+    known = village_codes >= 0
+    one_hot = csr_matrix(
+        (np.ones(int(known.sum()), dtype=np.int32), (np.flatnonzero(known), village_codes[known])),
+        shape=(len(graph["dealer_ids"]), max(len(villages), 1)),
+    )
+    farmer_villages = matrix_t @ one_hot
+    village_count = np.diff(farmer_villages.indptr)
+
+    result = pd.DataFrame({
+        "farmer_id": graph["farmer_ids"],
+        "dealer_count": dealer_count,
+        "dealer_village_count": village_count,
+    })
+    if farmers_df is not None and "village" in farmers_df.columns:
+        home = pd.Series(farmers_df["village"].to_numpy(), index=farmers_df["farmer_id"].to_numpy())
+        home = home[~home.index.duplicated()]
+        home_codes = pd.Index(villages).get_indexer(home.reindex(graph["farmer_ids"]).to_numpy())
+        same = np.zeros(len(home_codes), dtype=np.int64)
+        has_home = home_codes >= 0
+        same[has_home] = np.asarray(farmer_villages[np.flatnonzero(has_home), home_codes[has_home]]).ravel()
+        result["out_of_village_dealers"] = dealer_count - same
+
+    flagged = (result["dealer_count"] >= min_dealers) & (result["dealer_village_count"] >= min_villages)
+    return (
+        result[flagged]
+        .sort_values(["dealer_village_count", "dealer_count"], ascending=False, kind="stable")
+        .reset_index(drop=True)
+    )
+
+
+def analyze_dealer_network(relations_df, dealers_df, farmers_df=None):
+    """All network checks in one call; returns a dict of DataFrames."""
+    graph = build_bipartite(relations_df)
+    pairs = shared_farmer_pairs(graph)
+    return {
+        "edges": int(graph["matrix"].nnz),
+        "dealer_degrees": dealer_degrees(graph),
+        "shared_pairs": pairs,
+        "dense_groups": dense_dealer_groups(graph, pairs),
+        "multi_village_farmers": multi_village_farmers(graph, dealers_df, farmers_df),
+    }
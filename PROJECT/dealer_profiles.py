@@ -0,0 +1,234 @@
+# dealer_profiles.py
+
+import numpy as np
+import pandas as pd
+
+from cohort_scores import IQR_TO_SIGMA, MIN_REL_SIGMA, OUTLIER_Z
+
+MIN_PROFILE_ROWS = 5   # Dealers with fewer relationships than this are neither scored nor part of the peer baseline
+MIN_ABS_SIGMA = 0.02   # Sigma floor for the shares, whose peer median can be 0
+# Profile metrics compared against all other dealers (robust z above OUTLIER_Z flags the dealer):
+# claimed kg / expected kg, share not Active, share of registered farmers from another village,
+# share of relationships with a farmer missing from the registry
+RATIO_COLUMNS = ["claim_ratio", "inactive_share", "out_of_village_share", "unknown_farmer_rate"]
+
+# Additive per-dealer counters: appending rows only adds to them, and every profile column is derived from them
+COUNTERS = ["relationships", "farmers", "claimed_kg", "claimed_kg_priced", "expected_kg",
+            "inactive", "located", "out_of_village", "unknown_farmer"]
+PROFILE_COLUMNS = ["dealer_id", "relationships", "farmers", "claimed_kg", "expected_kg", "claim_ratio",
+                   "inactive_share", "out_of_village_share", "unknown_farmer_rate", "profile_z", "flagged"]
+
+
+def _keys(values):
+    return pd.Series(values, dtype=object).astype(str).str.strip().to_numpy(dtype=object)
+
+
+class _PairKeys:
+    """
+    (dealer, farmer) pairs seen so far, as int64 keys in a hash set updated
+    in place. Copies of one DealerProfiles share it; `generation` tells
+    which of them holds the latest state and may extend it.
+    """
+
+    def __init__(self):
+        self.keys = set()
+        self.unknown_farmers = {}  # farmer_id missing from the registry -> code
+        self.generation = 0
+
+
+class DealerProfiles:
+    """
+    Per-dealer aggregates over the relationship table.
+
+    The farmer and dealer registries are fixed at construction (expected kg
+    and village code per farmer, village code per dealer); relationship rows
+    are fed with `update`, once for the initial table and then for each
+    batch of appended rows, in one vectorized pass over just those rows.
+    A dealer is flagged when any profile ratio is an outlier against its
+    peers (robust z over all dealers with MIN_PROFILE_ROWS relationships,
+    as in cohort_scores). Peer statistics and flags are refreshed after
+    each update, so `flagged` and `profile` are dictionary lookups.
+    """
+
+    def __init__(self, farmer_ids, farmer_expected_kg, farmer_villages, dealer_ids, dealer_villages):
+        self._farmer_keys = pd.Index(_keys(farmer_ids))
+        self._farmer_expected = np.asarray(farmer_expected_kg, dtype="float64")
+        self._farmer_village = np.asarray(farmer_villages, dtype=np.int64)
+        self._dealer_keys = pd.Index(_keys(dealer_ids))
+        self._dealer_village = np.asarray(dealer_villages, dtype=np.int64)
+        self.dealers = {}  # dealer_id -> row in self.counts
+        self.counts = np.zeros((0, len(COUNTERS)), dtype="float64")
+        self._flagged = np.zeros(0, dtype=bool)
+        self._z = np.zeros(0)
+        self._dealer_index = None  # pd.Index over self.dealers, rebuilt when dealers are added
+        self._pairs = _PairKeys()
+        self._generation = 0
+
+    def copy(self):
+        """
+        Profiles to update without touching this one: counts are copied, the
+        registry arrays and the pair set are shared. Once the copy has been
+        updated, only the copy (the latest state) can be updated further.
+        """
+        other = object.__new__(DealerProfiles)
+        other.__dict__.update(self.__dict__)
+        other.dealers = dict(self.dealers)
+        other.counts = self.counts.copy()
+        other._flagged = self._flagged.copy()
+        other._z = self._z.copy()
+        return other
+
+    def frozen(self):
+        """Read-only copy without the registry arrays and pair set, small enough to ship to other processes."""
+        other = self.copy()
+        other._farmer_keys = other._farmer_expected = other._farmer_village = None
+        other._dealer_keys = other._dealer_village = other._pairs = None
+        return other
+
+    def _new_pairs(self, rows, farmer_pos, farmer):
+        """True on the first row of every (dealer, farmer) pair not seen before; O(rows in the batch)."""
+        pairs = self._pairs
+        codes = farmer_pos.astype(np.int64)
+        unknown = farmer_pos < 0
+        if unknown.any():
+            for key in pd.unique(farmer[unknown]):
+                pairs.unknown_farmers.setdefault(key, len(pairs.unknown_farmers))
+            offsets = np.fromiter((pairs.unknown_farmers[key] for key in farmer[unknown]), dtype=np.int64, count=int(unknown.sum()))
+            codes[unknown] = len(self._farmer_keys) + offsets
+        keys = (rows.astype(np.int64) << 32) | codes
+        first = ~pd.Series(keys).duplicated().to_numpy()
+        if pairs.keys:
+            seen = pairs.keys.__contains__
+            first[first] = ~np.fromiter(map(seen, keys[first].tolist()), dtype=bool, count=int(first.sum()))
+        return first, keys[first]
+
+    def _rows(self, dealer):
+        codes, uniques = pd.factorize(dealer)
+        mapping = np.empty(len(uniques), dtype=np.int64)
+        for i, key in enumerate(uniques):
+            if key not in self.dealers:
+                self.dealers[key] = len(self.dealers)
+            mapping[i] = self.dealers[key]
+        if len(self.dealers) > len(self.counts):
+            grow = len(self.dealers) - len(self.counts)
+            self.counts = np.vstack([self.counts, np.zeros((grow, len(COUNTERS)))])
+            self._flagged = np.append(self._flagged, np.zeros(grow, dtype=bool))
+            self._z = np.append(self._z, np.full(grow, np.nan))
+        return mapping[codes]
+
+    def update(self, relations):
+        """Adds relationship rows (dealer_id, farmer_id, claimed_fertiliser_qty_kg, relationship_status)."""
+        if self._pairs is None:
+            raise TypeError("frozen DealerProfiles cannot be updated")
+        if self._generation != self._pairs.generation:
+            raise ValueError("DealerProfiles superseded by an updated copy; update the latest copy instead")
+        if len(relations) == 0:
+            return self
+        dealer = _keys(relations["dealer_id"])
+        farmer = _keys(relations["farmer_id"])
+        rows = self._rows(dealer)
+
+        farmer_pos = self._farmer_keys.get_indexer(farmer)
+        known = farmer_pos >= 0
+        f = np.maximum(farmer_pos, 0)
+        dealer_pos = self._dealer_keys.get_indexer(dealer)
+        d = np.maximum(dealer_pos, 0)
+
+        claimed = pd.to_numeric(relations["claimed_fertiliser_qty_kg"], errors="coerce").fillna(0).to_numpy(dtype="float64")
+        expected = np.where(known, self._farmer_expected[f], np.nan) if len(self._farmer_expected) else np.full(len(dealer), np.nan)
+        priced = np.isfinite(expected)
+        located = known & (dealer_pos >= 0)
+        if located.any():
+            out_of_village = located & (self._farmer_village[f] != self._dealer_village[d])
+        else:
+            out_of_village = located
+
+        new_pair, new_keys = self._new_pairs(rows, farmer_pos, farmer)
+
+        status = relations["relationship_status"].astype(object).to_numpy(dtype=object)
+        columns = {
+            "relationships": np.ones(len(dealer)),
+            "farmers": new_pair,
+            "claimed_kg": claimed,
+            "claimed_kg_priced": np.where(priced, claimed, 0.0),
+            "expected_kg": np.where(priced, expected, 0.0),
+            "inactive": status != "Active",
+            "located": located,
+            "out_of_village": out_of_village,
+            "unknown_farmer": ~known,
+        }
+        for i, name in enumerate(COUNTERS):
+            self.counts[:, i] += np.bincount(rows, weights=np.asarray(columns[name], dtype="float64"), minlength=len(self.counts))
+        self._z = self._profile_z(self.counts)
+        self._flagged = self._z > OUTLIER_Z
+        self._pairs.keys.update(new_keys.tolist())
+        self._pairs.generation += 1
+        self._generation = self._pairs.generation
+        return self
+
+    @staticmethod
+    def _ratios(counts):
+        c = dict(zip(COUNTERS, counts.T))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return {
+                "claim_ratio": np.where(c["expected_kg"] > 0, c["claimed_kg_priced"] / c["expected_kg"], np.nan),
+                "inactive_share": c["inactive"] / c["relationships"],
+                "out_of_village_share": np.where(c["located"] > 0, c["out_of_village"] / c["located"], np.nan),
+                "unknown_farmer_rate": c["unknown_farmer"] / c["relationships"],
+            }
+
+    def _profile_z(self, counts):
+        """Largest robust z of a dealer's ratios against its peers (NaN when too few relationships)."""
+        ratios = self._ratios(counts)
+        eligible = counts[:, COUNTERS.index("relationships")] >= MIN_PROFILE_ROWS
+        worst = np.full(len(counts), np.nan)
+        for name in RATIO_COLUMNS:
+            values = np.where(eligible, ratios[name], np.nan)
+            peers = values[np.isfinite(values)]
+            if not len(peers):
+                continue
+            q1, median, q3 = np.percentile(peers, [25, 50, 75])
+            sigma = max((q3 - q1) / IQR_TO_SIGMA, MIN_REL_SIGMA * abs(median), MIN_ABS_SIGMA)
+            worst = np.fmax(worst, (values - median) / sigma)
+        return worst
+
+    def flagged(self, dealer_id):
+        """True when the dealer is an outlier against its peers (O(1))."""
+        row = self.dealers.get(str(dealer_id).strip())
+        return False if row is None else bool(self._flagged[row])
+
+    def flagged_many(self, dealer_ids):
+        """`flagged` for a whole column of dealer IDs."""
+        if self._dealer_index is None or len(self._dealer_index) != len(self.dealers):
+            self._dealer_index = pd.Index(list(self.dealers), dtype=object)
+        rows = self._dealer_index.get_indexer(_keys(dealer_ids)) if self.dealers else np.full(len(dealer_ids), -1)
+        return np.where(rows >= 0, self._flagged[np.maximum(rows, 0)] if len(self._flagged) else False, False)
+
+    def profile(self, dealer_id):
+        """One dealer's profile row as a dict, or None if it has no relationships (O(1))."""
+        row = self.dealers.get(str(dealer_id).strip())
+        if row is None:
+            return None
+        counts = self.counts[row:row + 1]
+        c = dict(zip(COUNTERS, counts[0]))
+        ratios = {k: float(v[0]) for k, v in self._ratios(counts).items()}
+        return {
+            "dealer_id": str(dealer_id).strip(),
+            "relationships": int(c["relationships"]), "farmers": int(c["farmers"]),
+            "claimed_kg": float(c["claimed_kg"]), "expected_kg": float(c["expected_kg"]),
+            **ratios, "profile_z": float(self._z[row]), "flagged": bool(self._flagged[row]),
+        }
+
+    def table(self):
+        """All profiles, one row per dealer seen in the relationships."""
+        c = dict(zip(COUNTERS, self.counts.T))
+        return pd.DataFrame({
+            "dealer_id": list(self.dealers),
+            "relationships": c["relationships"].astype(np.int64),
+            "farmers": c["farmers"].astype(np.int64),
+            "claimed_kg": c["claimed_kg"],
+            "expected_kg": c["expected_kg"],
+            **self._ratios(self.counts),
+            "profile_z": self._z,
+            "flagged": self._flagged,
+        }, columns=PROFILE_COLUMNS)
@@ -0,0 +1,168 @@
+# evaluate.py
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import risk_engine
+from registry import RegistrySnapshot
+
+GENUINE = "genuine"
+FLAG_DECISIONS = ("REVIEW", "BLOCK")  # Decisions that count as "flagged" overall
+
+# Reason fragments (lowercase) that are each scenario's detector signal. shared_phone
+# has no kiosk rule (benami.py finds shared phones offline): it counts only in "overall"
+SCENARIO_SIGNALS = {
+    "fake_farmer": ["farmer not in government registry"],
+    "fake_dealer_aadhar": ["dealer aadhar"],
+    "cross_village": ["village mismatch"],
+    "txn_limit_abuse": ["exceeded transaction limit"],
+    "over_claim": ["extremely excessive fertilizer", "excess fertility use"],
+}
+
+
+def build_requests(farmers_df, relations_df):
+    """
+    One kiosk request per labelled relationship row (farmer, dealer, declared
+    crop). The crop is the farmer's registered kharif crop under the name the
+    kiosk offers for it (risk_engine.REGISTRY_CROP_NAMES, e.g. Paddy -> Rice).
+    """
+    kharif = farmers_df.drop_duplicates("farmer_id").set_index("farmer_id")["kharif_crop"]
+    crop = relations_df["farmer_id"].map(kharif).replace(risk_engine.REGISTRY_CROP_NAMES)
+    return pd.DataFrame({
+        "farmer_id": relations_df["farmer_id"].to_numpy(),
+        "Dealer_ID": relations_df["dealer_id"].to_numpy(),
+        "Dealer_Aadhar": relations_df["dealer_aadhar"].to_numpy() if "dealer_aadhar" in relations_df.columns else None,
+        "Crop": crop.fillna("Rice").to_numpy(),
+    })
+
+
+def read_registry(data_dir):
+    """Standalone RegistrySnapshot of the three CSVs in data_dir (the process-wide registry is not touched)."""
+    return RegistrySnapshot(
+        1,
+        pd.read_csv(os.path.join(data_dir, "government_farmers.csv")),
+        pd.read_csv(os.path.join(data_dir, "government_dealers.csv")),
+        pd.read_csv(os.path.join(data_dir, "dealer_farmer_relationships.csv")),
+    )
+
+
+def scenario_metrics(reasons, decisions, labels):
+    """
+    Precision/recall per scenario on that scenario's signal (its reasons
+    fired), plus an overall row on REVIEW/BLOCK decisions vs any fraud label.
+    """
+    reasons = pd.Series(reasons, dtype=object).fillna("").str.lower().to_numpy()
+    labels = np.asarray(labels, dtype=object)
+    rows = []
+    for scenario, fragments in SCENARIO_SIGNALS.items():
+        fired = np.zeros(len(labels), dtype=bool)
+        for fragment in fragments:
+            fired |= pd.Series(reasons).str.contains(fragment, regex=False).to_numpy()
+        rows.append(_metrics_row(scenario, fired, labels == scenario))
+    rows.append(_metrics_row("overall", np.isin(decisions, FLAG_DECISIONS), labels != GENUINE))
+    return pd.DataFrame(rows)
+
+
+def _metrics_row(name, flagged, actual):
+    hits = int((flagged & actual).sum())
+    return {
+        "scenario": name,
+        "rows": int(actual.sum()),
+        "flagged": int(flagged.sum()),
+        "precision": hits / flagged.sum() if flagged.any() else np.nan,
+        "recall": hits / actual.sum() if actual.any() else np.nan,
+    }
+
+
+def stratified_sample(labels, size, seed=0):
+    """Row positions: up to size/k rows of each label, so rare scenarios are represented."""
+    rng = np.random.default_rng(seed)
+    labels = pd.Series(labels).reset_index(drop=True)
+    per_label = max(1, size // max(labels.nunique(), 1))
+    picks = [rng.choice(group.index.to_numpy(), min(per_label, len(group)), replace=False)
+             for _, group in labels.groupby(labels, sort=False)]
+    return np.sort(np.concatenate(picks)) if picks else np.array([], dtype=np.int64)
+
+
+def run_harness(farmers_df, dealers_df, relations_df, scalar_sample=1000, seed=0):
+    """
+    Scores every labelled row with evaluate_risk_batch and a stratified
+    sample with evaluate_risk, and reports throughput, latency, batch/scalar
+    agreement and per-scenario precision/recall for both paths. Rows are
+    scored against their own snapshot, not the process-wide registry.
+    Batch latency is only known as a mean per row (mean_ms); the
+    percentiles are per request on the scalar path.
+    """
+    if "fraud_label" not in relations_df.columns:
+        raise KeyError("relations_df has no fraud_label column (generate it with Saish/initial.py)")
+    registry = RegistrySnapshot(1, farmers_df, dealers_df, relations_df)
+    requests = build_requests(farmers_df, relations_df)
+    labels = relations_df["fraud_label"].to_numpy(dtype=object)
+
+    start = time.perf_counter()
+    batch = risk_engine.evaluate_risk_batch(requests, registry)
+    batch_seconds = time.perf_counter() - start
+
+    sample = stratified_sample(labels, scalar_sample, seed)
+    latencies, scalar_rows, errors = [], [], 0
+    for pos in sample:
+        request = requests.iloc[pos].to_dict()
+        start = time.perf_counter()
+        try:
+            result = risk_engine.evaluate_risk(request, registry)
+        except KeyError:
+            errors += 1
+            result = {"Risk_Score": np.nan, "Decision": None, "Reasons": ""}
+        latencies.append(time.perf_counter() - start)
+        scalar_rows.append(result)
+    scalar = pd.DataFrame(scalar_rows, index=sample, columns=["Risk_Score", "Decision", "Reasons"])
+
+    latencies = np.array(latencies) * 1000
+    batch_on_sample = batch.iloc[sample]
+    agree = (batch_on_sample["Decision"].to_numpy() == scalar["Decision"].to_numpy()) & \
+            (batch_on_sample["Risk_Score"].to_numpy() == scalar["Risk_Score"].to_numpy())
+
+    performance = pd.DataFrame([
+        {"path": "batch", "rows": len(requests), "seconds": batch_seconds,
+         "rows_per_sec": len(requests) / batch_seconds if batch_seconds else np.inf,
+         "mean_ms": 1000 * batch_seconds / max(len(requests), 1), "p50_ms": np.nan, "p95_ms": np.nan, "errors": 0},
+        {"path": "scalar", "rows": len(sample), "seconds": latencies.sum() / 1000,
+         "rows_per_sec": len(sample) / (latencies.sum() / 1000) if len(sample) else np.nan,
+         "mean_ms": latencies.mean() if len(sample) else np.nan,
+         "p50_ms": np.percentile(latencies, 50) if len(sample) else np.nan,
+         "p95_ms": np.percentile(latencies, 95) if len(sample) else np.nan, "errors": errors},
+    ])
+    return {
+        "performance": performance,
+        "batch_metrics": scenario_metrics(batch["Reasons"], batch["Decision"].to_numpy(), labels),
+        "scalar_metrics": scenario_metrics(scalar["Reasons"], scalar["Decision"].to_numpy(), labels[sample]),
+        "agreement": float(agree.mean()) if len(sample) else np.nan,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Accuracy and throughput of risk_engine on labelled synthetic data.")
+    parser.add_argument("--data", default=".", help="directory with the three CSVs from Saish/initial.py")
+    parser.add_argument("--scalar-sample", type=int, default=1000, help="rows scored one at a time with evaluate_risk")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    registry = read_registry(args.data)
+    report = run_harness(registry.farmers, registry.dealers, registry.relations, args.scalar_sample, args.seed)
+
+    with pd.option_context("display.width", 120, "display.float_format", "{:,.3f}".format):
+        print("⚡ Throughput and latency")
+        print(report["performance"].to_string(index=False))
+        print(f"\n🤝 Batch/scalar agreement on the scalar sample: {report['agreement']:.1%}")
+        print("\n🎯 Batch path (all rows)")
+        print(report["batch_metrics"].to_string(index=False))
+        print("\n🎯 Scalar path (stratified sample)")
+        print(report["scalar_metrics"].to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+# export.py
+
+import argparse
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from benami import find_identity_clusters
+from ingest import CHUNK_ROWS, SCHEMAS, iter_csv_typed, read_csv_typed
+
+HIGH_RISK_KG_PER_ACRE = 1500
+# Where exports are written unless a directory is given; AGRIGUARD_EXPORT_DIR overrides the temp default
+EXPORT_DIR = os.environ.get("AGRIGUARD_EXPORT_DIR", os.path.join(tempfile.gettempdir(), "agriguard_exports"))
+FORMATS = ("parquet", "csv")
+
+
+class TableWriter:
+    """
+    Appends DataFrame chunks to one CSV or Parquet file.
+
+    `dtypes` declares every column's type ({column: dtype}); each chunk is
+    cast to it, and columns it does not name are written as strings, so all
+    chunks share one schema whatever pandas inferred for them (Parquet
+    fixes its schema at the first row group). CSV chunks are appended with
+    the header written once; Parquet chunks become row groups of a single
+    pyarrow ParquetWriter. Memory is bounded by one chunk.
+
+    Rows go to a private temp file next to `path`, moved into place by
+    close(), so concurrent exports to the same path never see each other's
+    partial files. If nothing is written, close() still leaves a valid
+    empty file with `columns` as its header; on an exception inside a `with`
+    block the temp file is removed and `path` is left as it was.
+    """
+
+    def __init__(self, path, fmt, columns=(), dtypes=None):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt} (expected one of {FORMATS})")
+        self.path = path
+        self.fmt = fmt
+        self.columns = list(columns)
+        self.dtypes = dict(dtypes or {})
+        self.rows = 0
+        self._writer = None
+        fd, self._tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                         prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+        os.close(fd)
+
+    def write(self, df):
+        df = pd.DataFrame({col: _cast(df[col], self.dtypes.get(col, "str")) for col in df.columns})
+        if self.fmt == "csv":
+            df.to_csv(self._tmp, mode="a", header=self.rows == 0, index=False)
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self._tmp, table.schema)
+            self._writer.write_table(table.cast(self._writer.schema))
+        self.rows += len(df)
+
+    def close(self):
+        if self.rows == 0:
+            self.write(pd.DataFrame({col: pd.Series(dtype=object) for col in self.columns}))
+        if self._writer is not None:
+            self._writer.close()
+        os.replace(self._tmp, self.path)
+
+    def abort(self):
+        if self._writer is not None:
+            self._writer.close()
+        if os.path.exists(self._tmp):
+            os.remove(self._tmp)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def _cast(values, dtype):
+    """values as `dtype`; unparseable numbers and dates become missing."""
+    if dtype == "str":
+        return values.astype("str")
+    if dtype.startswith("datetime64"):
+        return pd.to_datetime(values, errors="coerce", format="mixed").astype(dtype)
+    if dtype == "boolean":
+        return values.astype("boolean")
+    return pd.to_numeric(values, errors="coerce").astype(dtype)
+
+
+def _declared_dtypes(schema):
+    """ingest schema kinds as written dtypes: dates as datetimes, categories as strings."""
+    return {col: {"date": "datetime64[ns]", "category": "str"}.get(kind, kind) for col, kind in schema.items()}
+
+
+# Declared columns of the three exported tables
+FLAGGED_DTYPES = {**_declared_dtypes(SCHEMAS["relationships"]),
+                  "land_size_acres": "float64", "village": "str", "qty_per_acre": "float64"}
+CLUSTER_DTYPES = {"cluster_id": "int64", "member_type": "str", "member_id": "str"}
+SUMMARY_DTYPES = {"dealer_id": "str", "transactions": "int64", "total_kg": "float64",
+                  "flagged_transactions": "int64", "mean_kg_per_acre": "float64"}
+
+
+def iter_frame_chunks(df, chunk_rows=CHUNK_ROWS):
+    """Row slices of an in-memory frame, for the same streaming path as files."""
+    for start in range(0, max(len(df), 1), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+class _FarmerLookup:
+    """farmer_id hash index built once, reused for every transaction chunk."""
+
+    def __init__(self, farmers_df):
+        registry = farmers_df.drop_duplicates("farmer_id")
+        self.index = pd.Index(registry["farmer_id"])
+        self.land = np.append(registry["land_size_acres"].to_numpy(dtype="float64"), np.nan)
+        village = registry["village"].to_numpy(dtype=object) if "village" in registry.columns else np.full(len(registry), None)
+        self.village = np.append(village, None)
+
+    def __call__(self, farmer_ids):
+        pos = self.index.get_indexer(farmer_ids)
+        safe = np.where(pos >= 0, pos, len(self.index))
+        return self.land.take(safe), self.village.take(safe)
+
+
+def _summary_partial(chunk, kg_per_acre, flagged):
+    finite = np.isfinite(kg_per_acre)
+    return (
+        pd.DataFrame({
+            "dealer_id": chunk["dealer_id"].astype(object).to_numpy(),
+            "transactions": 1,
+            "total_kg": chunk["claimed_fertiliser_qty_kg"].to_numpy(dtype="float64"),
+            "flagged_transactions": flagged.astype(np.int64),
+            "kg_per_acre_sum": np.where(finite, kg_per_acre, 0.0),
+            "kg_per_acre_count": finite.astype(np.int64),
+        })
+        .groupby("dealer_id", sort=False)
+        .sum()
+    )
+
+
+def export_analysis(farmers_df, transaction_chunks, out_dir=EXPORT_DIR, fmt="parquet",
+                    threshold=HIGH_RISK_KG_PER_ACRE, dealers_df=None, progress=None):
+    """
+    Streams the full fraud analysis to files in `out_dir`.
+
+    - flagged_transactions: every transaction above `threshold` kg/acre
+    - benami_clusters: one row per member of each identity cluster
+    - dealer_summary: per-dealer totals, flagged count and mean kg/acre
+
+    `transaction_chunks` is any iterable of transaction DataFrames (e.g.
+    iter_csv_typed over a file), so only the farmer registry, one chunk and
+    the small per-dealer partials are ever in memory. Returns
+    {name: (path, rows)}.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    lookup = _FarmerLookup(farmers_df)
+    partials = []
+    dealer_pairs = []
+    paths = {name: os.path.join(out_dir, f"{name}.{fmt}") for name in ("flagged_transactions", "benami_clusters", "dealer_summary")}
+
+    with TableWriter(paths["flagged_transactions"], fmt, ["farmer_id", "claimed_fertiliser_qty_kg", "land_size_acres", "village", "qty_per_acre"], FLAGGED_DTYPES) as flagged_out:
+        for i, chunk in enumerate(transaction_chunks):
+            land, village = lookup(chunk["farmer_id"])
+            claimed = chunk["claimed_fertiliser_qty_kg"].to_numpy(dtype="float64")
+            with np.errstate(divide="ignore", invalid="ignore"):
+                kg_per_acre = claimed / land
+            flagged = kg_per_acre > threshold
+
+            if flagged.any():
+                out = chunk[flagged].copy()
+                out["land_size_acres"] = land[flagged]
+                out["village"] = village[flagged]
+                out["qty_per_acre"] = kg_per_acre[flagged]
+                flagged_out.write(out)
+            if "dealer_id" in chunk.columns:
+                partials.append(_summary_partial(chunk, kg_per_acre, flagged))
+                if "dealer_aadhar" in chunk.columns:
+                    dealer_pairs.append(chunk[["dealer_id", "dealer_aadhar"]].astype(object).drop_duplicates())
+            if progress is not None:
+                progress(i + 1)
+        flagged_rows = flagged_out.rows
+
+    # Benami clusters need the whole registry, but relations only as (dealer, aadhar) pairs
+    pairs = pd.concat(dealer_pairs, ignore_index=True).drop_duplicates() if dealer_pairs else None
+    clusters = find_identity_clusters(farmers_df, pairs, dealers_df)["clusters"]
+    with TableWriter(paths["benami_clusters"], fmt, list(CLUSTER_DTYPES), CLUSTER_DTYPES) as clusters_out:
+        for part in iter_frame_chunks(clusters, CHUNK_ROWS // 10):
+            members = pd.concat([
+                part[["cluster_id", "farmer_ids"]].explode("farmer_ids").set_axis(["cluster_id", "member_id"], axis=1).assign(member_type="farmer"),
+                part[["cluster_id", "dealer_ids"]].explode("dealer_ids").set_axis(["cluster_id", "member_id"], axis=1).assign(member_type="dealer"),
+            ]).dropna(subset=["member_id"]).sort_values("cluster_id", kind="stable")
+            members["member_id"] = members["member_id"].astype(str)
+            if len(members):
+                clusters_out.write(members[["cluster_id", "member_type", "member_id"]])
+        cluster_rows = clusters_out.rows
+
+    with TableWriter(paths["dealer_summary"], fmt, list(SUMMARY_DTYPES), SUMMARY_DTYPES) as summary_out:
+        if partials:
+            summary = pd.concat(partials).groupby(level=0, sort=False).sum()
+            summary["mean_kg_per_acre"] = summary["kg_per_acre_sum"] / summary["kg_per_acre_count"].replace(0, np.nan)
+            summary = (
+                summary.drop(columns=["kg_per_acre_sum", "kg_per_acre_count"])
+                .sort_values("flagged_transactions", ascending=False, kind="stable")
+                .reset_index()
+            )
+            for part in iter_frame_chunks(summary):
+                summary_out.write(part)
+        summary_rows = summary_out.rows
+
+    return {
+        "flagged_transactions": (paths["flagged_transactions"], flagged_rows),
+        "benami_clusters": (paths["benami_clusters"], cluster_rows),
+        "dealer_summary": (paths["dealer_summary"], summary_rows),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream AgriGuard fraud analysis results to Parquet/CSV.")
+    parser.add_argument("--farmers", default="government_farmers.csv")
+    parser.add_argument("--relations", default="dealer_farmer_relationships.csv")
+    parser.add_argument("--dealers", default=None, help="optional government_dealers.csv (adds registered aadhar numbers)")
+    parser.add_argument("--out", default=EXPORT_DIR)
+    parser.add_argument("--format", choices=FORMATS, default="parquet")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--threshold", type=float, default=HIGH_RISK_KG_PER_ACRE)
+    args = parser.parse_args(argv)
+
+    farmers_df = read_csv_typed(args.farmers, "farmers")
+    dealers_df = read_csv_typed(args.dealers, "dealers") if args.dealers else None
+    chunks = iter_csv_typed(args.relations, "relationships", chunk_rows=args.chunk_rows)
+    results = export_analysis(farmers_df, chunks, args.out, args.format, args.threshold, dealers_df,
+                              progress=lambda n: print(f"  processed {n} chunk(s)", end="\r"))
+    print()
+    for name, (path, rows) in results.items():
+        print(f"✅ {name}: {rows:,} rows -> {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# farmer_index.py
+
+import re
+
+import numpy as np
+import pandas as pd
+
+_FARMER_NUMBER = re.compile(r"(?:FAR)?[\s\-_]*0*(\d+)")
+
+
+def _digits_key(raw):
+    """Digit-only key for FAR-prefixed or numeric IDs ("FAR010000" -> "10000"), else None."""
+    match = _FARMER_NUMBER.fullmatch(str(raw).strip().upper())
+    return match.group(1) if match else None
+
+
+def farmer_search_keys(raw_input):
+    """Normalized lookup keys for a typed farmer ID, most specific first.
+
+    "far 010000", "FAR010000", "10000" and 10000 all reduce to the same
+    digit-only key, so FAR-prefixed and plain numeric registries both match.
+    Other prefixes (e.g. "FAKEFAR00001") only ever match exactly.
+    """
+    raw = str(raw_input).strip()
+    keys = [raw.upper().replace(" ", "")]
+    digits = _digits_key(raw)
+    if digits is not None and digits != keys[0]:
+        keys.append(digits)
+    return keys
+
+
+def build_farmer_index(farmers_df, transactions_df):
+    """
+    Search index built once per dataset.
+
+    - "positions": normalized ID -> farmer row position (exact IDs always
+      win over digit-only keys; the first registry row wins on duplicates)
+    - "tx_order" / "tx_start": transactions grouped by farmer, so the rows of
+      farmer p are transactions_df.iloc[tx_order[tx_start[p]:tx_start[p + 1]]]
+    """
+    farmer_ids = farmers_df["farmer_id"].astype(str).str.strip().to_numpy()
+
+    positions = {}
+    for pos, fid in enumerate(farmer_ids):
+        digits = _digits_key(fid)
+        if digits is not None:
+            positions.setdefault(digits, pos)
+    for pos in range(len(farmer_ids) - 1, -1, -1):  # exact keys override digit keys
+        positions[farmer_ids[pos].upper().replace(" ", "")] = pos
+
+    # Group transactions by farmer position with one stable sort
+    unique = ~pd.Series(farmer_ids).duplicated().to_numpy()
+    first_pos = np.flatnonzero(unique)
+    codes = pd.Index(farmer_ids[unique]).get_indexer(
+        transactions_df["farmer_id"].astype(str).str.strip()
+    )
+    codes = np.where(codes >= 0, first_pos[np.maximum(codes, 0)], -1)
+
+    known = codes >= 0
+    tx_order = np.flatnonzero(known)[np.argsort(codes[known], kind="stable")]
+    counts = np.bincount(codes[known], minlength=len(farmer_ids))
+    tx_start = np.concatenate(([0], np.cumsum(counts)))
+
+    return {"positions": positions, "tx_order": tx_order, "tx_start": tx_start}
+
+
+def find_farmer_position(index, raw_input):
+    """Returns (row position or None, keys tried) in O(1)."""
+    keys = farmer_search_keys(raw_input)
+    for key in keys:
+        pos = index["positions"].get(key)
+        if pos is not None:
+            return pos, keys
+    return None, keys
+
+
+def farmer_transaction_rows(index, pos):
+    """Row positions in transactions_df belonging to the farmer at `pos`."""
+    start, end = index["tx_start"][pos], index["tx_start"][pos + 1]
+    return index["tx_order"][start:end]
+
+
+def lookup_farmer_columns(transactions_df, farmers_df, columns=("land_size_acres", "village")):
+    """Indexed left-join: pulls only `columns` from farmers_df for each transaction.
+
+    Resolves each transaction's farmer_id to a row position once (hash index,
+    first registry row wins on duplicate IDs) and gathers the requested columns
+    with take(), instead of merging every farmer column into the transactions.
+    Unknown farmers get NaN. Returns {column: array aligned with transactions_df}.
+    """
+    farmer_ids = farmers_df["farmer_id"]
+    keep = ~farmer_ids.duplicated().to_numpy()
+    positions = pd.Index(farmer_ids[keep]).get_indexer(transactions_df["farmer_id"])
+    missing = positions < 0
+    positions = np.where(missing, 0, positions)
+
+    looked_up = {}
+    for col in columns:
+        if col not in farmers_df.columns:
+            continue
+        values = farmers_df[col].to_numpy()[keep]
+        if len(values) == 0:
+            looked_up[col] = np.full(len(positions), np.nan)
+            continue
+        taken = values.take(positions)
+        if missing.any():
+            taken = taken.astype("float64" if taken.dtype.kind in "iufb" else object)
+            taken[missing] = np.nan
+        looked_up[col] = taken
+    return looked_up
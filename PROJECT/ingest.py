@@ -0,0 +1,219 @@
+# ingest.py
+
+import hashlib
+import os
+import tempfile
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+CHUNK_ROWS = 250_000  # Rows parsed per CSV chunk
+CACHE_DIR = os.path.join(tempfile.gettempdir(), "agriguard_ingest")  # Columnar copies of uploads
+CACHE_MAX_FILES = 16  # Cached uploads kept; the least recently loaded are removed beyond this
+
+# Declared schemas for the three government files ("date" = parsed to datetime64)
+SCHEMAS = {
+    "farmers": {
+        "farmer_id": "str", "aadhar_no": "str", "phone_no": "str",
+        "village": "category", "land_size_acres": "float64",
+        "kharif_crop": "category", "rabi_crop": "category",
+        "irrigation_type": "category", "soil_type": "category",
+        "last_subsidy_date": "date", "farm_category": "category",
+    },
+    "dealers": {
+        "dealer_id": "str", "aadhar_no": "str", "dealer_name": "str",
+        "village": "category", "license_active": "boolean", "license_expiry": "date",
+    },
+    "relationships": {
+        "dealer_id": "category", "dealer_aadhar": "category", "farmer_id": "str",
+        "relationship_date": "date", "date": "date", "transaction_id": "str",
+        "claimed_fertiliser_qty_kg": "float64", "relationship_status": "category",
+        "max_allowed_txns_per_year": "Int32", "fraud_label": "category",
+    },
+}
+
+# A file is recognised by the columns only it carries
+SIGNATURES = {
+    "relationships": {"dealer_id", "farmer_id", "claimed_fertiliser_qty_kg"},
+    "farmers": {"farmer_id", "land_size_acres"},
+    "dealers": {"dealer_id", "license_active"},
+}
+
+
+def normalize_column(col):
+    return str(col).strip().replace(" ", "_").lower()
+
+
+def detect_schema(columns):
+    """Schema name for a set of (normalized) column names, or None."""
+    columns = set(columns)
+    for name, required in SIGNATURES.items():
+        if required <= columns:
+            return name
+    return None
+
+
+def _read_dtypes(raw_columns, schema):
+    """read_csv dtypes keyed by the file's own header; dates and categories are read as str."""
+    dtypes = {}
+    for raw in raw_columns:
+        kind = schema.get(normalize_column(raw))
+        if kind is None:
+            continue
+        dtypes[raw] = "str" if kind in ("date", "category") else kind
+    return dtypes
+
+
+def _apply_schema(df, schema):
+    """Normalizes column names and converts dates/categories (read as str) in place."""
+    df.columns = [normalize_column(c) for c in df.columns]
+    for col, kind in schema.items():
+        if col not in df.columns:
+            continue
+        if kind == "date":
+            df[col] = pd.to_datetime(df[col], errors="coerce", format="mixed")
+        elif kind == "category":
+            df[col] = df[col].astype("category")
+    return df
+
+
+def _concat_chunks(chunks):
+    """Concatenates chunks, unioning categories so categoricals stay categorical."""
+    if len(chunks) == 1:
+        return chunks[0]
+    columns = {}
+    for col in chunks[0].columns:
+        if isinstance(chunks[0][col].dtype, pd.CategoricalDtype):
+            columns[col] = pd.Series(union_categoricals([c[col] for c in chunks]))
+        else:
+            columns[col] = pd.concat([c[col] for c in chunks], ignore_index=True)
+    return pd.DataFrame(columns)
+
+
+def iter_csv_typed(source, schema_name=None, chunk_rows=CHUNK_ROWS, progress=None, total_bytes=None):
+    """
+    Chunked, typed CSV parsing as a generator of DataFrames.
+
+    The header is read first to pick the schema (explicit or detected), then
+    the file is parsed `chunk_rows` at a time with declared dtypes, so no
+    column is ever materialized as generic objects. `progress(fraction)` is
+    called after every chunk when the total size is known.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as handle:
+            yield from iter_csv_typed(handle, schema_name, chunk_rows, progress, os.path.getsize(source))
+        return
+
+    header = pd.read_csv(source, nrows=0).columns
+    source.seek(0)
+    name = schema_name or detect_schema(normalize_column(c) for c in header)
+    schema = SCHEMAS.get(name, {})
+
+    empty = True
+    for chunk in pd.read_csv(source, dtype=_read_dtypes(header, schema), chunksize=chunk_rows):
+        empty = False
+        if progress is not None and total_bytes:
+            progress(min(source.tell() / total_bytes, 1.0))
+        yield _apply_schema(chunk, schema)
+    if progress is not None:
+        progress(1.0)
+    if empty:
+        yield _apply_schema(pd.DataFrame(columns=header), schema)
+
+
+def read_csv_typed(source, schema_name=None, chunk_rows=CHUNK_ROWS, progress=None, total_bytes=None):
+    """Whole file through iter_csv_typed, categories unioned across chunks."""
+    return _concat_chunks(list(iter_csv_typed(source, schema_name, chunk_rows, progress, total_bytes)))
+
+
+def read_excel_typed(source, schema_name=None):
+    df = pd.read_excel(source, dtype=str)
+    name = schema_name or detect_schema(normalize_column(c) for c in df.columns)
+    schema = SCHEMAS.get(name, {})
+    numeric = {c: kind for c, kind in schema.items() if kind not in ("str", "date", "category")}
+    df.columns = [normalize_column(c) for c in df.columns]
+    for col, kind in numeric.items():
+        if col in df.columns:
+            if kind == "boolean":
+                df[col] = df[col].str.strip().str.lower().map({"true": True, "false": False}).astype("boolean")
+            else:
+                df[col] = pd.to_numeric(df[col], errors="coerce").astype(kind)
+    return _apply_schema(df, {c: k for c, k in schema.items() if c not in numeric})
+
+
+def content_hash(file, block_size=1 << 20):
+    """SHA-1 of an uploaded file's bytes, read in blocks."""
+    h = hashlib.sha1()
+    file.seek(0)
+    for block in iter(lambda: file.read(block_size), b""):
+        h.update(block)
+    file.seek(0)
+    return h.hexdigest()
+
+
+def load_upload(file, progress=None, cache_dir=CACHE_DIR, digest=None, max_files=CACHE_MAX_FILES):
+    """
+    Loads an uploaded CSV/XLSX with the declared schemas.
+
+    The parsed result is written once to a Parquet file named after the
+    upload's content hash; later loads of the same bytes read that columnar
+    copy instead of parsing again. The cache is best effort: without
+    pyarrow, or when a frame cannot be written (e.g. a column mixing ints
+    and strings), the upload is just parsed every time. At most
+    `max_files` copies are kept, least recently loaded removed first.
+    `digest` is the precomputed content_hash, if the caller already has it.
+    """
+    digest = digest or content_hash(file)
+    cached = os.path.join(cache_dir, f"{digest}.parquet")
+    if os.path.exists(cached):
+        try:
+            df = pd.read_parquet(cached)
+            os.utime(cached)  # most recently used
+        except Exception:
+            df = None  # unreadable or removed meanwhile: parse again
+        if df is not None:
+            if progress is not None:
+                progress(1.0)
+            return df
+
+    if file.name.endswith(".csv"):
+        df = read_csv_typed(file, progress=progress, total_bytes=getattr(file, "size", None))
+    elif file.name.endswith(".xlsx"):
+        df = read_excel_typed(file)
+        if progress is not None:
+            progress(1.0)
+    else:
+        raise ValueError(f"Unsupported file type: {file.name}")
+
+    _write_cache(df, cached, max_files)
+    return df
+
+
+def _write_cache(df, cached, max_files):
+    """Writes the Parquet copy through a private temp file, then trims the cache. Never raises."""
+    tmp = None
+    try:
+        cache_dir = os.path.dirname(cached)
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        os.close(fd)
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, cached)
+        tmp = None
+        _trim_cache(cache_dir, max_files)
+    except Exception:
+        pass  # the cache is optional: the parsed frame is returned either way
+    finally:
+        if tmp is not None and os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _trim_cache(cache_dir, max_files):
+    """Removes the least recently used Parquet copies beyond max_files."""
+    paths = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir) if name.endswith(".parquet")]
+    paths.sort(key=lambda path: os.path.getmtime(path), reverse=True)
+    for path in paths[max_files:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass  # removed by another process
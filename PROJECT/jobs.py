@@ -0,0 +1,193 @@
+# jobs.py
+
+import collections
+import threading
+import time
+import uuid
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_WORKERS = 2        # Analyses running at once per process
+MAX_RESULTS = 8        # Finished results kept (one per dataset fingerprint)
+SLOT_TTL_SECONDS = 30 * 60  # A slot not seen for this long is released (its session is gone)
+
+
+class JobCancelled(Exception):
+    """Raised inside a job's progress callback once the job has been cancelled."""
+
+
+class Job:
+    """
+    One background analysis run.
+
+    The job function receives `progress(fraction, message=None, partial=None)`
+    and should call it between steps: that is where progress and partial
+    results are published and where a cancelled job stops (JobCancelled).
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.status = "running"  # running | done | failed | cancelled
+        self.progress = 0.0
+        self.message = "Queued"
+        self.partial = None
+        self.result = None
+        self.error = None
+        self.slots = set()
+        self._cancel = threading.Event()
+
+    @property
+    def done(self):
+        return self.status == "done"
+
+    @property
+    def finished(self):
+        return self.status != "running"
+
+    def report(self, fraction, message=None, partial=None):
+        if self._cancel.is_set():
+            raise JobCancelled(self.key)
+        self.progress = min(max(float(fraction), 0.0), 1.0)
+        if message is not None:
+            self.message = message
+        if partial is not None:
+            self.partial = partial
+
+    def cancel(self):
+        self._cancel.set()
+
+
+class JobManager:
+    """
+    Runs analyses on a thread pool, one job per input key (dataset fingerprint).
+
+    A "slot" is one consumer, e.g. a browser session. Submitting a new key
+    for a slot detaches it from its previous job, and a running job with no
+    slots left is cancelled. Sessions asking for the same key share one job,
+    and finished results are kept per key so a rerun renders them at once.
+    A failed job is not kept: each slot that waited for it gets it back on
+    its next submit of that key, and the submit after that runs it again.
+    `previous(slot)` is the last finished result the slot saw, for showing
+    something while a new job runs.
+
+    Slots end with `release` (see SlotLease) or after slot_ttl seconds
+    without a submit; either way the slot leaves its running job (which is
+    cancelled if nobody else waits for it) and its previous result is
+    dropped. Releases are applied on the next submit.
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS, max_results=MAX_RESULTS, slot_ttl=SLOT_TTL_SECONDS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis")
+        self._lock = threading.Lock()
+        self._running = {}   # key -> Job
+        self._finished = {}  # key -> done Job, oldest first
+        self._failed = {}    # slot -> failed Job it waited for, returned once
+        self._slots = {}     # slot -> key
+        self._previous = {}  # slot -> last done Job
+        self._seen = {}      # slot -> time.monotonic() of its last submit
+        self._released = collections.deque()  # slots to drop on the next submit
+        self.max_results = max_results
+        self.slot_ttl = slot_ttl
+
+    def release(self, slot):
+        """Marks a slot as ended. Takes no lock, so it is safe from finalizers and other threads."""
+        self._released.append(slot)
+
+    def submit(self, slot, key, fn, *args, **kwargs):
+        with self._lock:
+            now = time.monotonic()
+            self._drop_slots(now)
+            self._seen[slot] = now
+            old_key = self._slots.get(slot)
+            if old_key != key:
+                self._detach(slot, old_key)
+                self._slots[slot] = key
+
+            failed = self._failed.pop(slot, None)
+            if failed is not None and failed.key == key:
+                return failed
+
+            if key in self._finished:
+                job = self._finished.pop(key)
+                self._finished[key] = job  # most recently used
+                self._previous[slot] = job
+                return job
+
+            job = self._running.get(key)
+            if job is None:
+                job = Job(key)
+                self._running[key] = job
+                self._executor.submit(self._run, job, fn, args, kwargs)
+            job.slots.add(slot)
+            return job
+
+    def previous(self, slot):
+        """Last finished job this slot was shown (any key), or None."""
+        return self._previous.get(slot)
+
+    @property
+    def slots(self):
+        """Slots currently tracked."""
+        return len(self._seen)
+
+    def _drop_slots(self, now):
+        ended = set()
+        while self._released:
+            ended.add(self._released.popleft())
+        ended.update(slot for slot, seen in self._seen.items() if now - seen > self.slot_ttl)
+        for slot in ended:
+            self._detach(slot, self._slots.pop(slot, None))
+            self._previous.pop(slot, None)
+            self._failed.pop(slot, None)
+            self._seen.pop(slot, None)
+
+    def _detach(self, slot, key):
+        job = self._running.get(key)
+        if job is None:
+            return
+        job.slots.discard(slot)
+        if not job.slots:
+            job.cancel()
+            del self._running[key]
+
+    def _run(self, job, fn, args, kwargs):
+        try:
+            job.report(0.0, "Running")
+            result = fn(*args, progress=job.report, **kwargs)
+        except JobCancelled:
+            job.status = "cancelled"
+            return
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        else:
+            job.result = result
+            job.progress = 1.0
+            job.message = "Done"
+            job.status = "done"
+
+        with self._lock:
+            if self._running.get(job.key) is job:
+                del self._running[job.key]
+            if job.done:
+                self._finished[job.key] = job
+                while len(self._finished) > self.max_results:
+                    self._finished.pop(next(iter(self._finished)))
+                for slot in job.slots:
+                    self._previous[slot] = job
+            else:
+                for slot in job.slots:
+                    self._failed[slot] = job
+            job.slots.clear()
+
+
+class SlotLease:
+    """
+    A fresh slot of a JobManager, released when this object is garbage
+    collected. Kept in a browser session's state, the slot ends with the
+    session.
+    """
+
+    def __init__(self, manager):
+        self.slot = uuid.uuid4().hex
+        weakref.finalize(self, manager.release, self.slot)
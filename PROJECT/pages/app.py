@@ -94,7 +94,7 @@ if submitted:
         # ---------------- AUDIT LOG ----------------
         with st.expander("📋 Input Summary"):
             params_table = {
-                "Parameter": ["Farmer ID", "Dealer ID", "Village", "Crop", "Soil Type", "Land Size"],
-                "Value": [fid, did, vil, cr, soil, f"{land_input} acres"]
+                "Parameter": ["Farmer ID", "Dealer ID", "Village", "Crop", "Soil Type", "Land Size", "Registry Version"],
+                "Value": [fid, did, vil, cr, soil, f"{land_input} acres", str(result["Registry_Version"])]
             }
             st.table(params_table)
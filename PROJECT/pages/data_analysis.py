@@ -3,8 +3,23 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime, timedelta
+from datetime import datetime
 import re
+import os
+
+from benami import find_identity_clusters
+from chart_data import build_chart_data
+from cohort_scores import OUTLIER_Z, score_cohorts
+from datastore import DatasetStore
+from dealer_graph import analyze_dealer_network
+from export import EXPORT_DIR, FORMATS, export_analysis, iter_frame_chunks
+from farmer_index import build_farmer_index, find_farmer_position, farmer_transaction_rows, lookup_farmer_columns
+from fingerprint import dataset_fingerprint
+from ingest import content_hash, load_upload
+from jobs import JobManager, SlotLease
+from paging import PAGE_SIZES, SORTABLE_COLUMNS, FlaggedTable
+from topk import TopKAccumulator, top_k
+from velocity import DEALER_MAX_CLAIMS, FARMER_MAX_CLAIMS, WINDOW_DAYS, velocity_report
 
 # --- PAGE CONFIG ---
 st.set_page_config(
@@ -15,159 +30,300 @@ st.set_page_config(
 )
 
 # --- DATA LOADING ---
-def load_data(file):
-    if file is not None:
+@st.cache_resource(show_spinner=False)
+def get_dataset_store():
+    """Process-wide store of parsed uploads, shared by all sessions (keyed by content hash)."""
+    return DatasetStore()
+
+
+def _parse_upload(file, digest):
+    """Typed, chunked parse of one upload, with a progress bar."""
+    bar = st.progress(0.0, text=f"Loading {file.name}...")
+    df = load_upload(file, progress=lambda fraction: bar.progress(fraction, text=f"Loading {file.name}... {fraction:.0%}"), digest=digest)
+    bar.empty()
+    return df
+
+
+def load_data(file, role):
+    """The upload's shared, read-only frame; the session keeps only a handle to it."""
+    key = f"dataset_{role}"
+    if file is None:
+        st.session_state.pop(key, None)  # releases this session's reference
+        return None
+    handle = st.session_state.get(key)
+    if handle is None or handle.source_id != file.file_id:
         try:
-            if file.name.endswith('.csv'):
-                df = pd.read_csv(file)
-            elif file.name.endswith('.xlsx'):
-                df = pd.read_excel(file)
-            else:
-                st.error(f"Unsupported file type: {file.name}")
-                return None
-            
-            df.columns = [col.strip().replace(' ', '_').lower() for col in df.columns]
-            return df
+            digest = content_hash(file)
+            st.session_state[key] = handle = get_dataset_store().acquire(digest, lambda: _parse_upload(file, digest), file.file_id)
         except Exception as e:
+            st.session_state.pop(key, None)
             st.error(f"Error loading {file.name}: {e}")
             return None
-    return None
+    return handle.frame
 
 # --- LARGE SCALE DATA GENERATION (10k Farmers) ---
-def create_sample_datasets():
-    """Generates 10,000 farmers and ensures FAR010000 is always a valid test case."""
-    np.random.seed(42)
-    
-    # Configuration
-    N_FARMERS = 10000
-    N_DEALERS = 200
-    N_TRANSACTIONS = 20000
+@st.cache_resource(show_spinner=False)
+def create_sample_datasets(n_farmers=10000, n_dealers=200, n_transactions=20000, seed=42):
+    """Generates the sample registry with NumPy only (no per-row Python loops).
+
+    Cached process-wide by (n_farmers, n_dealers, n_transactions, seed), so new
+    sessions and browser tabs reuse the same frames. Treat the result as read-only.
+    The last farmer (FAR010000 with the defaults) is always a valid test case.
+    """
+    rng = np.random.default_rng(seed)
     
-    villages = ['Rampur', 'Keshavpur', 'GreenVillage', 'Sonpur', 'Lakhanpur', 'Madhopur', 'Bishanpur']
-    crops = ['Paddy', 'Jowar', 'Bajra', 'Wheat', 'Maize']
+    villages = np.array(['Rampur', 'Keshavpur', 'GreenVillage', 'Sonpur', 'Lakhanpur', 'Madhopur', 'Bishanpur'], dtype=object)
+    crops = np.array(['Paddy', 'Jowar', 'Bajra', 'Wheat', 'Maize'], dtype=object)
     
     # 1. Generate Farmers
-    farmers_df = pd.DataFrame({
-        'farmer_id': [f'FAR{i:06d}' for i in range(1, N_FARMERS + 1)],
-        'village': np.random.choice(villages, N_FARMERS),
-        'land_size_acres': np.round(np.random.uniform(0.5, 15, N_FARMERS), 2),
-        'kharif_crop': np.random.choice(crops, N_FARMERS),
-        'phone_no': ['9' + str(np.random.randint(100000000, 999999999)).zfill(9) for _ in range(N_FARMERS)]
-    })
+    farmer_ids = _make_ids('FAR', n_farmers, 6)
+    land_sizes = np.round(rng.uniform(0.5, 15, n_farmers), 2)
+    phones = np.char.add('9', rng.integers(100000000, 999999999, n_farmers).astype(str)).astype(object)
+    farmer_village = villages[rng.integers(0, len(villages), n_farmers)]
     
-    # --- TEST CASE INJECTION: Make FAR010000 interesting ---
+    # --- TEST CASE INJECTION: Make the last farmer interesting ---
     # We force the last farmer (FAR010000) to have specific details for testing
-    idx_10k = N_FARMERS - 1
-    farmers_df.at[idx_10k, 'village'] = 'TestVillage'
-    farmers_df.at[idx_10k, 'land_size_acres'] = 2.0  # Small land
-    farmers_df.at[idx_10k, 'phone_no'] = '9999999999' # Shared phone number trigger
+    idx_last = n_farmers - 1
+    farmer_village[idx_last] = 'TestVillage'
+    land_sizes[idx_last] = 2.0  # Small land
+    phones[idx_last] = '9999999999'  # Shared phone number trigger
     
     # Create another farmer sharing this phone number to trigger Benami
-    farmers_df.at[idx_10k - 1, 'phone_no'] = '9999999999' 
+    if n_farmers > 1:
+        phones[idx_last - 1] = '9999999999'
+    
+    farmers_df = pd.DataFrame({
+        'farmer_id': farmer_ids,
+        'village': farmer_village,
+        'land_size_acres': land_sizes,
+        'kharif_crop': crops[rng.integers(0, len(crops), n_farmers)],
+        'phone_no': phones
+    })
 
     # 2. Generate Dealers
+    dealer_ids = _make_ids('DEA', n_dealers, 4)
     dealers_df = pd.DataFrame({
-        'dealer_id': [f'DEA{i:04d}' for i in range(1, N_DEALERS + 1)],
-        'village': np.random.choice(villages, N_DEALERS)
+        'dealer_id': dealer_ids,
+        'village': villages[rng.integers(0, len(villages), n_dealers)]
     })
     
-    # 3. Generate Transactions
-    t_farmer_ids = np.random.choice(farmers_df['farmer_id'], N_TRANSACTIONS)
-    t_dealer_ids = np.random.choice(dealers_df['dealer_id'], N_TRANSACTIONS)
+    # 3. Generate Transactions (farmers/dealers picked by position, so no ID lookups)
+    t_farmer_idx = rng.integers(0, n_farmers, n_transactions)
+    t_dealer_idx = rng.integers(0, n_dealers, n_transactions)
     
-    # Ensure FAR010000 has transactions
+    # Ensure the test farmer has transactions
     # We replace the last 5 transactions with FAR010000
-    t_farmer_ids[-5:] = 'FAR010000'
+    t_farmer_idx[-5:] = idx_last
     
-    land_map = dict(zip(farmers_df['farmer_id'], farmers_df['land_size_acres']))
-    t_land_sizes = np.array([land_map[fid] for fid in t_farmer_ids])
+    t_qtys = (land_sizes[t_farmer_idx] * 200 * rng.uniform(0.8, 1.2, n_transactions)).round(0)
     
-    t_qtys = (t_land_sizes * 200 * np.random.uniform(0.8, 1.2, N_TRANSACTIONS)).round(0)
-    
-    # Inject Fraud: Make FAR010000 overclaim massively
-    # Since FAR010000 is at the end (-5:), we multiply those quantities
+    # Inject Fraud: Make the test farmer overclaim massively
     t_qtys[-5:] = t_qtys[-5:] * 10  # 10x normal amount -> High Risk
     
+    today = np.datetime64(datetime.today().date(), 'D')
+    t_dates = today - rng.integers(0, 365, n_transactions).astype('timedelta64[D]')
+    
     transactions_df = pd.DataFrame({
-        'transaction_id': [f'TXN{i:06d}' for i in range(1, N_TRANSACTIONS + 1)],
-        'date': [
-            (datetime.today() - timedelta(days=np.random.randint(0, 365))).strftime('%Y-%m-%d')
-            for _ in range(N_TRANSACTIONS)
-        ],
-        'dealer_id': t_dealer_ids,
-        'farmer_id': t_farmer_ids,
+        'transaction_id': _make_ids('TXN', n_transactions, 6),
+        'date': np.datetime_as_string(t_dates, unit='D').astype(object),
+        'dealer_id': dealer_ids[t_dealer_idx],
+        'farmer_id': farmer_ids[t_farmer_idx],
         'claimed_fertiliser_qty_kg': t_qtys
     })
     
     return farmers_df, dealers_df, transactions_df
 
+
+def _make_ids(prefix, n, width):
+    """Vectorized f'{prefix}{i:0{width}d}' for i in 1..n."""
+    numbers = np.char.zfill(np.arange(1, n + 1).astype(str), width)
+    return np.char.add(prefix, numbers).astype(object)
+
 # --- FRAUD DETECTION LOGIC ---
-def detect_fraud_patterns(farmers_df, transactions_df):
-    results = {'high_risk': [], 'warnings': [], 'stats': {}}
+ANALYSIS_CHUNK_ROWS = 250_000  # Transactions scored between progress updates
+
+def _no_progress(fraction, message=None, partial=None):
+    pass
+
+def _fraud_stats(stats):
+    return {
+        'total_high_risk': stats['flagged'],
+        'avg_qty_per_acre': np.round(stats['mean'], 1),
+        'max_qty_per_acre': np.round(stats['max'], 1)
+    }
+
+def detect_fraud_patterns(farmers_df, transactions_df, progress=_no_progress):
+    """Top high-risk transactions, kg/acre stats and Benami clusters.
+
+    Runs as a background job: `progress` is called after every chunk with the
+    top-k so far as a partial result (and stops the run once cancelled).
+    """
+    results = {'high_risk': [], 'benami_clusters': [], 'benami_labels': None, 'stats': {}}
     
-    try:
-        merged = pd.merge(transactions_df, farmers_df, on='farmer_id', how='left')
+    if not transactions_df.empty and 'land_size_acres' in farmers_df.columns and 'claimed_fertiliser_qty_kg' in transactions_df.columns:
+        progress(0.0, "Looking up farmers")
+        farmer_cols = lookup_farmer_columns(transactions_df, farmers_df)
+        land = farmer_cols['land_size_acres'].astype('float64')
+        claimed = transactions_df['claimed_fertiliser_qty_kg'].to_numpy(dtype='float64')
         
-        if not merged.empty and 'land_size_acres' in merged.columns and 'claimed_fertiliser_qty_kg' in merged.columns:
-            merged['qty_per_acre'] = merged['claimed_fertiliser_qty_kg'] / merged['land_size_acres']
-            high_risk = merged[merged['qty_per_acre'] > 1500].copy()
-            
-            display_cols = ['farmer_id', 'dealer_id', 'claimed_fertiliser_qty_kg', 'land_size_acres', 'qty_per_acre', 'village']
-            display_cols = [c for c in display_cols if c in high_risk.columns]
-            
-            results['high_risk'] = high_risk[display_cols].sort_values('qty_per_acre', ascending=False).head(50).to_dict('records')
-            
-            results['stats'] = {
-                'total_high_risk': len(high_risk),
-                'avg_qty_per_acre': merged['qty_per_acre'].mean().round(1),
-                'max_qty_per_acre': merged['qty_per_acre'].max().round(1)
-            }
+        # Only the display columns are materialized, never the full farmer record
+        scored = {'farmer_id': transactions_df['farmer_id'].to_numpy()}
+        if 'dealer_id' in transactions_df.columns:
+            scored['dealer_id'] = transactions_df['dealer_id'].to_numpy()
+        scored['claimed_fertiliser_qty_kg'] = claimed
+        scored['land_size_acres'] = land
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scored['qty_per_acre'] = claimed / land
+        if 'village' in farmer_cols:
+            scored['village'] = farmer_cols['village']
+        scored = pd.DataFrame(scored)
         
-        if 'phone_no' in farmers_df.columns:
-            phone_counts = farmers_df['phone_no'].value_counts()
-            duplicate_phones = phone_counts[phone_counts > 1]
-            results['warnings'] = duplicate_phones.head(10).to_dict()
-            
-    except Exception as e:
-        st.error(f"Analysis error: {str(e)}")
+        # Partial top-50 selection chunk by chunk; count and stats come from the same pass
+        acc = TopKAccumulator('qty_per_acre', k=50, threshold=1500)
+        for start in range(0, len(scored), ANALYSIS_CHUNK_ROWS):
+            acc.update(scored.iloc[start:start + ANALYSIS_CHUNK_ROWS])
+            done = min(start + ANALYSIS_CHUNK_ROWS, len(scored))
+            results['high_risk'] = acc.top().to_dict('records')
+            results['stats'] = _fraud_stats(acc.stats())
+            progress(0.7 * done / len(scored), f"Scored {done:,} of {len(scored):,} transactions", dict(results))
     
+    # Benami: farmers linked (even transitively) by shared phone/aadhar/dealer_aadhar
+    progress(0.7, "Clustering shared identities")
+    benami = find_identity_clusters(farmers_df, transactions_df,
+                                    progress=lambda fraction, message: progress(0.7 + 0.3 * fraction, message))
+    results['benami_labels'] = benami['labels']
+    results['benami_clusters'] = benami['clusters'].to_dict('records')
     return results
 
+@st.cache_resource(show_spinner=False)
+def get_analysis_jobs():
+    """Process-wide background job runner shared by all sessions."""
+    return JobManager()
+
+@st.fragment(run_every=1.0)
+def show_analysis_progress(job):
+    """Polls a running analysis job; reruns the whole page once it has finished."""
+    if job.finished:
+        st.rerun()
+    st.progress(job.progress, text=f"⏳ {job.message}")
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def cached_farmer_index(fingerprint, _farmers_df, _transactions_df):
+    """Farmer search index, built once per dataset fingerprint and shared by all sessions."""
+    return build_farmer_index(_farmers_df, _transactions_df)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def cached_dealer_network(fingerprint, _transactions_df, _dealers_df, _farmers_df):
+    """Dealer–farmer graph analytics, memoized on the dataset fingerprint."""
+    return analyze_dealer_network(_transactions_df, _dealers_df, _farmers_df)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def cached_cohort_outliers(fingerprint, _farmers_df, _transactions_df, k=50):
+    """Robust per-cohort z-scores; only the summary and top-k rows are cached."""
+    scored, cohort_stats = score_cohorts(_transactions_df, _farmers_df)
+    top, stats = top_k(scored, 'robust_z', k=k, threshold=OUTLIER_Z)
+    return {
+        'top': top.round(2),
+        'outliers': stats['flagged'],
+        'cohorts': len(cohort_stats),
+        'fallback_cohorts': int(cohort_stats['global_fallback'].sum()),
+    }
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def cached_velocity(fingerprint, _transactions_df, window_days, farmer_max_claims, dealer_max_claims):
+    """Claim-burst report, memoized on the dataset fingerprint and thresholds."""
+    return velocity_report(_transactions_df, window_days=window_days,
+                           farmer_max_claims=farmer_max_claims, dealer_max_claims=dealer_max_claims)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def cached_chart_data(fingerprint, _farmers_df, _transactions_df):
+    """Pre-aggregated, downsampled chart inputs (bounded size whatever the row count)."""
+    return build_chart_data(_farmers_df, _transactions_df)
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def cached_flagged_table(fingerprint, _farmers_df, _transactions_df):
+    """Every flagged transaction plus lazily cached sort orders, shared by all sessions."""
+    return FlaggedTable(_farmers_df, _transactions_df)
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def cached_component_scores(registry_version, _registry):
+    """Kiosk rule hits for every claim in one registry snapshot, computed once per version."""
+    from evaluate import build_requests
+    from whatif import ComponentScores
+    return ComponentScores.from_requests(build_requests(_registry.farmers, _registry.relations), _registry)
+
+@st.fragment
+def show_whatif_panel(components):
+    """Threshold/weight controls; changing one re-decides every claim without rerunning the page."""
+    import risk_engine
+    t1, t2, t3 = st.columns(3)
+    thresholds = {}
+    for col, label in zip((t1, t2, t3), risk_engine.DECISION_THRESHOLDS):
+        with col:
+            thresholds[label] = st.slider(f"{label} above score", 0, 300, int(risk_engine.DECISION_THRESHOLDS[label]), key=f"whatif_threshold_{label}")
+    weights, bands = {}, []
+    with st.expander("Rule weights and fertilizer bands"):
+        w_cols = st.columns(3)
+        for i, (reason, points) in enumerate(zip(components.rules, components.points)):
+            with w_cols[i % 3]:
+                weights[reason] = st.number_input(reason, 0, 200, int(points), key=f"whatif_weight_{i}")
+        b_cols = st.columns(len(risk_engine.QUANTITY_BANDS))
+        for i, (reason, op, limit, points) in enumerate(risk_engine.QUANTITY_BANDS):
+            with b_cols[i]:
+                new_limit = st.number_input(f"{reason}: ratio {op}", 0.0, 20.0, float(limit), 0.05, key=f"whatif_band_limit_{i}")
+                new_points = st.number_input(f"{reason}: points", 0, 200, int(points), key=f"whatif_band_points_{i}")
+            bands.append((reason, op, new_limit, new_points))
+
+    counts, shifts = components.compare(weights, thresholds, bands)
+    c1, c2 = st.columns([1, 1])
+    with c1:
+        fig = go.Figure([
+            go.Bar(name='Current', x=counts['decision'], y=counts['current']),
+            go.Bar(name='Simulated', x=counts['decision'], y=counts['simulated']),
+        ])
+        fig.update_layout(barmode='group', height=320, margin=dict(t=20, b=20))
+        st.plotly_chart(fig, use_container_width=True)
+    with c2:
+        st.dataframe(counts, use_container_width=True, hide_index=True)
+        st.caption("Claims moving from each current decision (rows) to each simulated one (columns)")
+        st.dataframe(shifts, use_container_width=True)
+
+EXPORT_CHUNK_ROWS = 100_000         # Transactions per export chunk
+MAX_DOWNLOAD_BYTES = 50 * 1024 ** 2  # Larger exports are only written to disk
+
 # --- MAIN APP UI ---
 
 st.title("🛡️ AgriGuard: Subsidy Fraud Detection Dashboard")
 
 with st.sidebar:
     st.header("📂 Upload Datasets")
-    farmers_file = st.file_uploader("1. government_farmers.csv", type=['csv'])
-    dealers_file = st.file_uploader("2. government_dealers.csv", type=['csv']) 
-    relationships_file = st.file_uploader("3. dealer_farmer_relationships.csv", type=['csv'])
+    farmers_file = st.file_uploader("1. government_farmers.csv", type=['csv', 'xlsx'])
+    dealers_file = st.file_uploader("2. government_dealers.csv", type=['csv', 'xlsx']) 
+    relationships_file = st.file_uploader("3. dealer_farmer_relationships.csv", type=['csv', 'xlsx'])
     
     st.markdown("---")
     use_sample = st.checkbox("✅ Use Large Sample Data (10k Farmers)", value=True)
 
 if use_sample:
-    # Use session state to keep data persistent
-    if 'farmers_df' not in st.session_state:
-        with st.spinner("Generating 10,000 farmers and 20,000 transactions..."):
-            f, d, t = create_sample_datasets()
-            st.session_state['farmers_df'] = f
-            st.session_state['dealers_df'] = d
-            st.session_state['trans_df'] = t
-    
-    farmers_df = st.session_state['farmers_df']
-    dealers_df = st.session_state['dealers_df']
-    transactions_df = st.session_state['trans_df']
+    # Cached process-wide: only the first session in this process pays for generation
+    with st.spinner("Generating 10,000 farmers and 20,000 transactions..."):
+        farmers_df, dealers_df, transactions_df = create_sample_datasets()
+    fingerprints = {"farmers": farmers_df, "dealers": dealers_df, "relationships": transactions_df}
     
     st.sidebar.success("✅ Large scale sample data loaded")
 else:
-    farmers_df = load_data(farmers_file)
-    dealers_df = load_data(dealers_file)
-    transactions_df = load_data(relationships_file)
+    farmers_df = load_data(farmers_file, 'farmers')
+    dealers_df = load_data(dealers_file, 'dealers')
+    transactions_df = load_data(relationships_file, 'relationships')
     
     if any(df is None for df in [farmers_df, dealers_df, transactions_df]):
         st.warning("❌ Please upload all 3 CSV files or use sample data")
         st.stop()
+    # The uploads' byte digests identify their content exactly, at no cost
+    fingerprints = {role: st.session_state[f"dataset_{role}"].digest for role in ("farmers", "dealers", "relationships")}
+    
+    shared = get_dataset_store().stats()
+    st.sidebar.caption(f"🗄️ {len(shared)} shared dataset(s) in memory, {shared['nbytes'].sum() / 1024 ** 2:,.1f} MB across all sessions")
 
 # Top Metrics
 col1, col2, col3 = st.columns(3)
@@ -175,25 +331,211 @@ with col1: st.metric("👨‍🌾 Farmers", f"{len(farmers_df):,}")
 with col2: st.metric("🏪 Dealers", f"{len(dealers_df):,}")
 with col3: st.metric("🤝 Transactions", f"{len(transactions_df):,}")
 
-# Run Detection
-fraud_results = detect_fraud_patterns(farmers_df, transactions_df)
+# Run Detection as a background job: the page renders finished, partial or
+# previous results immediately, and a new dataset cancels the obsolete run
+data_fingerprint = dataset_fingerprint(fingerprints["farmers"], fingerprints["relationships"])
+analysis_jobs = get_analysis_jobs()
+if 'analysis_slot' not in st.session_state:
+    st.session_state.analysis_slot = SlotLease(analysis_jobs)  # released with the session
+analysis_slot = st.session_state.analysis_slot.slot
+analysis_job = analysis_jobs.submit(analysis_slot, data_fingerprint,
+                                    detect_fraud_patterns, farmers_df, transactions_df)
+if analysis_job.done:
+    fraud_results = analysis_job.result
+    shown_results = fraud_results
+else:
+    fraud_results = analysis_job.partial or {'high_risk': [], 'benami_clusters': [], 'benami_labels': None, 'stats': {}}
+    previous_job = analysis_jobs.previous(analysis_slot)
+    shown_results = fraud_results if analysis_job.partial or previous_job is None else previous_job.result
+    if analysis_job.status == 'failed':
+        st.error(f"Analysis error: {analysis_job.error}")
+    else:
+        show_analysis_progress(analysis_job)
+        if shown_results is not fraud_results:
+            st.caption("Showing results for the previous dataset until the new analysis has scored its first chunk")
 
 st.markdown("---")
 
 col1, col2 = st.columns([2, 1])
 with col1:
     st.subheader("🚨 Top High Risk Transactions")
-    if fraud_results.get('high_risk'):
-        st.dataframe(pd.DataFrame(fraud_results['high_risk']), use_container_width=True, height=300)
+    if shown_results.get('high_risk'):
+        st.dataframe(pd.DataFrame(shown_results['high_risk']), use_container_width=True, height=300)
     else:
         st.success("✅ No high-risk transactions (>1500kg/acre) detected.")
 
 with col2:
     st.subheader("📊 Key Metrics")
-    if 'stats' in fraud_results:
-        st.metric("High Risk Alerts", fraud_results['stats'].get('total_high_risk', 0))
-        st.metric("Avg Usage (kg/acre)", f"{fraud_results['stats'].get('avg_qty_per_acre', 0)}")
-        st.metric("Max Outlier (kg/acre)", f"{fraud_results['stats'].get('max_qty_per_acre', 0)}")
+    if 'stats' in shown_results:
+        st.metric("High Risk Alerts", shown_results['stats'].get('total_high_risk', 0))
+        st.metric("Avg Usage (kg/acre)", f"{shown_results['stats'].get('avg_qty_per_acre', 0)}")
+        st.metric("Max Outlier (kg/acre)", f"{shown_results['stats'].get('max_qty_per_acre', 0)}")
+
+# Paginated browser over all flagged transactions (only the visible page is sent)
+with st.expander("🔎 Browse All Flagged Transactions"):
+    flagged = cached_flagged_table(data_fingerprint, farmers_df, transactions_df)
+    f1, f2, f3, f4 = st.columns(4)
+    with f1: village_filter = st.selectbox("Village", ["All"] + flagged.options('village'))
+    with f2: dealer_filter = st.selectbox("Dealer", ["All"] + flagged.options('dealer_id'))
+    with f3: sort_by = st.selectbox("Sort by", [c for c in SORTABLE_COLUMNS if c in flagged.table.columns])
+    with f4: sort_desc = st.checkbox("Descending", value=True)
+    p1, p2 = st.columns([1, 3])
+    with p1: page_size = st.selectbox("Rows per page", PAGE_SIZES, index=1)
+    with p2: page_number = st.number_input("Page", min_value=1, value=1, step=1)
+    page_df, matching, n_pages = flagged.page(sort_by, not sort_desc, {'village': village_filter, 'dealer_id': dealer_filter},
+                                              page_number, page_size)
+    st.caption(f"{matching:,} matching of {len(flagged):,} flagged transactions · page {min(page_number, n_pages)} of {n_pages:,}")
+    st.dataframe(page_df.drop(columns=['row']), use_container_width=True, hide_index=True)
+
+# Streaming export: transactions are processed chunk by chunk and appended to files on disk
+with st.expander("💾 Export Analysis Results"):
+    e1, e2 = st.columns([1, 3])
+    with e1: export_format = st.radio("Format", FORMATS, horizontal=True)
+    with e2: st.caption("Flagged transactions, Benami cluster members and per-dealer summaries, written in chunks")
+    if st.button("📤 Export"):
+        export_dir = os.path.join(EXPORT_DIR, data_fingerprint[:12])
+        n_chunks = max(1, -(-len(transactions_df) // EXPORT_CHUNK_ROWS))
+        export_progress = st.progress(0.0, text="Exporting...")
+        exported = export_analysis(farmers_df, iter_frame_chunks(transactions_df, EXPORT_CHUNK_ROWS), export_dir, export_format,
+                                   dealers_df=dealers_df, progress=lambda n: export_progress.progress(min(n / n_chunks, 1.0), text="Exporting..."))
+        export_progress.empty()
+        for name, (path, rows) in exported.items():
+            d1, d2 = st.columns([3, 1])
+            with d1: st.write(f"✅ **{name}**: {rows:,} rows → `{path}`")
+            if os.path.getsize(path) <= MAX_DOWNLOAD_BYTES:
+                with d2, open(path, 'rb') as handle:
+                    st.download_button("⬇️ Download", handle.read(), file_name=os.path.basename(path), key=f"download_{name}")
+
+st.markdown("---")
+
+# Analytics (charts only ever receive aggregates or a bounded sample)
+st.subheader("📈 Analytics")
+charts = cached_chart_data(data_fingerprint, farmers_df, transactions_df)
+tab_village, tab_dealer, tab_crop, tab_month, tab_dist, tab_scatter = st.tabs(
+    ["By Village", "By Dealer", "By Crop", "By Month", "kg/acre Distribution", "Land vs Claim"]
+)
+with tab_village:
+    if not charts['by_village'].empty:
+        st.plotly_chart(px.bar(charts['by_village'], x='village', y='total_kg', color='high_risk',
+                               hover_data=['transactions', 'mean_kg_per_acre']), use_container_width=True)
+with tab_dealer:
+    if not charts['by_dealer'].empty:
+        st.plotly_chart(px.bar(charts['by_dealer'], x='dealer_id', y='total_kg', color='high_risk',
+                               hover_data=['transactions', 'mean_kg_per_acre']), use_container_width=True)
+with tab_crop:
+    if not charts['by_crop'].empty:
+        st.plotly_chart(px.bar(charts['by_crop'], x='crop', y='mean_kg_per_acre',
+                               hover_data=['transactions', 'total_kg', 'high_risk']), use_container_width=True)
+with tab_month:
+    if not charts['by_month'].empty:
+        st.plotly_chart(px.line(charts['by_month'], x='month', y=['total_kg'], markers=True), use_container_width=True)
+with tab_dist:
+    hist = charts['kg_per_acre_hist']
+    if not hist.empty:
+        fig = go.Figure(go.Bar(x=hist['left'], y=hist['count'], width=hist['right'] - hist['left'], offset=0))
+        fig.update_layout(xaxis_type='log', xaxis_title='kg/acre (log scale)', yaxis_title='transactions')
+        st.plotly_chart(fig, use_container_width=True)
+with tab_scatter:
+    if not charts['scatter'].empty:
+        st.caption(f"Showing {len(charts['scatter']):,} of {charts['scatter_total']:,} transactions (largest claims always included)")
+        st.plotly_chart(px.scatter(charts['scatter'], x='land_size_acres', y='claimed_kg', color='high_risk',
+                                   render_mode='webgl', opacity=0.6), use_container_width=True)
+
+st.markdown("---")
+
+st.subheader("🕸️ Benami Identity Clusters")
+if not analysis_job.done:
+    st.info("⏳ Identity clustering is still running; this section fills in when the analysis finishes.")
+elif fraud_results.get('benami_clusters'):
+    clusters_view = pd.DataFrame(fraud_results['benami_clusters']).head(10)
+    clusters_view['farmer_ids'] = clusters_view['farmer_ids'].map(lambda ids: ', '.join(map(str, ids)))
+    clusters_view['dealer_ids'] = clusters_view['dealer_ids'].map(lambda ids: ', '.join(map(str, ids)))
+    st.caption(f"{len(fraud_results['benami_clusters']):,} clusters of farmers sharing a phone or aadhar number (directly or through a chain)")
+    st.dataframe(clusters_view, use_container_width=True, hide_index=True)
+else:
+    st.success("✅ No shared identities detected.")
+
+st.markdown("---")
+
+# Cohort Outliers
+st.subheader("📐 Cohort Outliers (crop × soil × village)")
+cohort = cached_cohort_outliers(data_fingerprint, farmers_df, transactions_df)
+c1, c2, c3 = st.columns(3)
+with c1: st.metric(f"Outliers (robust z > {OUTLIER_Z})", f"{cohort['outliers']:,}")
+with c2: st.metric("Cohorts", f"{cohort['cohorts']:,}")
+with c3: st.metric("Small Cohorts (global baseline)", f"{cohort['fallback_cohorts']:,}")
+if not cohort['top'].empty:
+    st.caption("Claims far above the median kg/acre of farmers with the same crop, soil and village")
+    st.dataframe(cohort['top'], use_container_width=True, hide_index=True, height=300)
+
+st.markdown("---")
+
+# Claim Velocity
+st.subheader("⏱️ Claim Velocity (bursts over time)")
+v1, v2, v3 = st.columns(3)
+with v1: window_days = st.number_input("Window (days)", min_value=1, max_value=365, value=WINDOW_DAYS)
+with v2: farmer_max_claims = st.number_input("Max claims per farmer in window", min_value=1, value=FARMER_MAX_CLAIMS)
+with v3: dealer_max_claims = st.number_input("Max claims per dealer in window", min_value=1, value=DEALER_MAX_CLAIMS)
+try:
+    velocity = cached_velocity(data_fingerprint, transactions_df, int(window_days), int(farmer_max_claims), int(dealer_max_claims))
+except KeyError as e:
+    st.info(f"Velocity checks unavailable: {e}")
+else:
+    tab_vf, tab_vd = st.tabs([
+        f"Farmers ({len(velocity.get('farmers', [])):,} flagged)",
+        f"Dealers ({len(velocity.get('dealers', [])):,} flagged)",
+    ])
+    with tab_vf:
+        if velocity.get('farmers') is not None and not velocity['farmers'].empty:
+            st.dataframe(velocity['farmers'].head(50), use_container_width=True, hide_index=True)
+        else:
+            st.success("✅ No farmer claim bursts.")
+    with tab_vd:
+        if velocity.get('dealers') is not None and not velocity['dealers'].empty:
+            st.dataframe(velocity['dealers'].head(50), use_container_width=True, hide_index=True)
+        else:
+            st.success("✅ No dealer claim bursts.")
+
+st.markdown("---")
+
+# Dealer–Farmer Network
+st.subheader("🔗 Dealer–Farmer Network")
+network = cached_dealer_network(dataset_fingerprint(fingerprints["relationships"], fingerprints["dealers"], fingerprints["farmers"]),
+                                transactions_df, dealers_df, farmers_df)
+n1, n2, n3, n4 = st.columns(4)
+with n1: st.metric("Dealer–Farmer Links", f"{network['edges']:,}")
+with n2: st.metric("Suspicious Dealer Pairs", f"{len(network['shared_pairs']):,}")
+with n3: st.metric("Dense Dealer Groups", f"{len(network['dense_groups']):,}")
+with n4: st.metric("Multi-Village Farmers", f"{len(network['multi_village_farmers']):,}")
+
+tab_pairs, tab_groups, tab_farmers, tab_degree = st.tabs(["Shared Farmers", "Dense Groups", "Multi-Village Farmers", "Dealer Degree"])
+with tab_pairs:
+    st.caption("Dealer pairs serving far more common farmers than chance (lift = shared / expected)")
+    st.dataframe(network['shared_pairs'].head(50), use_container_width=True, hide_index=True)
+with tab_groups:
+    groups_view = network['dense_groups'].head(20).copy()
+    groups_view['dealer_ids'] = groups_view['dealer_ids'].map(lambda ids: ', '.join(map(str, ids)))
+    st.dataframe(groups_view, use_container_width=True, hide_index=True)
+with tab_farmers:
+    st.dataframe(network['multi_village_farmers'].head(50), use_container_width=True, hide_index=True)
+with tab_degree:
+    st.dataframe(network['dealer_degrees'].head(50), use_container_width=True, hide_index=True)
+
+st.markdown("---")
+
+# What-if simulator over the kiosk's rule engine (rule hits cached once, decisions recomputed per change)
+st.subheader("🎛️ What-if Decision Thresholds")
+try:
+    import risk_engine  # loads the kiosk's government CSVs from the working directory on first import
+except FileNotFoundError as e:
+    st.info(f"What-if simulator unavailable: the kiosk registry files were not found ({e.filename}). "
+            "Start the dashboard from the folder holding government_farmers.csv, government_dealers.csv and dealer_farmer_relationships.csv.")
+else:
+    registry = risk_engine.current_registry()
+    components = cached_component_scores(registry.version, registry)
+    st.caption(f"{len(components):,} claims of registry version {components.version} scored by the kiosk rules once · {len(components.patterns):,} distinct rule patterns · "
+               f"{components.nbytes / 1024 ** 2:,.1f} MB. Adjust thresholds and weights to see how decisions shift.")
+    show_whatif_panel(components)
 
 st.markdown("---")
 
@@ -209,40 +551,18 @@ with st.container():
     with col2:
         if check_btn and search_input:
             # --- ROBUST SMART SEARCH LOGIC ---
-            raw_input = search_input.strip()
-            
-            # 1. Extract digits only to handle "FAR 10000" or "10000"
-            digits = "".join(filter(str.isdigit, raw_input))
+            # Normalized-ID hash map built once per dataset handles "FAR 10000",
+            # "far010000" or "10000" with a single dict lookup
+            farmer_index = cached_farmer_index(data_fingerprint, farmers_df, transactions_df)
+            found_pos, search_candidates = find_farmer_position(farmer_index, search_input)
             
-            search_candidates = []
-            
-            # Candidate A: Exact input
-            search_candidates.append(raw_input)
-            
-            # Candidate B: Formatted ID (FAR + 6 digits)
-            if digits:
-                formatted_id = f"FAR{int(digits):06d}"
-                search_candidates.append(formatted_id)
-                # Also try without FAR if the dataset uses plain numbers
-                search_candidates.append(digits) 
-                try:
-                    search_candidates.append(int(digits)) 
-                except: pass
-
-            # Try to find a match
-            found_id = None
-            for candidate in search_candidates:
-                if candidate in farmers_df['farmer_id'].values:
-                    found_id = candidate
-                    break
-            
-            if found_id:
+            if found_pos is not None:
+                # Fetch Data (positional, no boolean scans)
+                farmer_row = farmers_df.iloc[found_pos]
+                farmer_tx = transactions_df.iloc[farmer_transaction_rows(farmer_index, found_pos)]
+                found_id = farmer_row['farmer_id']
                 st.success(f"**Found Farmer:** {found_id}")
                 
-                # Fetch Data
-                farmer_row = farmers_df[farmers_df['farmer_id'] == found_id].iloc[0]
-                farmer_tx = transactions_df[transactions_df['farmer_id'] == found_id]
-                
                 # Profile
                 c1, c2, c3 = st.columns(3)
                 with c1: st.metric("Village", farmer_row['village'])
@@ -256,11 +576,11 @@ with st.container():
                 # Risk Logic
                 is_high_risk = avg_per_acre > 1500
                 
-                # Benami Check (Shared Phone)
-                phone = str(farmer_row['phone_no'])
-                is_benami = False
-                if 'warnings' in fraud_results and phone in fraud_results['warnings']:
-                    is_benami = True
+                # Benami Check (identity cluster membership)
+                cluster = None
+                if fraud_results.get('benami_labels') is not None and fraud_results['benami_labels'][found_pos] >= 0:
+                    cluster = fraud_results['benami_clusters'][fraud_results['benami_labels'][found_pos]]
+                is_benami = cluster is not None
                 
                 # Status Display
                 if is_high_risk or is_benami:
@@ -268,7 +588,8 @@ with st.container():
                     if is_high_risk:
                         st.write(f"⚠️ **Over-claiming:** {total_qty} kg for {farmer_row['land_size_acres']} acres ({avg_per_acre:.0f} kg/acre)")
                     if is_benami:
-                        st.write(f"⚠️ **Benami Suspect:** Phone number `{phone}` is shared with other farmers.")
+                        linked = [fid for fid in cluster['farmer_ids'] if fid != found_id] + cluster['dealer_ids']
+                        st.write(f"⚠️ **Benami Suspect:** Shares phone/aadhar identity with {', '.join(map(str, linked))}.")
                 else:
                     st.success("🟢 **NORMAL STATUS**")
                     st.write(f"Total Claimed: **{total_qty} kg** (Avg {avg_per_acre:.0f} kg/acre)")
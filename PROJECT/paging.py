@@ -0,0 +1,92 @@
+# paging.py
+
+import numpy as np
+import pandas as pd
+
+from farmer_index import lookup_farmer_columns
+
+HIGH_RISK_KG_PER_ACRE = 1500
+PAGE_SIZES = [25, 50, 100, 250]
+SORTABLE_COLUMNS = ["qty_per_acre", "claimed_fertiliser_qty_kg", "land_size_acres", "farmer_id", "dealer_id", "village"]
+
+
+class FlaggedTable:
+    """
+    Server-side, paginated view over every flagged transaction.
+
+    Built once per dataset: flagged rows are kept as a compact columnar frame
+    (categoricals for village/dealer) and each sort order is an argsort that is
+    computed on first use and then cached. A page request filters the cached
+    order with a boolean mask and materializes only the rows on that page.
+    """
+
+    def __init__(self, farmers_df, transactions_df, threshold=HIGH_RISK_KG_PER_ACRE):
+        looked_up = lookup_farmer_columns(transactions_df, farmers_df)
+        claimed = transactions_df["claimed_fertiliser_qty_kg"].to_numpy(dtype="float64")
+        land = looked_up.get("land_size_acres", np.full(len(claimed), np.nan)).astype("float64")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            qty_per_acre = claimed / land
+        rows = np.flatnonzero(qty_per_acre > threshold)
+
+        table = {
+            "row": rows,
+            "farmer_id": transactions_df["farmer_id"].to_numpy()[rows],
+        }
+        if "dealer_id" in transactions_df.columns:
+            table["dealer_id"] = pd.Categorical(transactions_df["dealer_id"].to_numpy()[rows])
+        table["claimed_fertiliser_qty_kg"] = claimed[rows]
+        table["land_size_acres"] = land[rows]
+        table["qty_per_acre"] = qty_per_acre[rows]
+        if "village" in looked_up:
+            table["village"] = pd.Categorical(looked_up["village"][rows])
+        self.table = pd.DataFrame(table)
+        self._orders = {}
+
+    def __len__(self):
+        return len(self.table)
+
+    def options(self, col):
+        """Distinct values of a filter column (sorted), for the filter widgets."""
+        if col not in self.table.columns:
+            return []
+        return sorted(map(str, self.table[col].cat.categories))
+
+    def _order(self, col, ascending):
+        key = (col, ascending)
+        if key not in self._orders:
+            values = self.table[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                # Sort integer codes by category rank instead of comparing strings
+                rank = np.argsort(np.argsort(values.cat.categories.astype(str)))
+                codes = values.cat.codes.to_numpy()
+                values = pd.Series(np.where(codes >= 0, rank[codes], np.nan))
+            order = values.sort_values(ascending=ascending, kind="stable", na_position="last").index.to_numpy()
+            self._orders[key] = order
+        return self._orders[key]
+
+    def page(self, sort_by="qty_per_acre", ascending=False, filters=None, page=1, page_size=50):
+        """
+        One page of the filtered, sorted table.
+
+        Returns (page DataFrame, matching row count, page count). `filters`
+        maps column -> value; None/"All" values are ignored.
+        """
+        order = self._order(sort_by if sort_by in self.table.columns else "qty_per_acre", ascending)
+        mask = np.ones(len(self.table), dtype=bool)
+        for col, value in (filters or {}).items():
+            if value in (None, "All") or col not in self.table.columns:
+                continue
+            column = self.table[col]
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                matches = np.flatnonzero(column.cat.categories.astype(str) == str(value))
+                mask &= np.isin(column.cat.codes.to_numpy(), matches)
+            else:
+                mask &= (column.astype(str) == str(value)).to_numpy()
+        if not mask.all():
+            order = order[mask[order]]
+
+        total = len(order)
+        pages = max(1, -(-total // page_size))
+        page = min(max(1, int(page)), pages)
+        visible = order[(page - 1) * page_size: page * page_size]
+        return self.table.iloc[visible].reset_index(drop=True), total, pages
@@ -0,0 +1,86 @@
+# registry.py
+
+import copy
+import itertools
+import threading
+
+TABLES = ("farmers", "dealers", "relations")
+
+
+class RegistrySnapshot:
+    """
+    One immutable version of the government registry.
+
+    Holds the farmer, dealer and relationship tables plus values derived
+    from them (indexes, parsed dates, profiles), each built on first use and
+    tagged with the tables it reads. A snapshot is never modified: `replace`
+    returns a new one that shares the unchanged tables and carries over
+    every derived value whose tables did not change (copy-on-write).
+    Tables passed in are deep-copied, so later edits to the caller's frames
+    (including in-place edits of their numpy arrays) never reach a snapshot.
+    """
+
+    def __init__(self, version, farmers, dealers, relations, derived=None):
+        self.version = version
+        self.farmers = farmers.copy()
+        self.dealers = dealers.copy()
+        self.relations = relations.copy()
+        self._derived = dict(derived or {})  # name -> (tables it reads, value)
+
+    def derived(self, name, reads, build):
+        """Value `name` = build(self), built once; `reads` lists the TABLES it depends on."""
+        try:
+            return self._derived[name][1]
+        except KeyError:
+            pass
+        value = build(self)
+        # Two first uses may race and both build: the values are equal, the first one stored is kept
+        return self._derived.setdefault(name, (frozenset(reads), value))[1]
+
+    def replace(self, version, farmers=None, dealers=None, relations=None, derived=None, keep=()):
+        """
+        New snapshot with the given tables swapped in. `derived` supplies
+        values computed incrementally for it ({name: (reads, value)}); other
+        values survive when none of their tables changed, or when named in
+        `keep` (the caller knows the change does not affect them).
+        """
+        tables = dict(zip(TABLES, (farmers, dealers, relations)))
+        changed = {name for name, table in tables.items() if table is not None}
+        carried = {name: item for name, item in self._derived.items() if name in keep or not item[0] & changed}
+        carried.update({name: (frozenset(reads), value) for name, (reads, value) in (derived or {}).items()})
+        snapshot = copy.copy(self)  # unchanged tables are shared, only the new ones are copied
+        snapshot.version = version
+        for name in changed:
+            setattr(snapshot, name, tables[name].copy())
+        snapshot._derived = carried
+        return snapshot
+
+
+class Registry:
+    """
+    The current RegistrySnapshot.
+
+    Readers call `snapshot()` once per request and use that object
+    throughout, without locks: a request never sees half an update. Writers
+    are serialized; each builds the next snapshot next to the current one
+    and publishes it with a single reference assignment.
+    """
+
+    def __init__(self, farmers, dealers, relations):
+        self._versions = itertools.count(1)
+        self._write_lock = threading.Lock()
+        self._current = RegistrySnapshot(next(self._versions), farmers, dealers, relations)
+
+    def snapshot(self):
+        return self._current
+
+    def update(self, build):
+        """Publishes build(current, version) as the new snapshot and returns it."""
+        with self._write_lock:
+            snapshot = build(self._current, next(self._versions))
+            self._current = snapshot
+            return snapshot
+
+    def replace(self, **tables):
+        """Swaps in whole tables (farmers=, dealers=, relations=), keeping what they do not affect."""
+        return self.update(lambda current, version: current.replace(version, **tables))
@@ -1,11 +1,31 @@
 # risk_engine.py
 
+import threading
+
+import numpy as np
 import pandas as pd 
 
+from dealer_profiles import DealerProfiles
+from registry import TABLES, Registry
+from villages import VillageMatcher
+
 CROPS = ["Rice", "Jowar", "Wheat", "Oats"]  # Supported crops
 SOILS = ["Alluvial", "Clay", "Loamy", "Red", "Black (Regur)", "Sandy Loam"]  # Supported soils
 
 HECTARE_PER_ACRE = 1 / 2.47105  # Conversion factor
+MIN_SUBSIDY_GAP_DAYS = 90  # A claim sooner than this after the farmer's last subsidy is flagged
+TRANSACTION_DATE_COLUMNS = ["date", "relationship_date"]  # First one present dates a relationship row
+REGISTRY_CROP_NAMES = {"Paddy": "Rice"}  # Registry crop name -> fertilizer_data key
+
+# Decision: score above the threshold (checked from BLOCK down)
+DECISION_THRESHOLDS = {"BLOCK": 80, "REVIEW": 60, "MONITOR": 30}
+# Claimed / expected fertilizer: ratio above (below, for low usage) the limit adds the points; first match wins
+QUANTITY_BANDS = [
+    ("Extremely excessive fertilizer", ">", 1.8, 40),
+    ("Excess fertility use", ">", 1.4, 25),
+    ("Slight overuse", ">", 1.1, 10),
+    ("Unusually low usage", "<", 0.6, 20),
+]
 
 fertilizer_data = {
     "Rice": {
@@ -33,30 +53,144 @@ crop_soil_compatibility = {
     "Oats": ["Loamy", "Alluvial", "Sandy Loam"]
 }  # Crop-soil compatibility
 
-# Government data (trusted)
-farmers_df = pd.read_csv("government_farmers.csv")           # farmer_id, aadhar_no, village, land_size_acres, kharif_crop, rabi_crop, soil_type, ...
-dealers_df = pd.read_csv("government_dealers.csv")           # dealer_id, dealer_name, village, license_active, ...
-relations_df = pd.read_csv("dealer_farmer_relationships.csv")  # dealer_id, farmer_id, claimed_fertiliser_qty_kg, relationship_status, max_allowed_txns_per_year, ...
+# Government data (trusted), held as immutable versioned snapshots (registry.py).
+# Loaded from the working directory on first use, so importing this module
+# reads no files; callers with their own data pass a RegistrySnapshot instead.
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def _government_registry():
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = Registry(
+                    pd.read_csv("government_farmers.csv"),           # farmer_id, aadhar_no, village, land_size_acres, kharif_crop, rabi_crop, soil_type, ...
+                    pd.read_csv("government_dealers.csv"),           # dealer_id, dealer_name, village, license_active, ...
+                    pd.read_csv("dealer_farmer_relationships.csv"),  # dealer_id, farmer_id, claimed_fertiliser_qty_kg, relationship_status, max_allowed_txns_per_year, ...
+                )
+    return _registry
+
+
+def current_registry():
+    """The registry snapshot new requests are scored against."""
+    return _government_registry().snapshot()
+
+
+def __getattr__(name):
+    # farmers_df / dealers_df / relations_df: the tables of the current snapshot
+    tables = {"farmers_df": "farmers", "dealers_df": "dealers", "relations_df": "relations"}
+    if name in tables:
+        return getattr(current_registry(), tables[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _days(df, col):
+    if col is None or col not in df.columns:
+        return np.full(len(df), np.datetime64("NaT"), dtype="datetime64[D]")
+    return pd.to_datetime(df[col], errors="coerce", format="ISO8601").to_numpy().astype("datetime64[D]")
+
+
+def _transaction_column(relations):
+    return next((c for c in TRANSACTION_DATE_COLUMNS if c in relations.columns), None)
+
+
+def registry_dates(registry=None):
+    """
+    The date columns the time rules use, parsed once per snapshot into
+    datetime64[D] arrays aligned with the table rows (NaT when missing or
+    unparseable).
+    """
+    registry = registry or current_registry()
+    return {
+        "license_expiry": registry.derived("license_expiry", ["dealers"], lambda r: _days(r.dealers, "license_expiry")),
+        "last_subsidy": registry.derived("last_subsidy", ["farmers"], lambda r: _days(r.farmers, "last_subsidy_date")),
+        "transaction": registry.derived("transaction_dates", ["relations"],
+                                        lambda r: _days(r.relations, _transaction_column(r.relations))),
+    }
+
 
+def village_matcher(registry=None):
+    """Village canonicalizer for a snapshot: built once from its distinct villages, shared by both paths."""
+    return (registry or current_registry()).derived(
+        "village_matcher", ["farmers", "dealers"],
+        lambda r: VillageMatcher(pd.concat([r.farmers["village"], r.dealers["village"]], ignore_index=True)),
+    )
 
-def find_farmer(farmer_id):
-    farmer_id = str(farmer_id).strip() # farmer_id as string
-    rec = farmers_df[farmers_df["farmer_id"].astype(str).str.strip() == farmer_id] 
-    return None if rec.empty else rec.iloc[0]
 
+def set_registry(farmers, dealers, relations):
+    """
+    Publishes new government data as the next registry snapshot. Requests
+    already running finish on the snapshot they started with.
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:  # nothing loaded yet: the given tables are the first snapshot
+            _registry = Registry(farmers, dealers, relations)
+            return _registry.snapshot()
+    return _registry.replace(farmers=farmers, dealers=dealers, relations=relations)
+
+
+def append_relationships(new_rows):
+    """
+    Publishes a snapshot with relationship rows appended. Dealer profiles
+    and transaction dates are extended with just the new rows, farmer and
+    dealer indexes are shared with the previous snapshot, and the pair and
+    identity indexes are rebuilt on first use.
+    """
+    new_rows = pd.DataFrame(new_rows)
+    if new_rows.empty:
+        return current_registry()
+
+    def extend(current, version):
+        transaction_col = _transaction_column(current.relations) or _transaction_column(new_rows)
+        dates = np.concatenate([registry_dates(current)["transaction"], _days(new_rows, transaction_col)])
+        profiles = dealer_profiles(current).copy().update(new_rows)  # the current snapshot keeps its own
+        relations = pd.concat([current.relations, new_rows], ignore_index=True)
+        return current.replace(version, relations=relations, derived={
+            "transaction_dates": (["relations"], dates),
+            "dealer_profiles": (TABLES, profiles),
+        })
+
+    return _government_registry().update(extend)
+
+
+# Lookups go through the hash indexes evaluate_risk_batch uses (built once per snapshot)
 
-def find_dealer(dealer_id):
-    dealer_id = str(dealer_id).strip() # dealer_id as string
-    rec = dealers_df[dealers_df["dealer_id"].astype(str).str.strip() == dealer_id]
-    return None if rec.empty else rec.iloc[0]
 
+def _position(index, key):
+    """Position of key in a unique index, or -1 (one hash lookup)."""
+    try:
+        return index.get_loc(key)
+    except (KeyError, TypeError):
+        return -1
 
-def get_relationship(dealer_id, farmer_id):
-    rel = relations_df[
-        (relations_df["dealer_id"] == dealer_id) &
-        (relations_df["farmer_id"] == farmer_id) # Exact match on both IDs
-    ]
-    return None if rel.empty else rel.iloc[-1]
+
+def find_farmer(farmer_id, registry=None):
+    registry = registry or current_registry()
+    idx = registry.derived("farmer_index", ["farmers"], _farmer_index)
+    pos = _position(idx["farmer_keys"], str(farmer_id).strip())  # farmer_id as string
+    return None if pos < 0 else registry.farmers.iloc[idx["farmer_rows"][pos]]
+
+
+def find_dealer(dealer_id, registry=None):
+    registry = registry or current_registry()
+    idx = registry.derived("dealer_index", ["dealers"], _dealer_index)
+    pos = _position(idx["dealer_keys"], str(dealer_id).strip())  # dealer_id as string
+    return None if pos < 0 else registry.dealers.iloc[idx["dealer_rows"][pos]]
+
+
+def _pair_position(dealer_id, farmer_id, registry):
+    # Exact match on both IDs
+    idx = registry.derived("pair_index", ["relations"], _pair_index)
+    return idx, _position(idx["pairs"], (dealer_id, farmer_id))
+
+
+def get_relationship(dealer_id, farmer_id, registry=None):
+    registry = registry or current_registry()
+    idx, pair = _pair_position(dealer_id, farmer_id, registry)
+    return None if pair < 0 else registry.relations.iloc[idx["pair_last_row"][pair]]
 
 
 def get_farmer_crop(farmer_row):
@@ -108,13 +242,68 @@ def identity_risk(farmer, dealer):
     return score, reasons
 
 
-def location_risk(farmer_village, dealer_village):
-    if str(farmer_village).lower().strip() != str(dealer_village).lower().strip():
+def farmer_aadhar_risk(farmer, registry=None):
+    registry = registry or current_registry()
+    if identity_consistency(registry)["farmer_aadhar_is_dealer"][registry.farmers.index.get_loc(farmer.name)]:
+        return 40, ["Farmer aadhar also used by a dealer"]
+    return 0, []
+
+
+def dealer_aadhar_risk(rel, registry=None):
+    registry = registry or current_registry()
+    row = registry.relations.index.get_loc(rel.name)
+    checks = identity_consistency(registry)
+    score = 0
+    reasons = []
+
+    if checks["rel_aadhar_mismatch"][row]:
+        score += 50
+        reasons.append("Dealer aadhar does not match government record")
+
+    if checks["rel_aadhar_is_farmer"][row]:
+        score += 40
+        reasons.append("Dealer aadhar belongs to a registered farmer")
+
+    return score, reasons
+
+
+def license_expiry_risk(dealer, rel, registry=None):
+    registry = registry or current_registry()
+    dates = registry_dates(registry)
+    expiry = dates["license_expiry"][registry.dealers.index.get_loc(dealer.name)]
+    when = dates["transaction"][registry.relations.index.get_loc(rel.name)]
+    if when > expiry: # False when either date is missing
+        return 40, ["Transaction after dealer license expiry"]
+    return 0, []
+
+
+def subsidy_gap_risk(farmer, rel, registry=None):
+    registry = registry or current_registry()
+    dates = registry_dates(registry)
+    last = dates["last_subsidy"][registry.farmers.index.get_loc(farmer.name)]
+    when = dates["transaction"][registry.relations.index.get_loc(rel.name)]
+    gap = when - last
+    if np.timedelta64(0, "D") < gap < np.timedelta64(MIN_SUBSIDY_GAP_DAYS, "D"):
+        return 25, [f"Subsidy claimed within {MIN_SUBSIDY_GAP_DAYS} days of the previous one"]
+    return 0, []
+
+
+def dealer_profile_risk(dealer, registry=None):
+    if dealer_profiles(registry).flagged(dealer["dealer_id"]):
+        return 20, ["High-risk dealer profile"]
+    return 0, []
+
+
+def location_risk(farmer_village, dealer_village, registry=None):
+    # Spelling variants of one village ("Rampur" / "Rampur Village") are not a mismatch
+    matcher = village_matcher(registry)
+    if not matcher.same(farmer_village, dealer_village):
         return 20, ["Village mismatch"]
     return 0, []
 
 
-def relationship_risk(rel):
+def relationship_risk(rel, registry=None):
+    registry = registry or current_registry()
     score = 0
     reasons = []
 
@@ -122,12 +311,10 @@ def relationship_risk(rel):
         score += 40
         reasons.append("Inactive dealer–farmer relationship")
 
-    farmer_txn_count = relations_df[
-        (relations_df["dealer_id"] == rel["dealer_id"]) &
-        (relations_df["farmer_id"] == rel["farmer_id"])
-    ]
+    idx, pair = _pair_position(rel["dealer_id"], rel["farmer_id"], registry)
+    farmer_txn_count = idx["pair_count"][pair] if pair >= 0 else 0
 
-    if len(farmer_txn_count) > rel["max_allowed_txns_per_year"]:
+    if farmer_txn_count > rel["max_allowed_txns_per_year"]:
         score += 30
         reasons.append("Exceeded transaction limit")
 
@@ -153,33 +340,23 @@ def quantity_risk(expected, actual):
 
     ratio = actual / expected
 
-    if ratio > 1.8:
-        score += 40
-        issues.append("Extremely excessive fertilizer")
-    elif ratio > 1.4:
-        score += 25
-        issues.append("Excess fertility use")
-    elif ratio > 1.1:
-        score += 10
-        issues.append("Slight overuse")
-    elif ratio < 0.6:
-        score += 20
-        issues.append("Unusually low usage")
+    for reason, op, limit, points in QUANTITY_BANDS:
+        if ratio > limit if op == ">" else ratio < limit:
+            score += points
+            issues.append(reason)
+            break
 
     return score, issues
 
 
 def decision(score):
-    if score > 80:
-        return "BLOCK"
-    elif score > 60:
-        return "REVIEW"
-    elif score > 30:
-        return "MONITOR"
+    for label, threshold in DECISION_THRESHOLDS.items():
+        if score > threshold:
+            return label
     return "APPROVE"
 
 
-def evaluate_risk(input_farmer):
+def evaluate_risk(input_farmer, registry=None):
     """
     input_farmer should contain:
     {
@@ -189,15 +366,19 @@ def evaluate_risk(input_farmer):
         "village": str,     # from UI (optional for now)
         "land_size": float  # from UI (optional, not yet used in calc)
     }
+
+    The whole request is scored against one registry snapshot (the current
+    one unless `registry` is given); Registry_Version records which.
     """
+    registry = registry or current_registry()
     total_score = 0
     reasons = []
 
     dealer_id = input_farmer["Dealer_ID"]
     input_crop = input_farmer["Crop"]
 
-    farmer = find_farmer(input_farmer["farmer_id"])
-    dealer = find_dealer(dealer_id)
+    farmer = find_farmer(input_farmer["farmer_id"], registry)
+    dealer = find_dealer(dealer_id, registry)
 
     # Identity
     s, r = identity_risk(farmer, dealer)
@@ -210,9 +391,15 @@ def evaluate_risk(input_farmer):
             "Risk_Score": total_score,
             "Expected_Fertilizer_kg": None,
             "Claimed_Fertilizer_kg": None,
-            "Reasons": " | ".join(reasons)
+            "Reasons": " | ".join(reasons),
+            "Registry_Version": registry.version,
         }
 
+    # Aadhar reused across the farmer and dealer registries
+    s, r = farmer_aadhar_risk(farmer, registry)
+    total_score += s
+    reasons += r
+
     # Crop OR logic (from govt data)
     crop, s, r = get_farmer_crop(farmer)
     total_score += s
@@ -231,12 +418,17 @@ def evaluate_risk(input_farmer):
     reasons += r
 
     # Location match (govt farmer village vs dealer village)
-    s, r = location_risk(farmer["village"], dealer["village"])
+    s, r = location_risk(farmer["village"], dealer["village"], registry)
+    total_score += s
+    reasons += r
+
+    # Dealer-level pattern across all of its relationships
+    s, r = dealer_profile_risk(dealer, registry)
     total_score += s
     reasons += r
 
     # Relationship check
-    rel = get_relationship(dealer_id, farmer["farmer_id"])
+    rel = get_relationship(dealer_id, farmer["farmer_id"], registry)
     if rel is None:
         total_score += 50
         reasons.append("Dealer not authorised for this farmer")
@@ -245,10 +437,25 @@ def evaluate_risk(input_farmer):
             "Risk_Score": total_score,
             "Expected_Fertilizer_kg": None,
             "Claimed_Fertilizer_kg": None,
-            "Reasons": " | ".join(reasons)
+            "Reasons": " | ".join(reasons),
+            "Registry_Version": registry.version,
         }
 
-    s, r = relationship_risk(rel)
+    s, r = relationship_risk(rel, registry)
+    total_score += s
+    reasons += r
+
+    # Claimed dealer aadhar vs dealer registry
+    s, r = dealer_aadhar_risk(rel, registry)
+    total_score += s
+    reasons += r
+
+    # Time rules (dates parsed once at load)
+    s, r = license_expiry_risk(dealer, rel, registry)
+    total_score += s
+    reasons += r
+
+    s, r = subsidy_gap_risk(farmer, rel, registry)
     total_score += s
     reasons += r
 
@@ -265,5 +472,307 @@ def evaluate_risk(input_farmer):
         "Decision": decision(total_score),
         "Expected_Fertilizer_kg": round(expected, 2),
         "Claimed_Fertilizer_kg": claimed,
-        "Reasons": " | ".join(reasons)
+        "Reasons": " | ".join(reasons),
+        "Registry_Version": registry.version,
     }
+
+
+# --- BATCH SCORING ---
+# Same rules and reasons as evaluate_risk, applied to whole columns at once.
+# Registry lookups are hash indexes built once per snapshot, each from only the
+# tables it reads, so an append to the relationships keeps the farmer/dealer ones.
+
+
+def _normalized(values):
+    """str(v).strip().lower() for every value, with NaN -> 'nan' as in the scalar path."""
+    values = pd.Series(values, dtype=object)
+    return values.where(values.notna(), "nan").astype(str).str.strip().str.lower().to_numpy(dtype=object)
+
+
+def _first_positions(ids):
+    """Index of stripped string IDs -> first registry row (find_farmer/find_dealer take iloc[0])."""
+    keys = pd.Series(ids, dtype=object).astype(str).str.strip()
+    first = ~keys.duplicated().to_numpy()
+    return pd.Index(keys[first].to_numpy()), np.flatnonzero(first)
+
+
+def _crop_soil_index():
+    # (crop, soil) -> kg/ha and compatibility, for every pair fertilizer_data knows
+    crop_soil = pd.MultiIndex.from_tuples([(c, s) for c in fertilizer_data for s in fertilizer_data[c]])
+    per_ha = np.array([fertilizer_data[c][s] for c, s in crop_soil], dtype="float64")
+    compatible = np.array([s in crop_soil_compatibility.get(c, [s]) for c, s in crop_soil], dtype=bool)
+    return {"crop_soil": crop_soil, "per_ha": per_ha, "compatible": compatible}
+
+
+def _farmer_index(registry):
+    farmer_keys, farmer_rows = _first_positions(registry.farmers["farmer_id"])
+    return {
+        "farmer_keys": farmer_keys, "farmer_rows": farmer_rows,
+        "kharif": _normalized(registry.farmers["kharif_crop"]),
+        "rabi": _normalized(registry.farmers["rabi_crop"]),
+    }
+
+
+def _dealer_index(registry):
+    dealer_keys, dealer_rows = _first_positions(registry.dealers["dealer_id"])
+    return {"dealer_keys": dealer_keys, "dealer_rows": dealer_rows}
+
+
+def _village_index(registry):
+    matcher = village_matcher(registry)
+    return {"farmer_village": matcher.codes(registry.farmers["village"]),
+            "dealer_village": matcher.codes(registry.dealers["village"])}
+
+
+def _pair_index(registry):
+    # (dealer_id, farmer_id) pairs: last relationship row (get_relationship) and row count (relationship_risk)
+    pairs = pd.MultiIndex.from_arrays([registry.relations["dealer_id"], registry.relations["farmer_id"]])
+    codes, uniques = pd.factorize(pairs)
+    valid = codes >= 0
+    last_row = np.full(len(uniques), -1, dtype=np.int64)
+    last_row[codes[valid]] = np.flatnonzero(valid)  # later rows overwrite earlier ones
+    counts = np.bincount(codes[valid], minlength=len(uniques))
+    return {"pairs": uniques, "pair_last_row": last_row, "pair_count": counts}
+
+
+def batch_index(registry):
+    """All lookup tables evaluate_risk_batch uses, for one snapshot."""
+    return {
+        **_CROP_SOIL_INDEX,
+        **registry.derived("farmer_index", ["farmers"], _farmer_index),
+        **registry.derived("dealer_index", ["dealers"], _dealer_index),
+        **registry.derived("village_index", ["farmers", "dealers"], _village_index),
+        **registry.derived("pair_index", ["relations"], _pair_index),
+    }
+
+
+_CROP_SOIL_INDEX = _crop_soil_index()
+
+
+def _lookup(keys, rows, values):
+    pos = keys.get_indexer(values)
+    return np.where(pos >= 0, rows[np.maximum(pos, 0)], -1)
+
+
+# --- DEALER PROFILES ---
+# Per-dealer aggregates over all relationships, built in one pass per snapshot
+# and extended by append_relationships. Expected kg uses the farmer's registered
+# crop (kharif, else rabi) on their soil and land.
+
+
+def _registered_expected_kg(farmers_df):
+    kharif = _normalized(farmers_df["kharif_crop"])
+    rabi = _normalized(farmers_df["rabi_crop"])
+    crop = np.where((kharif != "") & (kharif != "nan"), kharif, rabi)
+    crop = pd.Series(crop, dtype=object).str.capitalize().replace(REGISTRY_CROP_NAMES)
+    per_ha = pd.Series([fertilizer_data.get(c, {}).get(s, np.nan)
+                        for c, s in zip(crop, farmers_df["soil_type"])], dtype="float64")
+    return farmers_df["land_size_acres"].to_numpy(dtype="float64") * HECTARE_PER_ACRE * per_ha.to_numpy()
+
+
+def _build_dealer_profiles(registry):
+    villages = registry.derived("village_index", ["farmers", "dealers"], _village_index)
+    return DealerProfiles(
+        registry.farmers["farmer_id"], _registered_expected_kg(registry.farmers), villages["farmer_village"],
+        registry.dealers["dealer_id"], villages["dealer_village"],
+    ).update(registry.relations)
+
+
+def dealer_profiles(registry=None):
+    """DealerProfiles of a snapshot (computed once; append_relationships extends a copy for the next one)."""
+    return (registry or current_registry()).derived("dealer_profiles", TABLES, _build_dealer_profiles)
+
+
+# --- IDENTITY CONSISTENCY ---
+# dealer_aadhar on every relationship row is joined against the dealer registry,
+# and aadhar numbers are matched across farmers and dealers, in one linear pass
+# per snapshot. Both evaluate_risk and evaluate_risk_batch read the result by position.
+
+
+def _aadhar_keys(values):
+    """Aadhar numbers as clean strings ('' when missing), whether read as int, float or str."""
+    values = pd.Series(values, dtype=object)
+    keys = values.where(values.notna(), "").astype(str).str.strip().str.replace(r"\.0$", "", regex=True)
+    return keys.to_numpy(dtype=object)
+
+
+def _build_identity_index(registry):
+    farmers_df, dealers_df, relations_df = registry.farmers, registry.dealers, registry.relations
+    dealers = registry.derived("dealer_index", ["dealers"], _dealer_index)
+    registered = _aadhar_keys(dealers_df["aadhar_no"])
+    dealer_row = _lookup(dealers["dealer_keys"], dealers["dealer_rows"], relations_df["dealer_id"].astype(str).str.strip())
+    claimed = _aadhar_keys(relations_df["dealer_aadhar"])
+    expected = np.where(dealer_row >= 0, registered[np.maximum(dealer_row, 0)], "")
+
+    farmer_aadhar = _aadhar_keys(farmers_df["aadhar_no"])
+    farmer_set = pd.Index(farmer_aadhar[farmer_aadhar != ""]).unique()
+    dealer_set = pd.Index(np.concatenate([registered, claimed])).unique().drop("", errors="ignore")
+
+    return {
+        "rel_aadhar_mismatch": (dealer_row >= 0) & (claimed != expected),
+        "rel_aadhar_is_farmer": (claimed != "") & pd.Index(claimed).isin(farmer_set),
+        "farmer_aadhar_is_dealer": (farmer_aadhar != "") & pd.Index(farmer_aadhar).isin(dealer_set),
+    }
+
+
+def identity_consistency(registry=None):
+    """
+    Per-row identity flags of a snapshot (computed once, then cached):
+    - rel_aadhar_mismatch: relationship's dealer_aadhar differs from that dealer's registered aadhar
+    - rel_aadhar_is_farmer: relationship's dealer_aadhar is a registered farmer's aadhar
+    - farmer_aadhar_is_dealer: farmer's aadhar is registered to, or claimed by, a dealer
+    """
+    return (registry or current_registry()).derived("identity", TABLES, _build_identity_index)
+
+
+def batch_components(inputs, registry=None):
+    """
+    The rules of evaluate_risk for many requests, before they are summed.
+
+    Returns (rules, quantity): rules is [(reason, points, mask)] in the
+    order evaluate_risk applies them, without the quantity bands; quantity
+    holds the per-request inputs of those bands (ratio, expected, claimed,
+    has_rel). The ratio is NaN where no band can apply. All requests use
+    one snapshot (the current one unless `registry` is given).
+    """
+    registry = registry or current_registry()
+    farmers_df, dealers_df, relations_df = registry.farmers, registry.dealers, registry.relations
+    idx = batch_index(registry)
+    dates = registry_dates(registry)
+    inputs = pd.DataFrame(inputs)
+    n = len(inputs)
+
+    farmer_row = _lookup(idx["farmer_keys"], idx["farmer_rows"], inputs["farmer_id"].astype(str).str.strip())
+    dealer_row = _lookup(idx["dealer_keys"], idx["dealer_rows"], inputs["Dealer_ID"].astype(str).str.strip())
+    has_farmer = farmer_row >= 0
+    has_dealer = dealer_row >= 0
+    f = np.maximum(farmer_row, 0)
+    d = np.maximum(dealer_row, 0)
+
+    rules = []
+
+    def add(mask, points, reason):
+        rules.append((reason, points, np.asarray(mask, dtype=bool)))
+
+    # Identity
+    add(~has_farmer, 60, "Farmer not in government registry")
+    add(~has_dealer, 80, "Dealer not in government registry")
+    license_inactive = dealers_df["license_active"].to_numpy(dtype=object)[d] == False  # noqa: E712 (same test as identity_risk)
+    add(has_dealer & license_inactive, 40, "Dealer license inactive")
+    known = has_farmer & has_dealer
+    identity = identity_consistency(registry)
+
+    # Aadhar reused across the farmer and dealer registries
+    add(known & identity["farmer_aadhar_is_dealer"][f], 40, "Farmer aadhar also used by a dealer")
+
+    # Crop OR logic (from govt data)
+    kharif = idx["kharif"][f]
+    rabi = idx["rabi"][f]
+    kharif_set = (kharif != "") & (kharif != "nan")
+    rabi_set = (rabi != "") & (rabi != "nan")
+    add(known & ~kharif_set & ~rabi_set, 30, "No crop declared in government record")
+
+    # User input vs govt crops
+    crop = inputs["Crop"].to_numpy(dtype=object)
+    entered = _normalized(crop)
+    crop_matches = (entered == kharif) | (entered == rabi)
+    add(known & ~crop_matches & ~kharif_set & ~rabi_set, 30, "No crop registered in government data")
+    add(known & ~crop_matches & (kharif_set | rabi_set), 40, "Entered crop does not match government record")
+
+    # Crop–soil compatibility
+    soil = farmers_df["soil_type"].to_numpy(dtype=object)[f]
+    cs = idx["crop_soil"].get_indexer(pd.MultiIndex.from_arrays([crop, soil]))
+    known_crop = pd.Series(crop, dtype=object).isin(list(crop_soil_compatibility)).to_numpy()
+    compatible = np.where(cs >= 0, idx["compatible"][np.maximum(cs, 0)], ~known_crop)
+    add(known & ~compatible, 25, "Crop–soil mismatch")
+
+    # Location match
+    add(known & (idx["farmer_village"][f] != idx["dealer_village"][d]), 20, "Village mismatch")
+
+    # Dealer-level pattern across all of its relationships
+    add(known & dealer_profiles(registry).flagged_many(dealers_df["dealer_id"].to_numpy(dtype=object)[d]), 20, "High-risk dealer profile")
+
+    # Relationship check (exact Dealer_ID as entered, registry farmer_id)
+    pair = idx["pairs"].get_indexer(pd.MultiIndex.from_arrays([inputs["Dealer_ID"].to_numpy(dtype=object),
+                                                               farmers_df["farmer_id"].to_numpy(dtype=object)[f]]))
+    has_rel = known & (pair >= 0)
+    add(known & ~has_rel, 50, "Dealer not authorised for this farmer")
+    p = np.maximum(pair, 0)
+    rel = idx["pair_last_row"][p] if len(idx["pair_last_row"]) else np.zeros(n, dtype=np.int64)  # masked by has_rel
+    status = relations_df["relationship_status"].to_numpy(dtype=object)[rel]
+    add(has_rel & (status != "Active"), 40, "Inactive dealer–farmer relationship")
+    limit = relations_df["max_allowed_txns_per_year"].to_numpy(dtype="float64")[rel]
+    count = idx["pair_count"][p] if len(idx["pair_count"]) else np.zeros(n, dtype=np.int64)
+    add(has_rel & (count > limit), 30, "Exceeded transaction limit")
+
+    # Claimed dealer aadhar vs dealer registry
+    if len(relations_df):
+        add(has_rel & identity["rel_aadhar_mismatch"][rel], 50, "Dealer aadhar does not match government record")
+        add(has_rel & identity["rel_aadhar_is_farmer"][rel], 40, "Dealer aadhar belongs to a registered farmer")
+
+    # Time rules (dates parsed once at load)
+    if len(relations_df):
+        when = dates["transaction"][rel]
+        add(has_rel & (when > dates["license_expiry"][d]), 40, "Transaction after dealer license expiry")
+        gap = when - dates["last_subsidy"][f]
+        add(has_rel & (gap > np.timedelta64(0, "D")) & (gap < np.timedelta64(MIN_SUBSIDY_GAP_DAYS, "D")), 25,
+            f"Subsidy claimed within {MIN_SUBSIDY_GAP_DAYS} days of the previous one")
+
+    # Fertilizer calc
+    per_ha = np.where(cs >= 0, idx["per_ha"][np.maximum(cs, 0)], np.nan)
+    land = farmers_df["land_size_acres"].to_numpy(dtype="float64")[f]
+    expected = np.where(has_rel, land * HECTARE_PER_ACRE * per_ha, np.nan)
+    claimed = relations_df["claimed_fertiliser_qty_kg"].to_numpy(dtype="float64")[rel]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(has_rel, claimed / expected, np.nan)
+    return rules, {"ratio": ratio, "expected": expected, "claimed": claimed, "has_rel": has_rel}
+
+
+def quantity_band_rules(ratio, bands=None):
+    """QUANTITY_BANDS as [(reason, points, mask)]: at most one band per request, as in quantity_risk."""
+    rules = []
+    matched = np.zeros(len(ratio), dtype=bool)
+    for reason, op, limit, points in QUANTITY_BANDS if bands is None else bands:
+        hit = ~matched & ((ratio > limit) if op == ">" else (ratio < limit))
+        rules.append((reason, points, hit))
+        matched |= hit
+    return rules
+
+
+def decide(score, thresholds=None):
+    """decision() for a whole score array."""
+    thresholds = DECISION_THRESHOLDS if thresholds is None else thresholds
+    return np.select([score > t for t in thresholds.values()], list(thresholds), "APPROVE")
+
+
+def evaluate_risk_batch(inputs, registry=None):
+    """
+    evaluate_risk for many requests at once.
+
+    `inputs` is a DataFrame (or list of dicts) with the same keys as the
+    scalar input: farmer_id, Dealer_ID, Crop. Returns one row per input with
+    Risk_Score, Decision, Expected_Fertilizer_kg, Claimed_Fertilizer_kg and
+    Reasons, matching the scalar path. A crop/soil missing from
+    fertilizer_data (where the scalar path raises KeyError) gives NaN
+    expected fertilizer and no quantity risk. Registry_Version is the
+    snapshot every row was scored against.
+    """
+    registry = registry or current_registry()
+    inputs = pd.DataFrame(inputs)
+    rules, quantity = batch_components(inputs, registry)
+    rules += quantity_band_rules(quantity["ratio"])
+
+    score = np.zeros(len(inputs), dtype=np.int64)
+    reasons = np.full(len(inputs), "", dtype=object)
+    for reason, points, mask in rules:
+        score[mask] += points
+        reasons = np.where(mask, np.where(reasons == "", reason, reasons + " | " + reason), reasons)
+
+    return pd.DataFrame({
+        "Risk_Score": score,
+        "Decision": decide(score),
+        "Expected_Fertilizer_kg": np.round(quantity["expected"], 2),
+        "Claimed_Fertilizer_kg": np.where(quantity["has_rel"], quantity["claimed"], np.nan),
+        "Reasons": reasons,
+        "Registry_Version": registry.version,
+    }, index=inputs.index)
@@ -0,0 +1,260 @@
+# shards.py
+
+import argparse
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import risk_engine
+from evaluate import build_requests, read_registry
+from registry import TABLES, RegistrySnapshot
+
+SHARD_COUNT = 4  # Default number of shards (one scoring process each)
+# Derived values every shard receives whole from the full registry: they read
+# rows of other villages (dealer-level aggregates, aadhar numbers across both
+# registries, the canonical village names), so a shard cannot rebuild them alone
+SHARED_DERIVED = ("village_matcher", "identity", "dealer_profiles")
+RESULT_COLUMNS = ["Risk_Score", "Decision", "Expected_Fertilizer_kg", "Claimed_Fertilizer_kg", "Reasons"]
+
+
+def _keys(values):
+    return pd.Series(values, dtype=object).astype(str).str.strip().to_numpy(dtype=object)
+
+
+def _take(values, pos, default=0):
+    """values[pos] where pos >= 0, else default."""
+    return np.where(pos >= 0, values[np.maximum(pos, 0)] if len(values) else default, default)
+
+
+def assign_units(units, weights, n_shards):
+    """{unit: shard}: units (e.g. village codes) heaviest first, each onto the least loaded shard."""
+    totals = pd.Series(weights, dtype="float64").groupby(np.asarray(units)).sum()
+    totals = totals.sort_values(ascending=False, kind="stable")
+    load = np.zeros(n_shards)
+    shard_of = {}
+    for unit, weight in totals.items():
+        shard = int(np.argmin(load))
+        shard_of[unit] = shard
+        load[shard] += weight
+    return shard_of
+
+
+def partition_registry(registry, n_shards=SHARD_COUNT):
+    """
+    Splits a snapshot by canonical village into n_shards RegistrySnapshots.
+
+    Each farmer ID goes to the shard of its village (villages are balanced
+    on farmers + relationships), with all of its relationship rows. A
+    shard's dealers are those of its villages plus copies of the dealers
+    its farmers have relationships with, so claims on an existing
+    relationship never leave the shard. Identity flags are sliced to the
+    shard's rows and the village matcher and dealer profiles are shared,
+    so a shard scores its claims exactly as the full registry does.
+    Returns (plan, shards); plan holds the routing tables.
+    """
+    farmers, dealers, relations = registry.farmers, registry.dealers, registry.relations
+    idx = risk_engine.batch_index(registry)
+    farmer_keys, dealer_keys = idx["farmer_keys"], idx["dealer_keys"]
+
+    # An ID belongs to the village of its first row (the row every lookup uses)
+    farmer_unit = idx["farmer_village"][idx["farmer_rows"]]
+    dealer_unit = idx["dealer_village"][idx["dealer_rows"]]
+    rel_farmer = farmer_keys.get_indexer(_keys(relations["farmer_id"]))
+    rel_dealer = dealer_keys.get_indexer(_keys(relations["dealer_id"]))
+    units = np.concatenate([farmer_unit, farmer_unit[rel_farmer[rel_farmer >= 0]]])
+    shard_of = assign_units(units, np.ones(len(units)), n_shards)
+    farmer_shard = np.array([shard_of[u] for u in farmer_unit], dtype=np.int64)
+    dealer_shard = np.array([shard_of.get(u, int(u) % n_shards) for u in dealer_unit], dtype=np.int64)
+
+    # Relationships follow their farmer; rows of unregistered farmers go to the dealer's shard
+    rel_shard = np.where(rel_farmer >= 0, _take(farmer_shard, rel_farmer), _take(dealer_shard, rel_dealer))
+    farmer_row_key = farmer_keys.get_indexer(_keys(farmers["farmer_id"]))
+    dealer_row_key = dealer_keys.get_indexer(_keys(dealers["dealer_id"]))
+
+    identity = risk_engine.identity_consistency(registry)
+    shared = {
+        "village_matcher": (["farmers", "dealers"], risk_engine.village_matcher(registry)),
+        "dealer_profiles": (TABLES, risk_engine.dealer_profiles(registry).frozen()),
+    }
+    present = np.zeros((n_shards, len(dealer_keys)), dtype=bool)  # dealer ID held by shard (home or copy)
+    shards = []
+    for shard in range(n_shards):
+        farmer_rows = np.flatnonzero(farmer_shard[farmer_row_key] == shard)
+        rel_rows = np.flatnonzero(rel_shard == shard)
+        present[shard] = dealer_shard == shard
+        present[shard, rel_dealer[rel_rows][rel_dealer[rel_rows] >= 0]] = True
+        dealer_rows = np.flatnonzero(present[shard][dealer_row_key])
+        snapshot = RegistrySnapshot(
+            registry.version, farmers.iloc[farmer_rows], dealers.iloc[dealer_rows], relations.iloc[rel_rows],
+        )
+        shards.append(snapshot.replace(registry.version, derived={**shared, "identity": (TABLES, {
+            "rel_aadhar_mismatch": identity["rel_aadhar_mismatch"][rel_rows],
+            "rel_aadhar_is_farmer": identity["rel_aadhar_is_farmer"][rel_rows],
+            "farmer_aadhar_is_dealer": identity["farmer_aadhar_is_dealer"][farmer_rows],
+        })}))
+
+    plan = {
+        "version": registry.version,
+        "farmer_keys": farmer_keys, "farmer_shard": farmer_shard,
+        "dealer_keys": dealer_keys, "dealer_shard": dealer_shard,
+        "present": present,
+        "villages": np.bincount(list(shard_of.values()), minlength=n_shards),
+    }
+    return plan, shards
+
+
+# --- SHARD-SIDE OPERATIONS ---
+# Plain functions of (shard, ...), run in the shard's process (or inline).
+
+
+def score_shard(shard, requests, guests=None):
+    """evaluate_risk_batch on one shard; `guests` are dealer rows fetched from other shards for these claims."""
+    if guests is not None and len(guests):
+        shard = shard.replace(shard.version, dealers=pd.concat([shard.dealers, guests]), keep=SHARED_DERIVED)
+    return risk_engine.evaluate_risk_batch(requests, shard)
+
+
+def dealer_rows(shard, dealer_ids):
+    """All registry rows of the given dealer IDs held by this shard."""
+    return shard.dealers[pd.Index(_keys(shard.dealers["dealer_id"])).isin(dealer_ids)]
+
+
+def shard_size(shard):
+    return {"farmers": len(shard.farmers), "dealers": len(shard.dealers), "relationships": len(shard.relations)}
+
+
+_WORKER_SHARD = None  # The shard a worker process serves
+
+
+def _load_shard(shard):
+    global _WORKER_SHARD
+    _WORKER_SHARD = shard
+
+
+def _on_worker(fn, *args):
+    return fn(_WORKER_SHARD, *args)
+
+
+class ShardRouter:
+    """
+    Scores claims on a village-partitioned registry.
+
+    Every shard lives in its own single-worker process (or in this process
+    with processes=False) and only ever sees its own rows. `score` routes
+    each claim to the shard of its farmer (unregistered farmers: the
+    dealer's home shard) and runs all shards in parallel. A claim whose
+    dealer is held by another shard, an out-of-village dealer the farmer
+    has no relationship with, takes the cross-shard path: the dealer's
+    rows are first fetched from its home shard and scored alongside the
+    claim as a temporary guest. Results equal evaluate_risk_batch on the
+    full snapshot, in input order, plus the Shard that scored each row.
+    """
+
+    def __init__(self, registry=None, n_shards=SHARD_COUNT, processes=True):
+        registry = registry or risk_engine.current_registry()
+        self.n_shards = n_shards
+        self.plan, shards = partition_registry(registry, n_shards)
+        self.version = registry.version
+        if processes:
+            self._shards = None
+            self._pools = [ProcessPoolExecutor(max_workers=1, initializer=_load_shard, initargs=(shard,))
+                           for shard in shards]
+        else:
+            self._shards = shards
+            self._pools = None
+        sizes = [future.result() for future in [self._submit(s, shard_size) for s in range(n_shards)]]
+        self.sizes = pd.DataFrame(sizes).rename_axis("shard")
+        self.sizes.insert(0, "villages", self.plan["villages"])
+
+    def _submit(self, shard, fn, *args):
+        if self._pools is None:
+            future = Future()
+            future.set_result(fn(self._shards[shard], *args))
+            return future
+        return self._pools[shard].submit(_on_worker, fn, *args)
+
+    def route(self, inputs):
+        """(shard, cross) per claim: the shard that scores it and whether its dealer is fetched from another shard."""
+        inputs = pd.DataFrame(inputs)
+        plan = self.plan
+        farmer = plan["farmer_keys"].get_indexer(_keys(inputs["farmer_id"]))
+        dealer = plan["dealer_keys"].get_indexer(_keys(inputs["Dealer_ID"]))
+        shard = np.where(farmer >= 0, _take(plan["farmer_shard"], farmer), _take(plan["dealer_shard"], dealer))
+        cross = (farmer >= 0) & (dealer >= 0)
+        if cross.any():
+            cross &= ~plan["present"][shard, np.maximum(dealer, 0)]
+        return shard, cross
+
+    def score(self, inputs):
+        """evaluate_risk_batch over all shards (same rows and order as inputs) with a Shard column."""
+        inputs = pd.DataFrame(inputs)
+        shard, cross = self.route(inputs)
+        dealer_ids = _keys(inputs["Dealer_ID"])
+
+        # Cross-shard path: one fetch per home shard for every dealer a claim needs elsewhere
+        guests, guest_keys = None, np.array([], dtype=object)
+        if cross.any():
+            wanted = pd.unique(dealer_ids[cross])
+            home = self.plan["dealer_shard"][self.plan["dealer_keys"].get_indexer(wanted)]
+            fetches = [self._submit(s, dealer_rows, wanted[home == s]) for s in np.unique(home)]
+            guests = pd.concat([future.result() for future in fetches])
+            guest_keys = _keys(guests["dealer_id"])
+
+        positions, futures = [], []
+        for s in np.unique(shard) if len(inputs) else [0]:
+            rows = np.flatnonzero(shard == s)
+            needed = np.isin(guest_keys, dealer_ids[rows[cross[rows]]])
+            positions.append(rows)
+            futures.append((s, self._submit(s, score_shard, inputs.iloc[rows], guests[needed] if needed.any() else None)))
+
+        result = pd.concat([future.result().assign(Shard=s) for s, future in futures])
+        result = result.iloc[np.argsort(np.concatenate(positions), kind="stable")]
+        result.index = inputs.index
+        return result
+
+    def close(self):
+        for pool in self._pools or []:
+            pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score every labelled claim on a village-sharded registry.")
+    parser.add_argument("--data", default=".", help="directory with the three CSVs from Saish/initial.py")
+    parser.add_argument("--shards", type=int, default=SHARD_COUNT)
+    parser.add_argument("--inline", action="store_true", help="keep all shards in this process")
+    args = parser.parse_args(argv)
+
+    registry = read_registry(args.data)
+    requests = build_requests(registry.farmers, registry.relations)
+
+    start = time.perf_counter()
+    single = risk_engine.evaluate_risk_batch(requests, registry)
+    single_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ShardRouter(registry, args.shards, processes=not args.inline) as router:
+        built = time.perf_counter() - start
+        _, cross = router.route(requests)
+        start = time.perf_counter()
+        sharded = router.score(requests)
+        sharded_seconds = time.perf_counter() - start
+
+    same = (single[RESULT_COLUMNS].fillna(-1) == sharded[RESULT_COLUMNS].fillna(-1)).all(axis=1)
+    print(f"🗺️ {args.shards} shards built in {built:.2f}s")
+    print(router.sizes.to_string())
+    print(f"\n🔀 Cross-shard claims: {int(cross.sum()):,} of {len(requests):,} ({cross.mean():.1%})")
+    print(f"⚡ Single registry: {len(requests) / single_seconds:,.0f} rows/s; "
+          f"sharded: {len(requests) / sharded_seconds:,.0f} rows/s")
+    print(f"🤝 Same result as the single registry: {same.mean():.1%} of claims")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+PROJECT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT)
+
+
+@pytest.fixture
+def risk_engine(monkeypatch):
+    """risk_engine, imported from PROJECT (it loads the government CSVs from the working directory)."""
+    monkeypatch.chdir(PROJECT)
+    import risk_engine
+    return risk_engine
+
+
+@pytest.fixture
+def registry_tables():
+    """A small government registry (farmers, dealers, relations) with a few of each fraud pattern."""
+    rng = np.random.default_rng(7)
+    villages = np.array(["Rampur", "Sonpur", "Keshavpur", "Madhopur", "Bishanpur", "Lakhanpur"], dtype=object)
+    n_farmers, n_dealers, n_relations = 120, 12, 400
+    farmers = pd.DataFrame({
+        "farmer_id": [f"FAR{i:04d}" for i in range(n_farmers)],
+        "aadhar_no": rng.integers(10 ** 11, 10 ** 12, n_farmers),
+        "phone_no": rng.integers(9 * 10 ** 9, 10 ** 10, n_farmers),
+        "village": villages[np.arange(n_farmers) % len(villages)],
+        "land_size_acres": rng.uniform(0.5, 10, n_farmers).round(2),
+        "kharif_crop": rng.choice(np.array(["Paddy", "Jowar", None], dtype=object), n_farmers, p=[0.6, 0.35, 0.05]),
+        "rabi_crop": rng.choice(np.array(["Wheat", "Oats"], dtype=object), n_farmers),
+        "soil_type": rng.choice(np.array(["Alluvial", "Clay", "Loamy", "Red"], dtype=object), n_farmers),
+        "last_subsidy_date": "2023-01-01",
+    })
+    farmers.loc[5, "phone_no"] = farmers.loc[6, "phone_no"]           # shared phone
+    farmers.loc[8, "village"] = "Rampur Village"                         # spelling variant
+    dealers = pd.DataFrame({
+        "dealer_id": [f"DEA{i:02d}" for i in range(n_dealers)],
+        "aadhar_no": rng.integers(10 ** 11, 10 ** 12, n_dealers),
+        "village": villages[np.arange(n_dealers) % len(villages)],
+        "license_active": np.arange(n_dealers) != 3,
+        "license_expiry": "2030-01-01",
+    })
+    dealers.loc[0, "aadhar_no"] = farmers.loc[1, "aadhar_no"]          # farmer aadhar used by a dealer
+    farmer = rng.integers(0, n_farmers, n_relations)
+    dealer = np.where(rng.random(n_relations) < 0.8, farmer % len(villages), rng.integers(0, n_dealers, n_relations))
+    relations = pd.DataFrame({
+        "dealer_id": dealers["dealer_id"].to_numpy()[dealer],
+        "dealer_aadhar": dealers["aadhar_no"].to_numpy()[dealer],
+        "farmer_id": farmers["farmer_id"].to_numpy()[farmer],
+        "relationship_date": pd.Timestamp("2023-02-01") + pd.to_timedelta(rng.integers(0, 300, n_relations), unit="D"),
+        "claimed_fertiliser_qty_kg": (farmers["land_size_acres"].to_numpy()[farmer] * rng.uniform(40, 400, n_relations)).round(0),
+        "relationship_status": rng.choice(np.array(["Active", "Inactive"], dtype=object), n_relations, p=[0.9, 0.1]),
+        "max_allowed_txns_per_year": 3,
+    })
+    relations["relationship_date"] = relations["relationship_date"].dt.strftime("%Y-%m-%d")
+    relations.loc[10, "dealer_aadhar"] = 123                             # wrong dealer aadhar
+    relations.loc[11, "farmer_id"] = "FAR9999"                            # unregistered farmer
+    return farmers, dealers, relations
+
+
+@pytest.fixture
+def requests_for(risk_engine):
+    """Kiosk requests: one per relationship plus random farmer/dealer pairs and unknown IDs."""
+    def build(farmers, dealers, relations, extra=200, seed=0):
+        from evaluate import build_requests
+        rng = np.random.default_rng(seed)
+        random_pairs = pd.DataFrame({
+            "farmer_id": rng.choice(np.append(farmers["farmer_id"].to_numpy(dtype=object), "NOPE"), extra),
+            "Dealer_ID": rng.choice(np.append(dealers["dealer_id"].to_numpy(dtype=object), "DEA_X"), extra),
+            "Dealer_Aadhar": None,
+            "Crop": rng.choice(np.array(["Rice", "Jowar", "Wheat", "Oats", "Maize"], dtype=object), extra),
+        })
+        return pd.concat([build_requests(farmers, relations), random_pairs], ignore_index=True)
+    return build
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from benami import find_identity_clusters
+
+
+def _farmers():
+    return pd.DataFrame({
+        "farmer_id": ["F0", "F1", "F2", "F3", "F4", "F5", "F6"],
+        "phone_no": [9000000001, 9000000001, 9000000002, np.nan, np.nan, 111, 9000000005],
+        "aadhar_no": ["A1", "A2", "A2", "", "", "A5", "A6"],
+    })
+
+
+def _cluster_of(result, farmers, farmer_id):
+    return result["labels"][farmers.index[farmers["farmer_id"] == farmer_id][0]]
+
+
+def test_shared_identifiers_link_farmers_transitively():
+    farmers = _farmers()
+    result = find_identity_clusters(farmers)
+    labels = result["labels"]
+    assert labels[0] == labels[1] == labels[2] >= 0   # F0-F1 phone, F1-F2 aadhar
+    assert labels[3] == labels[4] == -1               # missing values link nobody
+    assert labels[5] == labels[6] == -1
+    clusters = result["clusters"]
+    assert len(clusters) == 1
+    assert sorted(clusters.loc[0, "farmer_ids"]) == ["F0", "F1", "F2"]
+
+
+def test_dealer_aadhar_links_dealer_to_farmer_but_not_across_namespaces():
+    farmers = _farmers()
+    relations = pd.DataFrame({"dealer_id": ["D1", "D2"], "dealer_aadhar": ["A6", "111"]})
+    result = find_identity_clusters(farmers, relations)
+    clusters = result["clusters"]
+    f6 = _cluster_of(result, farmers, "F6")
+    assert f6 >= 0
+    assert clusters.loc[f6, "dealer_ids"] == ["D1"] and clusters.loc[f6, "farmer_count"] == 1
+    assert _cluster_of(result, farmers, "F5") == -1  # dealer aadhar "111" is not F5's phone 111
+    assert list(clusters["farmer_count"] + clusters["dealer_count"]) == sorted(
+        clusters["farmer_count"] + clusters["dealer_count"], reverse=True)
+
+
+def test_registry_dealers_are_read_from_aadhar_no():
+    farmers = _farmers()
+    dealers = pd.DataFrame({"dealer_id": ["D9"], "aadhar_no": ["A5"]})
+    result = find_identity_clusters(farmers, dealers_df=dealers)
+    assert result["clusters"].loc[_cluster_of(result, farmers, "F5"), "dealer_ids"] == ["D9"]
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+from chart_data import aggregate_by, build_chart_data, downsample_points, histogram
+
+
+def _tables(n=20_000, seed=0):
+    rng = np.random.default_rng(seed)
+    farmers = pd.DataFrame({
+        "farmer_id": np.arange(500), "land_size_acres": rng.uniform(0.5, 5, 500),
+        "village": rng.choice(["Rampur", "Sonpur", "Keshavpur"], 500), "kharif_crop": rng.choice(["Paddy", "Jowar"], 500),
+    })
+    transactions = pd.DataFrame({
+        "farmer_id": rng.integers(0, 520, n), "dealer_id": rng.choice([f"D{i}" for i in range(40)], n),
+        "claimed_fertiliser_qty_kg": rng.lognormal(5, 1, n),
+        "date": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, n), unit="D"),
+    })
+    return farmers, transactions
+
+
+def test_scatter_downsample_keeps_largest_claims_within_cap():
+    frame = pd.DataFrame({"x": np.arange(10_000, dtype="float64"), "y": np.random.default_rng(1).random(10_000)})
+    frame.loc[5, "y"] = np.nan
+    points, total = downsample_points(frame, "x", "y", max_points=500, keep_top=100)
+    assert total == 9_999 and len(points) == 500
+    largest = frame["y"].nlargest(100)
+    assert set(largest.index.astype("float64")) <= set(points["x"])
+    assert points["x"].is_monotonic_increasing  # original order kept
+
+    small, total = downsample_points(frame.head(50), "x", "y", max_points=500)
+    assert total == len(small) == 49
+
+
+def test_histogram_bins_count_every_finite_value_once():
+    values = np.array([1, 2, 4, 8, 16, 0, -3, np.nan, np.inf])
+    hist = histogram(values, bins=4)
+    assert hist["count"].sum() == 5
+    assert np.isclose(hist["left"].iloc[0], 1) and hist["right"].iloc[-1] >= 16
+    np.testing.assert_allclose(hist["right"].iloc[:-1].to_numpy(), hist["left"].iloc[1:].to_numpy())
+    np.testing.assert_allclose(hist["right"] / hist["left"], 2, rtol=1e-6)  # log-spaced edges
+    linear = histogram(values, bins=2, log=False)
+    assert list(linear["count"]) == [5, 2]  # edges -3, 6.5, 16
+    assert histogram([np.nan]).empty
+
+
+def test_chart_data_matches_plain_pandas():
+    farmers, transactions = _tables()
+    charts = build_chart_data(farmers, transactions)
+    merged = transactions.merge(farmers, on="farmer_id", how="left")
+    by_village = merged.groupby("village")["claimed_fertiliser_qty_kg"].agg(["size", "sum"])
+    got = charts["by_village"].set_index("village")
+    assert (got["transactions"] == by_village["size"].reindex(got.index)).all()
+    np.testing.assert_allclose(got["total_kg"], by_village["sum"].reindex(got.index))
+    assert charts["by_month"]["transactions"].sum() == len(transactions)
+    assert len(charts["by_dealer"]) == 25 and charts["by_dealer"]["total_kg"].is_monotonic_decreasing
+    assert charts["scatter_total"] == merged["land_size_acres"].notna().sum()
+    assert len(charts["scatter"]) == 5_000
+
+
+def test_aggregate_missing_key():
+    assert aggregate_by(pd.DataFrame({"village": [None], "claimed_kg": [1.0]}), "village").empty
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+from cohort_scores import OUTLIER_Z, StreamingCohortStats, score_cohorts
+
+
+def _frame(n, crop="Paddy", soil="Clay", village="Rampur"):
+    return pd.DataFrame({"kharif_crop": [crop] * n, "soil_type": [soil] * n, "village": [village] * n})
+
+
+def test_batch_scores_flag_cohort_outlier():
+    rng = np.random.default_rng(0)
+    farmers = pd.DataFrame({
+        "farmer_id": np.arange(100), "land_size_acres": np.ones(100),
+        "kharif_crop": "Paddy", "soil_type": "Clay", "village": "Rampur",
+    })
+    claimed = rng.normal(100, 5, 100)
+    claimed[7] = 1000
+    scored, stats = score_cohorts(pd.DataFrame({"farmer_id": np.arange(100), "claimed_fertiliser_qty_kg": claimed}), farmers)
+    assert scored["robust_z"].idxmax() == 7
+    assert scored.loc[7, "robust_z"] > OUTLIER_Z
+    assert (np.abs(scored["robust_z"].drop(7)) < OUTLIER_Z).all()
+
+
+def test_streaming_matches_batch_median_within_bin_resolution():
+    rng = np.random.default_rng(1)
+    values = rng.lognormal(5, 0.3, 5000)
+    stream = StreamingCohortStats()
+    for start in range(0, 5000, 1000):
+        stream.update(_frame(1000), values[start:start + 1000])
+    stats = stream.stats()
+    assert len(stats) == 1
+    assert abs(stats["median"].iloc[0] / np.median(values) - 1) < 0.01
+
+
+def test_streaming_score_of_unseen_cohort_uses_global_stats():
+    rng = np.random.default_rng(2)
+    stream = StreamingCohortStats().update(_frame(500), rng.normal(100, 5, 500))
+    before = stream.hist.copy()
+
+    z = stream.score(_frame(3, crop="Jowar", soil="Red", village="Sonpur"), [100.0, 100.0, 1000.0])
+
+    assert np.all(np.isfinite(z))
+    assert abs(z[0]) < 1 and z[2] > OUTLIER_Z
+    assert len(stream.cohorts) == 1  # scoring does not register the new cohort
+    np.testing.assert_array_equal(stream.hist, before)
+
+
+def test_streaming_score_mixes_known_and_unseen_cohorts():
+    stream = StreamingCohortStats().update(_frame(100), np.full(100, 50.0))
+    frame = pd.concat([_frame(1), _frame(1, village="Elsewhere")], ignore_index=True)
+    z = stream.score(frame, [50.0, 50.0])
+    np.testing.assert_allclose(z, 0, atol=0.1)
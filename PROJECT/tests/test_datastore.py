@@ -0,0 +1,50 @@
+import gc
+
+import pandas as pd
+
+from datastore import DatasetStore
+
+
+def _loader(calls, rows=3):
+    def load():
+        calls.append(rows)
+        return pd.DataFrame({"farmer_id": range(rows)})
+    return load
+
+
+def test_identical_bytes_share_one_frame():
+    store, calls = DatasetStore(), []
+    first = store.acquire("digest", _loader(calls), "upload-1")
+    second = store.acquire("digest", _loader(calls), "upload-2")
+    assert len(calls) == 1
+    assert first.frame is not second.frame
+    assert first._frame is second._frame
+    assert store.stats().set_index("digest").loc["digest", "refs"] == 2
+
+
+def test_edits_through_a_handle_stay_private():
+    store = DatasetStore()
+    handle = store.acquire("digest", _loader([]))
+    frame = handle.frame
+    frame.loc[0, "farmer_id"] = 99
+    assert store.acquire("digest", _loader([])).frame.loc[0, "farmer_id"] == 0
+
+
+def test_released_datasets_are_evicted_least_recent_first():
+    store, calls = DatasetStore(max_idle=2), []
+    handles = {digest: store.acquire(digest, _loader(calls)) for digest in ("a", "b", "c")}
+    assert store.stats()["refs"].tolist() == [1, 1, 1]
+
+    for digest in ("a", "b", "c"):
+        del handles[digest]
+        gc.collect()
+    assert "a" not in store and "b" in store and "c" in store
+
+    kept = store.acquire("b", _loader(calls))  # reused, not reloaded, and no longer idle
+    assert len(calls) == 3
+    store.acquire("d", _loader(calls))  # released at once: idle are c, d
+    gc.collect()
+    assert "b" in store and "c" in store and "d" in store
+    del kept
+    gc.collect()
+    assert "c" not in store and set(store.stats()["digest"]) == {"d", "b"}
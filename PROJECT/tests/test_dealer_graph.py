@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from dealer_graph import (analyze_dealer_network, build_bipartite, dealer_degrees, dense_dealer_groups,
+                          multi_village_farmers, shared_farmer_pairs)
+
+
+def _relations(seed=0):
+    """Random background plus a colluding trio (D1-D3) and a pair (D4, D5) sharing their farmer lists."""
+    rng = np.random.default_rng(seed)
+    rows = [(f"R{d}", f"F{f}") for d, f in zip(rng.integers(0, 40, 800), rng.integers(0, 2000, 800))]
+    rows += [(dealer, f"S{f}") for dealer in ("D1", "D2", "D3") for f in range(12)]
+    rows += [(dealer, f"T{f}") for dealer in ("D4", "D5") for f in range(10)]
+    rows += [("D4", f"T{f}") for f in range(10, 20)]  # D4 also serves 10 farmers of its own
+    return pd.DataFrame(rows, columns=["dealer_id", "farmer_id"])
+
+
+def test_bipartite_collapses_repeated_rows():
+    graph = build_bipartite(pd.DataFrame({"dealer_id": ["D1", "D1", "D2"], "farmer_id": ["F1", "F1", "F1"]}))
+    assert graph["matrix"].nnz == 2
+    assert list(dealer_degrees(graph)["farmer_count"]) == [1, 1]
+
+
+def test_shared_pairs_flag_only_colluding_dealers():
+    pairs = shared_farmer_pairs(build_bipartite(_relations()))
+    flagged = {frozenset(pair) for pair in zip(pairs["dealer_a"], pairs["dealer_b"])}
+    assert flagged == {frozenset(p) for p in [("D1", "D2"), ("D1", "D3"), ("D2", "D3"), ("D4", "D5")]}
+    assert (pairs["lift"] >= 3).all()
+
+
+def test_dense_groups_membership_and_density():
+    graph = build_bipartite(_relations())
+    groups = dense_dealer_groups(graph, shared_farmer_pairs(graph)).set_index("dealer_count")
+    assert sorted(groups.loc[3, "dealer_ids"]) == ["D1", "D2", "D3"]
+    assert groups.loc[3, "shared_farmer_count"] == 12 and groups.loc[3, "density"] == 1.0
+    assert sorted(groups.loc[2, "dealer_ids"]) == ["D4", "D5"]
+    assert groups.loc[2, "shared_farmer_count"] == 10  # D4's own farmers are not shared
+
+
+def test_dense_groups_threshold_and_empty():
+    graph = build_bipartite(_relations())
+    assert dense_dealer_groups(graph, shared_farmer_pairs(graph, min_shared=11)).shape[0] == 1
+    empty = dense_dealer_groups(graph, shared_farmer_pairs(graph, min_shared=100))
+    assert empty.empty and list(empty.columns) == ["dealer_count", "shared_farmer_count", "density", "dealer_ids"]
+
+
+def test_multi_village_farmers():
+    relations = pd.DataFrame({"dealer_id": ["A", "B", "C", "D", "A"], "farmer_id": ["F1", "F1", "F1", "F1", "F2"]})
+    dealers = pd.DataFrame({"dealer_id": ["A", "B", "C", "D"], "village": ["V1", "V2", "V3", "V1"]})
+    farmers = pd.DataFrame({"farmer_id": ["F1", "F2"], "village": ["V1", "V1"]})
+    flagged = multi_village_farmers(build_bipartite(relations), dealers, farmers)
+    assert list(flagged["farmer_id"]) == ["F1"]
+    assert flagged.loc[0, "dealer_village_count"] == 3 and flagged.loc[0, "out_of_village_dealers"] == 2
+    report = analyze_dealer_network(relations, dealers, farmers)
+    assert report["edges"] == 5
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dealer_profiles import DealerProfiles
+
+N_DEALERS = 20
+
+
+def _profiles():
+    farmers = [f"F{i}" for i in range(100)]
+    return DealerProfiles(farmers, np.full(100, 100.0), np.arange(100) % 5,
+                          [f"D{i}" for i in range(N_DEALERS)], np.arange(N_DEALERS) % 5)
+
+
+def _relations(seed=0, n=400):
+    rng = np.random.default_rng(seed)
+    dealer = rng.integers(0, N_DEALERS, n)
+    farmer = (dealer % 5) + 5 * rng.integers(0, 20, n)  # same village as the dealer
+    return pd.DataFrame({
+        "dealer_id": [f"D{d}" for d in dealer],
+        "farmer_id": [f"F{f}" for f in farmer],
+        "claimed_fertiliser_qty_kg": rng.normal(100, 5, n),
+        "relationship_status": "Active",
+    })
+
+
+def test_outlier_dealer_is_flagged():
+    relations = _relations()
+    relations.loc[relations["dealer_id"] == "D3", "claimed_fertiliser_qty_kg"] *= 10
+    profiles = _profiles().update(relations)
+    assert profiles.flagged("D3") and profiles.flagged(" D3 ")
+    assert profiles.flagged_many(["D3", "D4", "NOPE"]).tolist() == [True, False, False]
+    assert profiles.profile("D3")["claim_ratio"] == pytest.approx(10, rel=0.05)
+    assert profiles.profile("NOPE") is None
+
+
+def test_incremental_updates_equal_one_pass():
+    relations = pd.concat([_relations(0), _relations(1)], ignore_index=True)
+    relations.loc[::7, "farmer_id"] = "UNKNOWN"
+    once = _profiles().update(relations).table().set_index("dealer_id").sort_index()
+    incremental = _profiles()
+    for start in range(0, len(relations), 150):
+        incremental = incremental.copy().update(relations.iloc[start:start + 150])
+    pd.testing.assert_frame_equal(incremental.table().set_index("dealer_id").sort_index(), once)
+
+
+def test_distinct_farmers_counted_once_across_updates():
+    row = {"dealer_id": "D1", "farmer_id": "F1", "claimed_fertiliser_qty_kg": 10.0, "relationship_status": "Active"}
+    profiles = _profiles().update(pd.DataFrame([row, row]))
+    profiles = profiles.copy().update(pd.DataFrame([row, {**row, "farmer_id": "F6"}, {**row, "farmer_id": "GHOST"}]))
+    profile = profiles.profile("D1")
+    assert profile["relationships"] == 5 and profile["farmers"] == 3
+    assert profile["unknown_farmer_rate"] == pytest.approx(1 / 5)
+
+
+def test_copy_leaves_the_original_untouched():
+    original = _profiles().update(_relations(0))
+    before = original.table()
+    updated = original.copy().update(_relations(1))
+    pd.testing.assert_frame_equal(original.table(), before)
+    assert updated.table()["relationships"].sum() == 2 * before["relationships"].sum()
+
+
+def test_superseded_and_frozen_profiles_cannot_be_updated():
+    original = _profiles().update(_relations(0))
+    original.copy().update(_relations(1))
+    with pytest.raises(ValueError):
+        original.update(_relations(2))
+    frozen = original.frozen()
+    assert frozen.flagged_many(["D1"]).tolist() == original.flagged_many(["D1"]).tolist()
+    with pytest.raises(TypeError):
+        frozen.update(_relations(2))
@@ -0,0 +1,33 @@
+import numpy as np
+
+from evaluate import SCENARIO_SIGNALS, build_requests, run_harness, scenario_metrics
+
+
+def test_harness_scores_its_own_snapshot(risk_engine, registry_tables):
+    farmers, dealers, relations = registry_tables
+    relations = relations.assign(fraud_label=np.where(relations.index % 7 == 0, "over_claim", "genuine"))
+    before = risk_engine.current_registry()
+    report = run_harness(farmers, dealers, relations, scalar_sample=40)
+    assert risk_engine.current_registry() is before
+    assert report["agreement"] == 1.0
+    performance = report["performance"].set_index("path")
+    assert np.isnan(performance.loc["batch", "p50_ms"]) and performance.loc["batch", "mean_ms"] > 0
+    assert performance.loc["scalar", "p50_ms"] <= performance.loc["scalar", "p95_ms"]
+
+
+def test_requests_use_the_kiosk_crop_names(risk_engine, registry_tables):
+    farmers, _, relations = registry_tables
+    requests = build_requests(farmers, relations)
+    kharif = relations["farmer_id"].map(farmers.set_index("farmer_id")["kharif_crop"])
+    assert (requests["Crop"][kharif == "Paddy"] == "Rice").all()
+    assert set(requests["Crop"]) <= set(risk_engine.CROPS)
+
+
+def test_scenario_metrics_on_reason_fragments():
+    labels = np.array(["fake_farmer", "genuine", "fake_farmer", "genuine"], dtype=object)
+    reasons = ["Farmer not in government registry", "", "", "Farmer not in government registry"]
+    decisions = np.array(["BLOCK", "APPROVE", "APPROVE", "REVIEW"], dtype=object)
+    metrics = scenario_metrics(reasons, decisions, labels).set_index("scenario")
+    assert list(metrics.index) == [*SCENARIO_SIGNALS, "overall"]
+    assert metrics.loc["fake_farmer", "precision"] == 0.5 and metrics.loc["fake_farmer", "recall"] == 0.5
+    assert metrics.loc["overall", "flagged"] == 2
@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from export import TableWriter, export_analysis, iter_frame_chunks
+
+
+def _farmers():
+    return pd.DataFrame({
+        "farmer_id": ["F1", "F2", "F3"], "land_size_acres": [1.0, 2.0, 0.5],
+        "village": ["Rampur", "Sonpur", "Rampur"], "aadhar_no": ["A1", "A1", "A3"], "phone_no": ["9", "8", "7"],
+    })
+
+
+def _transactions():
+    return pd.DataFrame({
+        "farmer_id": ["F1", "F2", "F3", "F1", "F9"],
+        "dealer_id": ["D1", "D1", "D2", "D2", "D1"],
+        "claimed_fertiliser_qty_kg": [2000.0, 100.0, 900.0, 50.0, 10.0],
+        "note": [1, 2, "x", "y", None],  # undeclared, int in one chunk and str in the next
+    })
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "csv"])
+def test_chunks_with_different_inferred_dtypes_export(tmp_path, fmt):
+    transactions = _transactions()
+    chunks = [transactions.iloc[:2].astype({"note": "int64"}), transactions.iloc[2:]]
+    result = export_analysis(_farmers(), chunks, str(tmp_path), fmt)
+    path, rows = result["flagged_transactions"]
+    flagged = pd.read_parquet(path) if fmt == "parquet" else pd.read_csv(path)
+    assert rows == 2 and list(flagged["farmer_id"]) == ["F1", "F3"]
+    np.testing.assert_allclose(flagged["qty_per_acre"], [2000.0, 1800.0])
+
+    summary = result["dealer_summary"][0]
+    summary = pd.read_parquet(summary) if fmt == "parquet" else pd.read_csv(summary)
+    assert summary.set_index("dealer_id").loc["D1", "transactions"] == 3
+    clusters = result["benami_clusters"][0]
+    clusters = pd.read_parquet(clusters) if fmt == "parquet" else pd.read_csv(clusters)
+    assert sorted(clusters["member_id"]) == ["F1", "F2"]
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_concurrent_writers_never_share_a_partial_file(tmp_path):
+    path = str(tmp_path / "out.parquet")
+    first = TableWriter(path, "parquet", ["a"], {"a": "int64"})
+    second = TableWriter(path, "parquet", ["a"], {"a": "int64"})
+    first.write(pd.DataFrame({"a": [1, 2]}))
+    second.write(pd.DataFrame({"a": [3]}))
+    first.close()
+    assert list(pd.read_parquet(path)["a"]) == [1, 2]
+    second.close()
+    assert list(pd.read_parquet(path)["a"]) == [3]
+    assert os.listdir(tmp_path) == ["out.parquet"]
+
+
+def test_failed_export_keeps_the_previous_file(tmp_path):
+    path = str(tmp_path / "out.csv")
+    with TableWriter(path, "csv", ["a"]) as writer:
+        writer.write(pd.DataFrame({"a": ["old"]}))
+    with pytest.raises(RuntimeError):
+        with TableWriter(path, "csv", ["a"]) as writer:
+            writer.write(pd.DataFrame({"a": ["new"]}))
+            raise RuntimeError("interrupted")
+    assert list(pd.read_csv(path)["a"]) == ["old"]
+    assert os.listdir(tmp_path) == ["out.csv"]
+
+
+def test_empty_export_has_a_header(tmp_path):
+    result = export_analysis(_farmers().iloc[:0], iter_frame_chunks(_transactions().iloc[:0]), str(tmp_path), "csv")
+    path, rows = result["flagged_transactions"]
+    assert rows == 0
+    assert list(pd.read_csv(path).columns) == ["farmer_id", "claimed_fertiliser_qty_kg", "land_size_acres", "village", "qty_per_acre"]
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+from farmer_index import (build_farmer_index, farmer_search_keys, farmer_transaction_rows,
+                          find_farmer_position, lookup_farmer_columns)
+
+
+def _tables():
+    farmers = pd.DataFrame({
+        "farmer_id": ["FAR010000", "FAR000002", "FAKEFAR00001", "FAR000002"],
+        "land_size_acres": [2.0, 3.5, 1.0, 9.0],
+        "village": ["Rampur", "Sonpur", "Keshavpur", "Madhopur"],
+    })
+    transactions = pd.DataFrame({
+        "farmer_id": ["FAR000002", "FAR010000", "FAR999999", "FAR000002", "FAKEFAR00001"],
+        "claimed_fertiliser_qty_kg": [10, 20, 30, 40, 50],
+    })
+    return farmers, transactions
+
+
+def test_search_keys_normalize_prefix_zeros_and_case():
+    for typed in ["FAR010000", "far 010000", "10000", 10000]:
+        assert farmer_search_keys(typed)[-1] == "10000"
+    assert farmer_search_keys("FAKEFAR00001") == ["FAKEFAR00001"]
+
+
+def test_find_farmer_position_prefers_exact_ids_and_first_duplicate():
+    farmers, transactions = _tables()
+    index = build_farmer_index(farmers, transactions)
+    assert find_farmer_position(index, "far010000")[0] == 0
+    assert find_farmer_position(index, "2")[0] == 1
+    assert find_farmer_position(index, "FAKEFAR00001")[0] == 2
+    assert find_farmer_position(index, "1")[0] is None  # FAKEFAR00001 only matches exactly
+    assert find_farmer_position(index, "FAR123")[0] is None
+
+
+def test_transaction_rows_group_by_farmer_in_input_order():
+    farmers, transactions = _tables()
+    index = build_farmer_index(farmers, transactions)
+    assert list(farmer_transaction_rows(index, 1)) == [0, 3]
+    assert list(farmer_transaction_rows(index, 0)) == [1]
+    assert list(farmer_transaction_rows(index, 3)) == []  # duplicate row: transactions go to the first
+
+
+def test_lookup_farmer_columns_matches_a_left_merge():
+    farmers, transactions = _tables()
+    looked_up = lookup_farmer_columns(transactions, farmers)
+    merged = transactions.merge(farmers.drop_duplicates("farmer_id"), on="farmer_id", how="left")
+    np.testing.assert_array_equal(looked_up["land_size_acres"], merged["land_size_acres"].to_numpy())
+    assert list(pd.Series(looked_up["village"]).fillna("-")) == list(merged["village"].fillna("-"))
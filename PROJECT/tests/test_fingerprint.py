@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from fingerprint import dataset_fingerprint, frame_fingerprint
+
+
+def _frame(n=1000):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({"farmer_id": [f"FAR{i}" for i in range(n)], "kg": rng.uniform(0, 100, n)})
+
+
+def test_equal_content_gives_equal_fingerprint():
+    assert frame_fingerprint(_frame()) == frame_fingerprint(_frame().copy())
+
+
+def test_any_cell_edit_changes_fingerprint():
+    df = _frame()
+    for row, col, value in [(501, "kg", 0.5), (333, "farmer_id", "FAKE"), (999, "farmer_id", "FAR0")]:
+        edited = df.copy()
+        edited.loc[row, col] = value
+        assert frame_fingerprint(df, chunk_rows=64) != frame_fingerprint(edited, chunk_rows=64)
+
+
+def test_chunking_and_dtypes():
+    df = _frame()
+    assert frame_fingerprint(df, chunk_rows=64) == frame_fingerprint(df, chunk_rows=10_000)
+    assert frame_fingerprint(df) != frame_fingerprint(df.astype({"kg": "float32"}))
+    assert frame_fingerprint(df) != frame_fingerprint(df.astype({"farmer_id": "category"}))
+
+
+def test_dataset_fingerprint_depends_on_order_and_missing_frames():
+    a, b = _frame(10), _frame(20)
+    assert dataset_fingerprint(a, b) != dataset_fingerprint(b, a)
+    assert dataset_fingerprint(a, None) != dataset_fingerprint(a)
+    assert dataset_fingerprint("digest-a", b) == dataset_fingerprint("digest-a", b.copy())
+    assert dataset_fingerprint("ab", "c") != dataset_fingerprint("a", "bc")
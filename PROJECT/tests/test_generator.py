@@ -0,0 +1,49 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "Saish"))
+import initial  # noqa: E402  (Saish/initial.py, the synthetic registry generator)
+
+SMALL = {"n_farmers": 300, "n_dealers": 20, "core_size": 600, "fraud_size": 30}
+
+
+def _read(out_dir):
+    return {name: open(os.path.join(out_dir, f"{file}.csv"), "rb").read() for name, file in initial.OUTPUT_NAMES.items()}
+
+
+def test_same_seed_gives_the_same_frames(tmp_path):
+    first = initial.generate_enhanced_synthetic_datasets(seed=7, out_dir=str(tmp_path / "a"), **SMALL)
+    second = initial.generate_enhanced_synthetic_datasets(seed=7, out_dir=str(tmp_path / "b"), **SMALL)
+    for a, b in zip(first, second):
+        pd.testing.assert_frame_equal(a, b)
+    assert _read(tmp_path / "a") == _read(tmp_path / "b")
+    other = initial.generate_enhanced_synthetic_datasets(seed=8, out_dir=str(tmp_path / "c"), **SMALL)
+    assert not other[0].equals(first[0])
+
+
+def test_generated_registry_is_consistent(tmp_path):
+    farmers, dealers, relations = initial.generate_enhanced_synthetic_datasets(seed=1, out_dir=str(tmp_path), **SMALL)
+    assert len(farmers) == 300 and len(dealers) == 20
+    assert len(relations) >= 630  # core + fraud rows, plus injected limit-abuse repeats
+    assert farmers["farmer_id"].is_unique
+    genuine = relations["fraud_label"] == initial.GENUINE
+    assert relations.loc[genuine, "farmer_id"].isin(farmers["farmer_id"]).all()
+    assert relations["dealer_id"].isin(dealers["dealer_id"]).all()
+
+
+@pytest.mark.parametrize("formats", [("csv",), ("parquet",)])
+def test_chunked_output_is_independent_of_worker_count(tmp_path, formats):
+    for workers in (1, 3):
+        initial.generate_chunked_datasets(str(tmp_path / f"w{workers}"), chunk_rows=70, workers=workers,
+                                          seed=3, formats=formats, **SMALL)
+    if formats == ("csv",):
+        one, many = _read(tmp_path / "w1"), _read(tmp_path / "w3")
+        assert one == many
+        farmers = pd.read_csv(tmp_path / "w1" / "government_farmers.csv")
+        assert len(farmers) == 300 and farmers["farmer_id"].is_unique
+    else:
+        for file in initial.OUTPUT_NAMES.values():
+            pd.testing.assert_frame_equal(pd.read_parquet(tmp_path / "w1" / file), pd.read_parquet(tmp_path / "w3" / file))
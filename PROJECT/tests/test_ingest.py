@@ -0,0 +1,48 @@
+import functools
+import io
+import os
+
+import pandas as pd
+
+import ingest
+
+
+def _upload(text, name="relationships.csv"):
+    file = io.BytesIO(text.encode())
+    file.name = name
+    return file
+
+
+def _relationships(rows=6, note=True):
+    lines = ["dealer_id,farmer_id,claimed_fertiliser_qty_kg,relationship_date" + (",note" if note else "")]
+    for i in range(rows):
+        line = f"DEA{i % 2},FAR{i},{10 * i},2024-01-0{i % 9 + 1}"
+        if note:
+            line += f",{i}" if i < rows // 2 else f",text{i}"  # undeclared column: ints, then strings
+        lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def test_typed_chunks_keep_declared_dtypes():
+    df = ingest.read_csv_typed(_upload(_relationships()), chunk_rows=2)
+    assert isinstance(df["dealer_id"].dtype, pd.CategoricalDtype)
+    assert df["claimed_fertiliser_qty_kg"].dtype == "float64"
+    assert df["relationship_date"].dtype.kind == "M"
+    assert len(df) == 6
+
+
+def test_unwritable_frame_still_loads_and_leaves_no_temp_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest, "read_csv_typed", functools.partial(ingest.read_csv_typed, chunk_rows=3))
+    df = ingest.load_upload(_upload(_relationships()), cache_dir=str(tmp_path))
+    assert len(df) == 6
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_cache_is_reused_and_bounded(tmp_path):
+    first = ingest.load_upload(_upload(_relationships(note=False)), cache_dir=str(tmp_path), max_files=3)
+    assert len(os.listdir(tmp_path)) == 1
+    again = ingest.load_upload(_upload(_relationships(note=False)), cache_dir=str(tmp_path), max_files=3)
+    pd.testing.assert_frame_equal(again, first)
+    for rows in range(1, 6):
+        ingest.load_upload(_upload(_relationships(rows, note=False)), cache_dir=str(tmp_path), max_files=3)
+    assert len(os.listdir(tmp_path)) == 3
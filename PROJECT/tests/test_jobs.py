@@ -0,0 +1,107 @@
+import gc
+import threading
+import time
+
+import pandas as pd
+
+from benami import find_identity_clusters
+from jobs import JobManager, SlotLease
+
+
+def _wait(job, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not job.finished and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return job.status
+
+
+def _blocking(gate, progress):
+    while not gate.wait(0.01):
+        progress(0.5, "Waiting")
+    progress(0.9)
+    return "ok"
+
+
+def test_released_slot_cancels_its_job_and_drops_previous():
+    manager = JobManager()
+    done = manager.submit("a", "first", lambda progress: "first")
+    assert _wait(done) == "done"
+    deadline = time.monotonic() + 5
+    while manager.previous("a") is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert manager.previous("a") is done
+
+    gate = threading.Event()
+    job = manager.submit("a", "second", _blocking, gate)
+    manager.release("a")
+    manager.submit("b", "other", lambda progress: None)
+    assert _wait(job) == "cancelled"
+    assert manager.previous("a") is None
+    assert manager.slots == 1
+
+
+def test_idle_slots_expire_after_ttl():
+    manager = JobManager(slot_ttl=0.05)
+    gate = threading.Event()
+    job = manager.submit("idle", "key", _blocking, gate)
+    time.sleep(0.1)
+    manager.submit("fresh", "other", lambda progress: None)
+    assert _wait(job) == "cancelled"
+    assert manager.slots == 1
+
+
+def test_shared_job_survives_one_slot_leaving():
+    manager = JobManager()
+    gate = threading.Event()
+    job = manager.submit("a", "key", _blocking, gate)
+    assert manager.submit("b", "key", _blocking, gate) is job
+    manager.release("a")
+    manager.submit("c", "other", lambda progress: None)
+    gate.set()
+    assert _wait(job) == "done"
+    deadline = time.monotonic() + 5
+    while manager.previous("b") is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert manager.previous("b") is job
+
+
+def test_failed_job_is_shown_once_then_resubmitted():
+    manager = JobManager()
+    calls = []
+
+    def flaky(progress):
+        calls.append(1)
+        if len(calls) == 1:
+            raise ValueError("bad input")
+        return "ok"
+
+    failed = manager.submit("a", "key", flaky)
+    assert _wait(failed) == "failed" and failed.error == "bad input"
+    deadline = time.monotonic() + 5
+    while "a" not in manager._failed and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert manager.submit("a", "key", flaky) is failed
+    retry = manager.submit("a", "key", flaky)
+    assert retry is not failed and _wait(retry) == "done"
+    assert len(calls) == 2
+
+
+def test_slot_lease_releases_on_collection():
+    manager = JobManager()
+    lease = SlotLease(manager)
+    slot = lease.slot
+    manager.submit(slot, "key", lambda progress: None)
+    del lease
+    gc.collect()
+    manager.submit("other", "key2", lambda progress: None)
+    assert manager.slots == 1
+
+
+def test_identity_clustering_reports_progress_between_steps():
+    farmers = pd.DataFrame({
+        "farmer_id": [1, 2, 3], "aadhar_no": ["1111", "1111", "2222"],
+        "phone_no": ["9", "8", "7"], "bank_account_no": ["a", "b", "c"],
+    })
+    calls = []
+    find_identity_clusters(farmers, progress=lambda fraction, message: calls.append(fraction))
+    assert calls == sorted(calls) and len(calls) >= 2
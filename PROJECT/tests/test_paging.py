@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from paging import FlaggedTable
+
+
+@pytest.fixture
+def tables():
+    rng = np.random.default_rng(0)
+    farmers = pd.DataFrame({
+        "farmer_id": [f"F{i:03d}" for i in range(200)], "land_size_acres": rng.uniform(0.1, 2, 200).round(1),
+        "village": rng.choice(["Rampur", "Sonpur", "Keshavpur"], 200),
+    })
+    transactions = pd.DataFrame({
+        "farmer_id": rng.choice(np.append(farmers["farmer_id"].to_numpy(), "F999"), 3000),
+        "dealer_id": rng.choice([f"D{i}" for i in range(15)], 3000),
+        "claimed_fertiliser_qty_kg": rng.uniform(10, 3000, 3000).round(0),
+    })
+    return farmers, transactions
+
+
+def _reference(farmers, transactions):
+    merged = transactions.merge(farmers, on="farmer_id", how="left")
+    merged["qty_per_acre"] = merged["claimed_fertiliser_qty_kg"] / merged["land_size_acres"]
+    return merged[merged["qty_per_acre"] > 1500].rename_axis("row").reset_index()
+
+
+@pytest.mark.parametrize("sort_by,ascending", [("qty_per_acre", False), ("village", True), ("dealer_id", False),
+                                               ("farmer_id", True), ("land_size_acres", True)])
+def test_sorted_filtered_pages_match_pandas(tables, sort_by, ascending):
+    farmers, transactions = tables
+    table = FlaggedTable(farmers, transactions)
+    reference = _reference(farmers, transactions)
+    assert len(table) == len(reference)
+
+    expected = reference[(reference["village"] == "Sonpur") & (reference["dealer_id"] == "D3")]
+    expected = expected.sort_values(sort_by, ascending=ascending, kind="stable")
+    rows = []
+    page, pages = 1, 1
+    while page <= pages:
+        part, matching, pages = table.page(sort_by, ascending, {"village": "Sonpur", "dealer_id": "D3"}, page, 7)
+        assert matching == len(expected) and len(part) <= 7
+        rows += list(part["row"])
+        page += 1
+    assert rows == list(expected["row"])
+
+
+def test_page_bounds_and_ignored_filters(tables):
+    table = FlaggedTable(*tables)
+    first, total, pages = table.page(page=0, page_size=25, filters={"village": "All", "missing": "x"})
+    assert total == len(table) and pages == -(-len(table) // 25)
+    assert first.equals(table.page(page=1, page_size=25)[0])
+    last = table.page(page=10_000, page_size=25)[0]
+    assert last.equals(table.page(page=pages, page_size=25)[0]) and 0 < len(last) <= 25
+
+    empty, matching, pages = table.page(filters={"village": "Nowhere"})
+    assert empty.empty and matching == 0 and pages == 1
+    assert table.options("village") == ["Keshavpur", "Rampur", "Sonpur"]
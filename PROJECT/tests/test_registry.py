@@ -0,0 +1,68 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from registry import Registry, RegistrySnapshot
+
+
+def _tables():
+    return (pd.DataFrame({"farmer_id": ["F1"]}), pd.DataFrame({"dealer_id": ["D1"]}),
+            pd.DataFrame({"dealer_id": ["D1"], "farmer_id": ["F1"]}))
+
+
+def test_derived_values_are_built_once():
+    snapshot = RegistrySnapshot(1, *_tables())
+    calls = []
+    build = lambda s: calls.append(s) or len(s.farmers)
+    assert snapshot.derived("n", ["farmers"], build) == 1
+    assert snapshot.derived("n", ["farmers"], build) == 1
+    assert len(calls) == 1
+
+
+def test_replace_carries_only_derived_values_of_unchanged_tables():
+    snapshot = RegistrySnapshot(1, *_tables())
+    snapshot.derived("farmer_count", ["farmers"], lambda s: len(s.farmers))
+    snapshot.derived("dealer_count", ["dealers"], lambda s: len(s.dealers))
+    snapshot.derived("pair_count", ["dealers", "relations"], lambda s: len(s.relations))
+
+    farmers = pd.DataFrame({"farmer_id": ["F1", "F2"]})
+    new = snapshot.replace(2, farmers=farmers, relations=snapshot.relations.iloc[:0],
+                           derived={"farmer_count": (["farmers"], 2)}, keep=("pair_count",))
+    assert new.version == 2 and new.dealers is snapshot.dealers
+    assert new.derived("farmer_count", ["farmers"], lambda s: -1) == 2     # supplied
+    assert new.derived("dealer_count", ["dealers"], lambda s: -1) == 1     # untouched table
+    assert new.derived("pair_count", ["relations"], lambda s: -1) == 1     # kept on request
+    assert snapshot.derived("farmer_count", ["farmers"], lambda s: -1) == 1
+
+
+def test_snapshots_do_not_see_later_edits_of_the_source_frames():
+    farmers, dealers, relations = _tables()
+    snapshot = RegistrySnapshot(1, farmers, dealers, relations)
+    farmers.loc[0, "farmer_id"] = "CHANGED"
+    assert snapshot.farmers.loc[0, "farmer_id"] == "F1"
+
+
+def test_snapshots_do_not_share_arrays_with_the_source_frames():
+    farmers, dealers, _ = _tables()
+    qty = np.array([[10.0]])
+    relations = pd.DataFrame(qty, columns=["qty"], copy=False)  # edits of qty write through, copy-on-write or not
+    snapshot = RegistrySnapshot(1, farmers, dealers, relations)
+    qty[0, 0] = 99.0
+    new = snapshot.replace(2, relations=relations)
+    qty[0, 0] = 42.0
+    assert relations.loc[0, "qty"] == 42.0
+    assert snapshot.relations.loc[0, "qty"] == 10.0 and new.relations.loc[0, "qty"] == 99.0
+
+
+def test_registry_publishes_serialized_versions():
+    registry = Registry(*_tables())
+    first = registry.snapshot()
+    threads = [threading.Thread(target=registry.replace, kwargs={"dealers": pd.DataFrame({"dealer_id": [str(i)]})})
+               for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert first.version == 1 and first.dealers.loc[0, "dealer_id"] == "D1"
+    assert registry.snapshot().version == 9
@@ -0,0 +1,175 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from registry import RegistrySnapshot
+
+
+@pytest.fixture
+def snapshot(registry_tables):
+    return RegistrySnapshot(1, *registry_tables)
+
+
+def test_find_farmer_and_dealer_take_the_first_matching_row(risk_engine, registry_tables):
+    farmers, dealers, relations = registry_tables
+    farmers = farmers.copy()
+    farmers.loc[50, "farmer_id"] = "FAR0003"  # duplicate ID: the first row wins
+    snapshot = RegistrySnapshot(1, farmers, dealers, relations)
+    assert risk_engine.find_farmer(" FAR0003 ", snapshot).name == 3
+    assert risk_engine.find_dealer("DEA02", snapshot)["dealer_id"] == "DEA02"
+    assert risk_engine.find_farmer("NOPE", snapshot) is None
+    assert risk_engine.find_dealer(None, snapshot) is None
+
+
+def test_get_relationship_returns_the_last_row_of_the_pair(risk_engine, snapshot):
+    relations = snapshot.relations
+    dealer_id, farmer_id = relations.loc[0, ["dealer_id", "farmer_id"]]
+    rows = relations[(relations["dealer_id"] == dealer_id) & (relations["farmer_id"] == farmer_id)]
+    assert risk_engine.get_relationship(dealer_id, farmer_id, snapshot).name == rows.index[-1]
+    assert risk_engine.get_relationship(dealer_id, "NOPE", snapshot) is None
+    assert risk_engine.get_relationship(f" {dealer_id}", farmer_id, snapshot) is None  # exact IDs only
+
+
+def test_relationship_risk_counts_rows_of_the_pair(risk_engine, snapshot):
+    relations = snapshot.relations
+    counts = relations.groupby(["dealer_id", "farmer_id"]).size()
+    (dealer_id, farmer_id), count = counts.idxmax(), counts.max()
+    rel = risk_engine.get_relationship(dealer_id, farmer_id, snapshot)
+    _, reasons = risk_engine.relationship_risk(rel, snapshot)
+    assert ("Exceeded transaction limit" in reasons) == (count > rel["max_allowed_txns_per_year"])
+
+
+def test_scalar_and_batch_paths_agree(risk_engine, snapshot, requests_for):
+    requests = requests_for(snapshot.farmers, snapshot.dealers, snapshot.relations)
+    batch = risk_engine.evaluate_risk_batch(requests, snapshot)
+    for i, request in requests.iterrows():
+        try:
+            scalar = risk_engine.evaluate_risk(request.to_dict(), snapshot)
+        except KeyError:  # crop/soil missing from fertilizer_data (the batch path gives NaN instead)
+            assert np.isnan(batch.loc[i, "Expected_Fertilizer_kg"])
+            continue
+        assert (scalar["Risk_Score"], scalar["Decision"], scalar["Reasons"]) == \
+            (batch.loc[i, "Risk_Score"], batch.loc[i, "Decision"], batch.loc[i, "Reasons"])
+
+
+def test_identity_flags(risk_engine, snapshot):
+    identity = risk_engine.identity_consistency(snapshot)
+    assert identity["farmer_aadhar_is_dealer"][1]
+    assert identity["rel_aadhar_mismatch"][10]
+
+
+# --- Time rules (license expiry, subsidy gap) ---
+
+EXPIRY = "Transaction after dealer license expiry"
+GAP = "Subsidy claimed within 90 days of the previous one"
+
+
+def _dated_registry():
+    """One relationship per case; the farmer's last subsidy was on 2024-01-01, D0's license ends 2024-06-30."""
+    cases = [  # (dealer, farmer, transaction date, last subsidy date)
+        ("D0", "F0", "2024-01-01", "2024-01-01"),  # gap 0
+        ("D0", "F1", "2024-01-02", "2024-01-01"),  # gap 1
+        ("D0", "F2", "2024-03-30", "2024-01-01"),  # gap 89
+        ("D0", "F3", "2024-03-31", "2024-01-01"),  # gap 90
+        ("D0", "F4", "2024-07-01", "2024-01-01"),  # after expiry
+        ("D1", "F5", "2024-07-01", "2024-01-01"),  # no expiry date
+        ("D0", "F6", "2024-02-01", None),          # no last subsidy date
+        ("D0", "F7", None, "2024-01-01"),          # no transaction date
+        ("D0", "F8", "not a date", "2024-01-01"),  # unparseable transaction date
+    ]
+    n = len(cases)
+    farmers = pd.DataFrame({
+        "farmer_id": [c[1] for c in cases], "aadhar_no": [f"1000{i}" for i in range(n)], "phone_no": [f"900{i}" for i in range(n)],
+        "village": "Rampur", "land_size_acres": 2.0, "kharif_crop": "Paddy", "rabi_crop": "Wheat", "soil_type": "Clay",
+        "last_subsidy_date": [c[3] for c in cases],
+    })
+    dealers = pd.DataFrame({
+        "dealer_id": ["D0", "D1"], "aadhar_no": ["20000", "20001"], "village": "Rampur",
+        "license_active": True, "license_expiry": ["2024-06-30", None],
+    })
+    relations = pd.DataFrame({
+        "dealer_id": [c[0] for c in cases], "dealer_aadhar": np.where(np.array([c[0] for c in cases]) == "D0", "20000", "20001"),
+        "farmer_id": [c[1] for c in cases], "relationship_date": [c[2] for c in cases],
+        "claimed_fertiliser_qty_kg": 100.0, "relationship_status": "Active", "max_allowed_txns_per_year": 3,
+    })
+    return RegistrySnapshot(1, farmers, dealers, relations)
+
+
+def _time_reasons(risk_engine, registry, row):
+    rel = registry.relations.iloc[row]
+    farmer = registry.farmers.iloc[row]
+    dealer = registry.dealers.iloc[int(rel["dealer_id"][1])]
+    return risk_engine.license_expiry_risk(dealer, rel, registry)[1] + risk_engine.subsidy_gap_risk(farmer, rel, registry)[1]
+
+
+def test_time_rules_on_each_case(risk_engine):
+    registry = _dated_registry()
+    expected = [[], [GAP], [GAP], [], [EXPIRY], [], [], [], []]
+    assert [_time_reasons(risk_engine, registry, row) for row in range(len(expected))] == expected
+    assert risk_engine.license_expiry_risk(registry.dealers.iloc[0], registry.relations.iloc[4], registry)[0] == 40
+    assert risk_engine.subsidy_gap_risk(registry.farmers.iloc[1], registry.relations.iloc[1], registry)[0] == 25
+
+
+def test_time_rules_agree_between_scalar_and_batch(risk_engine):
+    registry = _dated_registry()
+    requests = pd.DataFrame({"farmer_id": registry.relations["farmer_id"], "Dealer_ID": registry.relations["dealer_id"], "Crop": "Wheat"})
+    batch = risk_engine.evaluate_risk_batch(requests, registry)
+    for i, request in requests.iterrows():
+        scalar = risk_engine.evaluate_risk(request.to_dict(), registry)
+        assert scalar["Reasons"] == batch.loc[i, "Reasons"]
+        assert scalar["Risk_Score"] == batch.loc[i, "Risk_Score"]
+        assert (EXPIRY in scalar["Reasons"], GAP in scalar["Reasons"]) == \
+            (EXPIRY in _time_reasons(risk_engine, registry, i), GAP in _time_reasons(risk_engine, registry, i))
+
+
+# --- Aadhar reuse across registries ---
+
+FARMER_IS_DEALER = "Farmer aadhar also used by a dealer"
+MISMATCH = "Dealer aadhar does not match government record"
+DEALER_IS_FARMER = "Dealer aadhar belongs to a registered farmer"
+
+
+def _aadhar_registry(farmer_type, dealer_type, claimed_type):
+    """F2 shares D1's aadhar; R1 claims an unknown aadhar for D0; R2 claims F4's aadhar for D0."""
+    farmers = pd.DataFrame({
+        "farmer_id": [f"F{i}" for i in range(5)], "aadhar_no": np.array([1001, 1002, 2002, 1004, 1005]).astype(farmer_type),
+        "phone_no": [f"900{i}" for i in range(5)], "village": "Rampur", "land_size_acres": 2.0,
+        "kharif_crop": "Wheat", "rabi_crop": "Wheat", "soil_type": "Clay", "last_subsidy_date": None,
+    })
+    dealers = pd.DataFrame({
+        "dealer_id": ["D0", "D1"], "aadhar_no": np.array([2001, 2002]).astype(dealer_type),
+        "village": "Rampur", "license_active": True, "license_expiry": None,
+    })
+    relations = pd.DataFrame({
+        "dealer_id": ["D0", "D0", "D0", "D1"], "farmer_id": ["F0", "F1", "F3", "F2"],
+        "dealer_aadhar": np.array([2001, 9999, 1005, 2002]).astype(claimed_type), "relationship_date": None,
+        "claimed_fertiliser_qty_kg": 100.0, "relationship_status": "Active", "max_allowed_txns_per_year": 3,
+    })
+    return RegistrySnapshot(1, farmers, dealers, relations)
+
+
+AADHAR_TYPES = [(np.int64, str, np.float64), (str, np.int64, str), (np.float64, np.float64, np.int64)]
+
+
+@pytest.mark.parametrize("types", AADHAR_TYPES, ids=["int-str-float", "str-int-str", "float-float-int"])
+def test_aadhar_rules_ignore_column_types(risk_engine, types):
+    registry = _aadhar_registry(*types)
+    farmer_reasons = [risk_engine.farmer_aadhar_risk(farmer, registry)[1] for _, farmer in registry.farmers.iterrows()]
+    dealer_reasons = [risk_engine.dealer_aadhar_risk(rel, registry)[1] for _, rel in registry.relations.iterrows()]
+    # F4 is flagged too: R2 claims its aadhar for a dealer; R3 claims D1's aadhar, which F2 shares
+    assert farmer_reasons == [[], [], [FARMER_IS_DEALER], [], [FARMER_IS_DEALER]]
+    assert dealer_reasons == [[], [MISMATCH], [MISMATCH, DEALER_IS_FARMER], [DEALER_IS_FARMER]]
+    assert risk_engine.dealer_aadhar_risk(registry.relations.iloc[2], registry)[0] == 90
+
+
+@pytest.mark.parametrize("types", AADHAR_TYPES, ids=["int-str-float", "str-int-str", "float-float-int"])
+def test_aadhar_rules_agree_between_scalar_and_batch(risk_engine, types):
+    registry = _aadhar_registry(*types)
+    requests = pd.DataFrame({"farmer_id": registry.relations["farmer_id"], "Dealer_ID": registry.relations["dealer_id"], "Crop": "Wheat"})
+    batch = risk_engine.evaluate_risk_batch(requests, registry)
+    for i, request in requests.iterrows():
+        scalar = risk_engine.evaluate_risk(request.to_dict(), registry)
+        assert scalar["Reasons"] == batch.loc[i, "Reasons"]
+        assert scalar["Risk_Score"] == batch.loc[i, "Risk_Score"]
+    assert [MISMATCH in reasons for reasons in batch["Reasons"]] == [False, True, True, False]
+    assert [FARMER_IS_DEALER in reasons for reasons in batch["Reasons"]] == [False, False, False, True]
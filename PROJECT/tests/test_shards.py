@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from registry import RegistrySnapshot
+
+
+@pytest.fixture
+def shards(risk_engine):
+    import shards
+    return shards
+
+
+def test_assign_units_balances_heaviest_first(shards):
+    shard_of = shards.assign_units(["a", "a", "a", "b", "b", "c", "d"], np.ones(7), 2)
+    assert shard_of["a"] != shard_of["b"]
+    assert shard_of["c"] == shard_of["b"] and shard_of["d"] == shard_of["a"]
+
+
+def test_partition_puts_every_farmer_and_relationship_in_one_shard(shards, registry_tables):
+    snapshot = RegistrySnapshot(1, *registry_tables)
+    plan, parts = shards.partition_registry(snapshot, 3)
+    assert sum(len(part.farmers) for part in parts) == len(snapshot.farmers)
+    assert sum(len(part.relations) for part in parts) == len(snapshot.relations)
+    assert pd.concat([part.farmers for part in parts]).index.sort_values().equals(snapshot.farmers.index)
+    for shard, part in enumerate(parts):
+        farmer_ids = set(part.farmers["farmer_id"])
+        assert set(part.relations["farmer_id"]) - farmer_ids <= {"FAR9999"}
+        assert set(part.relations["dealer_id"]) <= set(part.dealers["dealer_id"])
+        assert (plan["farmer_shard"][plan["farmer_keys"].get_indexer(list(farmer_ids))] == shard).all()
+
+
+def test_router_matches_the_single_registry(shards, risk_engine, registry_tables, requests_for):
+    snapshot = RegistrySnapshot(1, *registry_tables)
+    requests = requests_for(*registry_tables, extra=400)
+    single = risk_engine.evaluate_risk_batch(requests, snapshot)
+    with shards.ShardRouter(snapshot, 3, processes=False) as router:
+        _, cross = router.route(requests)
+        sharded = router.score(requests)
+    assert cross.any()  # the cross-shard path is exercised
+    assert sharded.index.equals(requests.index)
+    pd.testing.assert_frame_equal(sharded[shards.RESULT_COLUMNS], single[shards.RESULT_COLUMNS])
+    assert router.sizes["farmers"].sum() == len(snapshot.farmers)
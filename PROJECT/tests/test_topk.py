@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from topk import TopKAccumulator, top_k
+
+
+def _scores(n=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    scores = rng.uniform(0, 100, n)
+    scores[::97] = np.nan
+    return pd.DataFrame({"row": np.arange(n), "risk": scores})
+
+
+def test_chunked_top_k_equals_full_sort():
+    df = _scores()
+    chunks = [df.iloc[start:start + 137] for start in range(0, len(df), 137)]
+    top, stats = top_k(chunks, "risk", k=25, threshold=60)
+    expected = df[df["risk"] > 60].sort_values("risk", ascending=False).head(25)
+    assert list(top["row"]) == list(expected["row"])
+    assert stats["rows"] == len(df)
+    assert stats["flagged"] == int((df["risk"] > 60).sum())
+    assert np.isclose(stats["mean"], df["risk"].mean())
+    assert stats["max"] == df["risk"].max()
+
+
+def test_fewer_rows_than_k_and_nothing_flagged():
+    df = _scores(10)
+    top, _ = top_k(df, "risk", k=50)
+    assert len(top) == df["risk"].notna().sum()
+    assert top["risk"].is_monotonic_decreasing
+
+    acc = TopKAccumulator("risk", k=5, threshold=1000).update(df)
+    assert acc.top().empty and acc.stats()["flagged"] == 0
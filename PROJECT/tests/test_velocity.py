@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from velocity import detect_bursts, rolling_windows, velocity_report
+
+
+def _transactions(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "farmer_id": rng.choice([f"FAR{i}" for i in range(20)], n),
+        "dealer_id": rng.choice([f"DEA{i}" for i in range(4)], n),
+        "date": (pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, n), unit="D")).strftime("%Y-%m-%d"),
+        "claimed_fertiliser_qty_kg": rng.uniform(10, 200, n).round(1),
+    })
+
+
+def test_rolling_windows_match_brute_force():
+    df = _transactions()
+    df.loc[3, "date"] = "not a date"
+    claims, kg = rolling_windows(df["farmer_id"].to_numpy(), df["date"], df["claimed_fertiliser_qty_kg"].to_numpy(), 30)
+    dates = pd.to_datetime(df["date"], errors="coerce")
+    for i in range(len(df)):
+        if pd.isna(dates[i]):
+            assert claims[i] == 0 and kg[i] == 0
+            continue
+        age = (dates[i] - dates).dt.days
+        window = (df["farmer_id"] == df.loc[i, "farmer_id"]) & (age >= 0) & (age < 30)
+        assert claims[i] == window.sum()
+        assert np.isclose(kg[i], df.loc[window, "claimed_fertiliser_qty_kg"].sum())
+
+
+def test_detect_bursts_flags_claims_and_kg_limits():
+    df = pd.DataFrame({
+        "farmer_id": ["A", "A", "A", "A", "B", "B"],
+        "date": ["2024-01-01", "2024-01-05", "2024-01-09", "2024-03-01", "2024-01-01", "2024-01-02"],
+        "claimed_fertiliser_qty_kg": [10, 10, 10, 10, 500, 600],
+    })
+    rows, summary = detect_bursts(df, "farmer_id", window_days=30, max_claims=2, max_kg=1000)
+    assert list(rows["burst"]) == [False, False, True, False, False, True]
+    assert list(summary["farmer_id"]) == ["A", "B"]
+    assert summary.loc[0, "peak_claims"] == 3
+
+
+def test_velocity_report_covers_farmers_and_dealers():
+    report = velocity_report(_transactions(), farmer_max_claims=2, dealer_max_claims=20)
+    assert report["window_days"] == 30
+    assert report["farmers_burst_rows"] > 0 and not report["farmers"].empty
+    assert "dealers" in report
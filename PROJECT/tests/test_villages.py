@@ -0,0 +1,59 @@
+import pytest
+
+from villages import VillageMatcher, normalize_village, typo_of
+
+
+@pytest.mark.parametrize("variant, registered", [
+    ("Neel Kamal", "Neelkamal"),
+    ("Laxmi", "Lakshmi"),
+    ("GreenVillage", "Green"),
+    ("Rampur Village", "Rampur"),
+    ("Lakhanpur", "Lakanpur"),
+    (" rampur ", "Rampur"),
+])
+def test_spelling_variants_share_a_village(variant, registered):
+    matcher = VillageMatcher([registered])
+    assert matcher.code(variant) == 0
+    assert matcher.canonical(variant) == registered
+
+
+@pytest.mark.parametrize("a, b", [("Rampura", "Rampur"), ("Sonpura", "Sonpur"), ("Vishanpur", "Bishanpur")])
+def test_distinct_villages_are_not_merged(a, b):
+    matcher = VillageMatcher([a, b])
+    assert len(matcher.canonical_names) == 2
+    assert not matcher.same(a, b)
+
+
+def test_typo_guard():
+    assert typo_of("keshavpur", "keshavpor")
+    assert not typo_of("rampura", "rampur")
+    assert not typo_of("vishanpur", "bishanpur")
+    assert not typo_of("madhopur", "madhopuram")
+
+
+def test_most_frequent_spelling_is_canonical():
+    matcher = VillageMatcher(["Rampur Village", "Rampur", "Rampur"])
+    assert matcher.canonical("Rampur Village") == "Rampur"
+
+
+def test_lookups_do_not_modify_the_matcher():
+    matcher = VillageMatcher(["Rampur", "Sonpur"])
+    state = (list(matcher.canonical_names), dict(matcher._cache), dict(matcher._exact))
+    assert matcher.code("Keshavpur") == -1
+    assert matcher.code("Rampur Village") == 0
+    matcher.codes(["Madhopur", "Sonpur", None])
+    assert (matcher.canonical_names, matcher._cache, matcher._exact) == state
+
+
+def test_unregistered_names_compare_by_normalized_form():
+    matcher = VillageMatcher(["Rampur"])
+    assert matcher.same("Keshavpur", "Keshavpur Village")
+    assert not matcher.same("Keshavpur", "Madhopur")
+    assert not matcher.same("Keshavpur", "Rampur")
+    assert matcher.same(None, float("nan"))
+
+
+def test_codes_resolve_a_column():
+    matcher = VillageMatcher(["Rampur", "Sonpur"])
+    assert list(matcher.codes(["Sonpur", "Rampur Village", None, "Unknownpur"])) == [1, 0, -1, -1]
+    assert normalize_village(None) == ""
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from registry import RegistrySnapshot
+
+
+@pytest.fixture
+def scored(risk_engine, registry_tables, requests_for):
+    from whatif import ComponentScores
+    snapshot = RegistrySnapshot(1, *registry_tables)
+    requests = requests_for(*registry_tables)
+    components = ComponentScores.from_requests(requests, snapshot, chunk_rows=97)
+    return components, risk_engine.evaluate_risk_batch(requests, snapshot)
+
+
+def test_baseline_reproduces_the_engine(scored):
+    from whatif import DECISIONS
+    components, batch = scored
+    assert components.version == 1
+    np.testing.assert_array_equal(components.scores(), batch["Risk_Score"].to_numpy())
+    assert [DECISIONS[code] for code in components.baseline()] == list(batch["Decision"])
+
+
+def test_weights_and_thresholds_change_the_simulated_decisions(scored):
+    from whatif import DECISIONS
+    components, batch = scored
+    reason = components.rules[0]
+    hit = batch["Reasons"].str.split(" | ", regex=False).map(lambda reasons: reason in reasons).to_numpy()
+    assert hit.any()
+    dropped = components.scores({reason: 0})
+    np.testing.assert_array_equal(dropped, batch["Risk_Score"].to_numpy() - np.where(hit, components.points[0], 0))
+
+    codes = components.simulate(thresholds={"BLOCK": -1})
+    assert (codes == DECISIONS.index("BLOCK")).all()
+
+
+def test_compare_counts_every_claim_once(scored):
+    components, _ = scored
+    counts, shifts = components.compare(thresholds={"BLOCK": 50, "REVIEW": 40, "MONITOR": 10})
+    assert counts["current"].sum() == counts["simulated"].sum() == len(components)
+    assert counts["change"].sum() == 0
+    assert shifts.to_numpy().sum() == len(components)
+    unchanged, _ = components.compare()
+    assert (unchanged["change"] == 0).all()
@@ -0,0 +1,78 @@
+# topk.py
+
+import numpy as np
+import pandas as pd
+
+
+class TopKAccumulator:
+    """
+    Streaming top-k selection over DataFrame chunks.
+
+    Keeps only the k highest-scoring rows seen so far (rows with
+    score > threshold when a threshold is given), using argpartition on each
+    chunk, so memory is O(k + chunk) and no full sort ever happens. Count,
+    sum and max of the score over all rows, and the number of rows above the
+    threshold, are accumulated in the same pass.
+    """
+
+    def __init__(self, score_col, k=50, threshold=None):
+        self.score_col = score_col
+        self.k = k
+        self.threshold = threshold
+        self.best = None
+        self.rows = 0
+        self.scored = 0
+        self.total = 0.0
+        self.max = np.nan
+        self.flagged = 0
+
+    def update(self, chunk):
+        scores = chunk[self.score_col].to_numpy(dtype="float64")
+        valid = ~np.isnan(scores)
+        self.rows += len(scores)
+        self.scored += int(valid.sum())
+        if valid.any():
+            self.total += float(scores[valid].sum())
+            self.max = float(np.fmax(self.max, scores[valid].max()))
+
+        keep = valid if self.threshold is None else valid & (scores > self.threshold)
+        self.flagged += int(keep.sum())
+        if not keep.any():
+            return self
+
+        candidates = chunk[keep]
+        if self.best is not None:
+            candidates = pd.concat([self.best, candidates], ignore_index=True)
+        self.best = self._select(candidates)
+        return self
+
+    def _select(self, df):
+        if len(df) <= self.k:
+            return df
+        scores = df[self.score_col].to_numpy(dtype="float64")
+        top = np.argpartition(-scores, self.k - 1)[:self.k]
+        return df.iloc[top].reset_index(drop=True)
+
+    def top(self):
+        """The k best rows, highest score first."""
+        if self.best is None:
+            return pd.DataFrame()
+        return self.best.sort_values(self.score_col, ascending=False, kind="stable").reset_index(drop=True)
+
+    def stats(self):
+        return {
+            "rows": self.rows,
+            "flagged": self.flagged,
+            "mean": self.total / self.scored if self.scored else np.nan,
+            "max": self.max,
+        }
+
+
+def top_k(chunks, score_col, k=50, threshold=None):
+    """Runs a TopKAccumulator over an iterable of DataFrame chunks (or one frame)."""
+    if isinstance(chunks, pd.DataFrame):
+        chunks = [chunks]
+    acc = TopKAccumulator(score_col, k=k, threshold=threshold)
+    for chunk in chunks:
+        acc.update(chunk)
+    return acc.top(), acc.stats()
@@ -0,0 +1,108 @@
+# velocity.py
+
+import numpy as np
+import pandas as pd
+
+WINDOW_DAYS = 30
+FARMER_MAX_CLAIMS = 3     # More claims than this by one farmer inside the window is a burst
+DEALER_MAX_CLAIMS = 50    # Same for one dealer
+FARMER_MAX_KG = None      # Optional cap on kg claimed by one farmer inside the window
+DEALER_MAX_KG = None
+DATE_COLUMNS = ["date", "relationship_date"]  # First one present is used
+
+
+def _date_column(transactions_df):
+    for col in DATE_COLUMNS:
+        if col in transactions_df.columns:
+            return col
+    raise KeyError(f"No date column found (expected one of {DATE_COLUMNS})")
+
+
+def rolling_windows(entity, dates, kg, window_days=WINDOW_DAYS):
+    """
+    Trailing-window claim count and kg for every transaction.
+
+    Rows are sorted once by (entity, day); each row's window start is found
+    with one vectorized searchsorted on the combined int64 key
+    entity_code * span + day, and kg totals come from a prefix sum, so the
+    whole pass is O(n log n) with no per-entity loop.
+    Returns (claims_in_window, kg_in_window), aligned with the input order.
+    """
+    codes, _ = pd.factorize(entity)
+    days = pd.to_datetime(dates, errors="coerce").to_numpy().astype("datetime64[D]")
+    valid = (codes >= 0) & ~np.isnat(days)
+    day_num = np.where(valid, days.astype(np.int64), 0)
+    day_num = day_num - (day_num[valid].min() if valid.any() else 0)
+    span = int(day_num.max()) + window_days + 1 if len(day_num) else 1
+
+    key = np.where(valid, codes.astype(np.int64) * span + day_num, -span)  # invalid rows sort first, outside every window
+    order = np.argsort(key, kind="stable")
+    sorted_key = key[order]
+    start = np.searchsorted(sorted_key, sorted_key - (window_days - 1), side="left")
+    end = np.searchsorted(sorted_key, sorted_key, side="right")  # same-day claims count together
+
+    sorted_kg = np.nan_to_num(np.asarray(kg, dtype="float64")[order])
+    prefix = np.concatenate(([0.0], np.cumsum(sorted_kg)))
+
+    claims = np.empty(len(key), dtype=np.int64)
+    window_kg = np.empty(len(key), dtype="float64")
+    claims[order] = end - start
+    window_kg[order] = prefix[end] - prefix[start]
+    claims[~valid] = 0
+    window_kg[~valid] = 0.0
+    return claims, window_kg
+
+
+def detect_bursts(transactions_df, entity_col, window_days=WINDOW_DAYS, max_claims=None, max_kg=None):
+    """
+    Flags transactions that sit in a burst for `entity_col` (farmer_id/dealer_id).
+
+    Returns (per-row DataFrame with claims_in_window / kg_in_window / burst,
+    per-entity summary of flagged entities, worst first).
+    """
+    date_col = _date_column(transactions_df)
+    claims, window_kg = rolling_windows(
+        transactions_df[entity_col].to_numpy(),
+        transactions_df[date_col],
+        transactions_df["claimed_fertiliser_qty_kg"].to_numpy(),
+        window_days,
+    )
+    burst = np.zeros(len(claims), dtype=bool)
+    if max_claims is not None:
+        burst |= claims > max_claims
+    if max_kg is not None:
+        burst |= window_kg > max_kg
+
+    rows = pd.DataFrame({
+        entity_col: transactions_df[entity_col].to_numpy(),
+        "date": transactions_df[date_col].to_numpy(),
+        "claims_in_window": claims,
+        "kg_in_window": window_kg,
+        "burst": burst,
+    })
+    flagged = rows[burst]
+    summary = (
+        flagged.groupby(entity_col, sort=False)
+        .agg(peak_claims=("claims_in_window", "max"), peak_kg=("kg_in_window", "max"),
+             burst_transactions=("burst", "size"), first_burst=("date", "min"), last_burst=("date", "max"))
+        .sort_values(["peak_claims", "peak_kg"], ascending=False, kind="stable")
+        .reset_index()
+    )
+    return rows, summary
+
+
+def velocity_report(transactions_df, window_days=WINDOW_DAYS,
+                    farmer_max_claims=FARMER_MAX_CLAIMS, farmer_max_kg=FARMER_MAX_KG,
+                    dealer_max_claims=DEALER_MAX_CLAIMS, dealer_max_kg=DEALER_MAX_KG):
+    """Batch API: farmer and dealer bursts in one call."""
+    report = {"window_days": window_days}
+    for entity_col, max_claims, max_kg, name in [
+        ("farmer_id", farmer_max_claims, farmer_max_kg, "farmers"),
+        ("dealer_id", dealer_max_claims, dealer_max_kg, "dealers"),
+    ]:
+        if entity_col not in transactions_df.columns:
+            continue
+        rows, summary = detect_bursts(transactions_df, entity_col, window_days, max_claims, max_kg)
+        report[name] = summary
+        report[f"{name}_burst_rows"] = int(rows["burst"].sum())
+    return report
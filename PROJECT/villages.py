@@ -0,0 +1,165 @@
+# villages.py
+
+import re
+from collections import Counter, defaultdict
+
+import numpy as np
+import pandas as pd
+
+NGRAM = 3
+SIMILARITY_THRESHOLD = 0.72  # Dice similarity of n-gram sets needed to treat two names as one village
+CHARS_PER_EDIT = 8           # A fuzzy match may differ by one edit per this many characters (at least one)
+MAX_CANDIDATES = 20          # Candidates from the n-gram index scored per lookup
+GENERIC_WORDS = {"village", "vill", "gram", "grama", "hamlet", "post"}  # Dropped before matching
+# Common transliteration variants folded before matching (applied in order)
+SPELLING_FOLDS = [("ksh", "x"), ("aa", "a"), ("ee", "i"), ("oo", "u"), ("w", "v"), ("ph", "f"), ("z", "j"),
+                  ("th", "t"), ("dh", "d"), ("bh", "b"), ("kh", "k"), ("gh", "g")]
+
+
+def normalize_village(name):
+    """
+    Matching key: lowercase letters/digits with spaces removed ("Neel Kamal"
+    = "Neelkamal"), generic words dropped (also when glued on as a suffix,
+    "GreenVillage" = "Green"), transliteration variants folded.
+    """
+    if name is None or (isinstance(name, float) and np.isnan(name)):
+        return ""
+    words = re.sub(r"[^a-z0-9]+", " ", str(name).lower()).split()
+    text = "".join(w for w in words if w not in GENERIC_WORDS) or "".join(words)
+    for word in GENERIC_WORDS:
+        if text.endswith(word) and len(text) > len(word) + 2:
+            text = text[:-len(word)]
+    for old, new in SPELLING_FOLDS:
+        text = text.replace(old, new)
+    return text
+
+
+def ngrams(text, n=NGRAM):
+    padded = f" {text} "
+    return {padded[i:i + n] for i in range(max(len(padded) - n + 1, 1))}
+
+
+def dice(a, b):
+    return 2 * len(a & b) / (len(a) + len(b)) if a or b else 1.0
+
+
+def edit_distance(a, b):
+    """Levenshtein distance (names are short, so the plain DP is enough)."""
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def typo_of(a, b):
+    """
+    Whether normalized names a and b can be spellings of one village:
+    same first letter (Vishanpur is not Bishanpur), neither extends the
+    other (Rampura is not Rampur) and at most one edit per CHARS_PER_EDIT.
+    """
+    if not a or not b or a[0] != b[0] or a.startswith(b) or b.startswith(a):
+        return False
+    return edit_distance(a, b) <= max(1, min(len(a), len(b)) // CHARS_PER_EDIT)
+
+
+class VillageMatcher:
+    """
+    Canonical village names for one registry.
+
+    Distinct names are registered once, most frequent first: each either
+    joins the most similar canonical village already known (n-gram Dice
+    similarity >= threshold and a plausible typo of it, see typo_of) or
+    becomes a new canonical village. Candidates come from an inverted n-gram
+    index, so a lookup scores a handful of names instead of all of them.
+
+    Only `add` (the build step) writes. Lookups never modify the matcher,
+    so a built matcher can be shared by concurrent readers: a name that was
+    not registered is resolved against the canonical villages each time,
+    and gets -1 when it matches none of them.
+    """
+
+    def __init__(self, names=(), threshold=SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self.canonical_names = []  # canonical id -> display name (first spelling seen)
+        self._grams = []           # canonical id -> n-gram set of its normalized form
+        self._index = defaultdict(list)  # n-gram -> canonical ids containing it
+        self._exact = {}           # normalized form -> canonical id
+        self._cache = {}           # registered raw string -> canonical id
+        self.add(names)
+
+    def add(self, names):
+        """
+        Registers names (an iterable or column); frequent spellings become
+        canonical first. Not safe to run while other threads look names up.
+        """
+        values = pd.Series(names, dtype=object).dropna()
+        for name in values.value_counts(sort=True).index:
+            key = normalize_village(name)
+            if not key:
+                continue
+            cid = self._exact.get(key)
+            if cid is None:
+                cid = self._match(key)
+            if cid < 0:
+                cid = len(self.canonical_names)
+                self.canonical_names.append(str(name).strip())
+                self._grams.append(ngrams(key))
+                for gram in self._grams[cid]:
+                    self._index[gram].append(cid)
+            self._exact[key] = cid
+            try:
+                self._cache[name] = cid
+            except TypeError:
+                pass  # unhashable input: registered by its normalized form only
+        return self
+
+    def _candidates(self, grams):
+        hits = Counter()
+        for gram in grams:
+            hits.update(self._index.get(gram, ()))
+        return [cid for cid, _ in hits.most_common(MAX_CANDIDATES)]
+
+    def _match(self, key):
+        """Most similar canonical village for a normalized name, or -1 (read-only)."""
+        grams = ngrams(key)
+        best, best_score = -1, self.threshold
+        for cid in self._candidates(grams):
+            score = dice(grams, self._grams[cid])
+            if score >= best_score and typo_of(key, self._canonical_key(cid)):
+                best, best_score = cid, score
+        return best
+
+    def _canonical_key(self, cid):
+        return normalize_village(self.canonical_names[cid])
+
+    def code(self, name):
+        """Canonical id of one name (-1 when missing or matching no registered village)."""
+        try:
+            return self._cache[name]
+        except (KeyError, TypeError):
+            pass
+        key = normalize_village(name)
+        if not key:
+            return -1
+        cid = self._exact.get(key)
+        return self._match(key) if cid is None else cid
+
+    def canonical(self, name):
+        cid = self.code(name)
+        return None if cid < 0 else self.canonical_names[cid]
+
+    def codes(self, values):
+        """Canonical ids for a whole column: each distinct value is resolved once."""
+        codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+        resolved = np.array([self.code(u) for u in uniques], dtype=np.int64)
+        return np.where(codes >= 0, resolved[np.maximum(codes, 0)] if len(resolved) else -1, -1)
+
+    def same(self, a, b):
+        """One village? Names matching no registered village are compared by their normalized form."""
+        code_a, code_b = self.code(a), self.code(b)
+        if code_a < 0 and code_b < 0:
+            return normalize_village(a) == normalize_village(b)
+        return code_a == code_b
@@ -0,0 +1,149 @@
+# whatif.py
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import risk_engine
+from evaluate import build_requests, read_registry
+
+DECISIONS = ["APPROVE", "MONITOR", "REVIEW", "BLOCK"]  # Least to most severe
+BUILD_CHUNK_ROWS = 500_000  # Requests scored per batch_components call while building
+
+
+class ComponentScores:
+    """
+    Per-claim rule hits of risk_engine, stored once, to re-decide every
+    claim under other weights and thresholds without re-running the rules.
+
+    The rule masks (all rules but the quantity bands, at most 63) are packed
+    into one int64 bit key per claim and deduplicated: claims with the same
+    combination of hits share one row of `patterns`, a small 0/1 matrix.
+    Per claim only the pattern id (int32) and the claimed/expected ratio
+    (float64, so band edges compare exactly as in risk_engine) are kept,
+    12 MB per million claims. `simulate` is one matrix-vector product over
+    the patterns, a gather per claim and the quantity bands on the ratio.
+    """
+
+    def __init__(self, rules, points, keys, ratio, version=None):
+        self.version = version  # registry snapshot the claims were scored against
+        self.rules = list(rules)
+        self.points = np.asarray(points, dtype="float64")
+        uniques, inverse = np.unique(np.asarray(keys, dtype=np.int64), return_inverse=True)
+        self.patterns = ((uniques[:, None] >> np.arange(len(self.rules))) & 1).astype(np.float32)
+        self.pattern_id = inverse.astype(np.int32).ravel()
+        self.ratio = np.asarray(ratio, dtype="float64")
+        self._baseline = None
+
+    @classmethod
+    def from_requests(cls, inputs, registry=None, chunk_rows=BUILD_CHUNK_ROWS, progress=None):
+        """Scores kiosk requests (farmer_id, Dealer_ID, Crop) against one registry snapshot, chunk by chunk."""
+        registry = registry or risk_engine.current_registry()
+        inputs = pd.DataFrame(inputs)
+        rules, points, keys, ratios = None, None, [], []
+        for start in range(0, max(len(inputs), 1), chunk_rows):
+            chunk_rules, quantity = risk_engine.batch_components(inputs.iloc[start:start + chunk_rows], registry)
+            if rules is None:
+                rules = [reason for reason, _, _ in chunk_rules]
+                points = [p for _, p, _ in chunk_rules]
+                if len(rules) > 63:
+                    raise ValueError(f"{len(rules)} rules do not fit one int64 key")
+            key = np.zeros(len(quantity["ratio"]), dtype=np.int64)
+            for bit, (_, _, mask) in enumerate(chunk_rules):
+                key |= mask.astype(np.int64) << bit
+            keys.append(key)
+            ratios.append(quantity["ratio"])
+            if progress is not None:
+                progress(min(start + chunk_rows, len(inputs)) / max(len(inputs), 1))
+        return cls(rules, points, np.concatenate(keys), np.concatenate(ratios), registry.version)
+
+    def __len__(self):
+        return len(self.pattern_id)
+
+    @property
+    def nbytes(self):
+        return self.patterns.nbytes + self.pattern_id.nbytes + self.ratio.nbytes
+
+    def scores(self, weights=None, bands=None):
+        """Risk score per claim; `weights` maps rule reason -> points (others keep theirs)."""
+        w = self.points.copy()
+        for reason, points in (weights or {}).items():
+            if reason in self.rules:
+                w[self.rules.index(reason)] = points
+        score = (self.patterns @ w.astype(np.float32))[self.pattern_id]
+        for _, points, mask in risk_engine.quantity_band_rules(self.ratio, bands):
+            score[mask] += points
+        return score
+
+    def simulate(self, weights=None, thresholds=None, bands=None):
+        """Decision code per claim (index into DECISIONS)."""
+        thresholds = risk_engine.DECISION_THRESHOLDS if thresholds is None else thresholds
+        score = self.scores(weights, bands)
+        codes = np.zeros(len(score), dtype=np.int8)
+        decided = np.zeros(len(score), dtype=bool)
+        for label, threshold in thresholds.items():  # same first-match order as decision()
+            hit = ~decided & (score > threshold)
+            codes[hit] = DECISIONS.index(label)
+            decided |= hit
+        return codes
+
+    def baseline(self):
+        """Decision codes under risk_engine's current weights and thresholds (cached)."""
+        if self._baseline is None:
+            self._baseline = self.simulate()
+        return self._baseline
+
+    def compare(self, weights=None, thresholds=None, bands=None):
+        """
+        (counts, shifts): decision counts now vs simulated, and a
+        DECISIONS x DECISIONS table of how many claims moved from each
+        current decision (rows) to each simulated one (columns).
+        """
+        base = self.baseline()
+        new = self.simulate(weights, thresholds, bands)
+        k = len(DECISIONS)
+        shifts = np.bincount(base.astype(np.int64) * k + new, minlength=k * k).reshape(k, k)
+        counts = pd.DataFrame({
+            "decision": DECISIONS,
+            "current": shifts.sum(axis=1),
+            "simulated": shifts.sum(axis=0),
+        })
+        counts["change"] = counts["simulated"] - counts["current"]
+        return counts, pd.DataFrame(shifts, index=pd.Index(DECISIONS, name="current"), columns=DECISIONS)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="What-if decision counts for new risk_engine weights and thresholds.")
+    parser.add_argument("--data", default=".", help="directory with the three CSVs from Saish/initial.py")
+    parser.add_argument("--threshold", action="append", default=[], metavar="DECISION=SCORE",
+                        help="e.g. BLOCK=90 (repeatable)")
+    parser.add_argument("--weight", action="append", default=[], metavar="REASON=POINTS",
+                        help="e.g. 'Village mismatch=10' (repeatable)")
+    args = parser.parse_args(argv)
+
+    registry = read_registry(args.data)
+
+    start = time.perf_counter()
+    components = ComponentScores.from_requests(build_requests(registry.farmers, registry.relations), registry)
+    built = time.perf_counter() - start
+    print(f"🧮 {len(components):,} claims -> {len(components.patterns):,} rule patterns, "
+          f"{components.nbytes / 1024 ** 2:,.1f} MB, built in {built:.2f}s")
+
+    thresholds = dict(risk_engine.DECISION_THRESHOLDS)
+    for item in args.threshold:
+        label, value = item.split("=", 1)
+        thresholds[label.strip().upper()] = float(value)
+    weights = {reason.strip(): float(value) for reason, value in (item.rsplit("=", 1) for item in args.weight)}
+
+    start = time.perf_counter()
+    counts, shifts = components.compare(weights, thresholds)
+    print(f"⚡ Simulated in {1000 * (time.perf_counter() - start):.1f} ms\n")
+    print(counts.to_string(index=False))
+    print("\n🔀 Current (rows) -> simulated (columns)")
+    print(shifts.to_string())
+
+
+if __name__ == "__main__":
+    main()
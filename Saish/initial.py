@@ -1,182 +1,429 @@
-import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
-
-def generate_enhanced_synthetic_datasets():
-    np.random.seed(42)
-    
-    villages = [
-        'Rampur Village', 'Keshavpur', 'GreenVillage', 'RedSoil Hamlet', 'Balaji Nagar', 
-        'Sundarapuram', 'Neelkamal', 'Gokul Vihar', 'Shivaji Colony', 'Lakshmi Puram',
-        'Hanumantha Nagar', 'Venkatesh Pura', 'Devi Krupa', 'Raja Rajeshwari', 'Anjaneya Layout',
-        'Maruthi Extension', 'Ganesha Nagar', 'Subramanya Swamy', 'Dakshina Mukhi', 'Uttara Phalguni',
-        'Pushpagiri', 'Nandi Hills', 'Skanda Giri', 'Bhoga Nandeeshwara', 'Yelachaguppe'
-    ]
-    
-    kharif_crops = ['Paddy', 'Jowar']
-    rabi_crops = ['Wheat', 'Oats']
-    soil_types = ['Alluvial', 'Clay', 'Loamy', 'Red', 'Black (Regur)', 'Sandy Loam']
-    irrigation_types = ['Rainfed', 'Borewell', 'Drip', 'Sprinkler', 'Flood', 'Canal']
-    
-    soil_weights = np.array([0.25, 0.20, 0.20, 0.15, 0.10, 0.10])
-    soil_weights = soil_weights / soil_weights.sum()
-    irrigation_weights = np.array([0.40, 0.25, 0.12, 0.10, 0.08, 0.05])
-    irrigation_weights = irrigation_weights / irrigation_weights.sum()
-    
-    n_farmers = 10000
-    
-    land_sizes_acres = []
-    for i in range(n_farmers):
-        if np.random.random() < 0.5:
-            land_sizes_acres.append(np.random.uniform(0.25, 2.47))
-        elif np.random.random() < 0.35:
-            land_sizes_acres.append(np.random.uniform(2.47, 4.94))
-        elif np.random.random() < 0.10:
-            land_sizes_acres.append(np.random.uniform(4.94, 12.35))
-        else:
-            land_sizes_acres.append(np.random.uniform(12.35, 61.77))
-    
-    land_sizes_acres = np.array(land_sizes_acres).round(2)
-    
-    farm_categories = []
-    for land in land_sizes_acres:
-        if land < 2.47:
-            farm_categories.append('Marginal (<2.47 acres)')
-        elif land < 4.94:
-            farm_categories.append('Small (2.47-4.94 acres)')
-        elif land < 12.35:
-            farm_categories.append('Medium (4.94-12.35 acres)')
-        else:
-            farm_categories.append('Large (>12.35 acres)')
-    
-    sc_st_mask = np.random.random(n_farmers) < 0.25
-    farm_categories = np.array(farm_categories)
-    farm_categories[sc_st_mask] = 'SC/ST (' + farm_categories[sc_st_mask] + ')'
-    
-    farmer_aadhar = []
-    for _ in range(n_farmers):
-        part1 = str(np.random.randint(1000, 9999)).zfill(4)
-        part2 = str(np.random.randint(100000000, 999999999)).zfill(9)
-        farmer_aadhar.append(part1 + part2)
-    
-    farmer_phone = ['9' + str(np.random.randint(100000000, 999999999)).zfill(9) for _ in range(n_farmers)]
-    
-    farmer_data = pd.DataFrame({
-        'farmer_id': [f'FAR{i:06d}' for i in range(1, n_farmers+1)],
-        'aadhar_no': farmer_aadhar,
-        'phone_no': farmer_phone,
-        'village': np.random.choice(villages, n_farmers),
-        'land_size_acres': land_sizes_acres,
-        'kharif_crop': np.random.choice(kharif_crops, n_farmers, p=[0.70, 0.30]),
-        'rabi_crop': np.random.choice(rabi_crops, n_farmers, p=[0.80, 0.20]),
-        'irrigation_type': np.random.choice(irrigation_types, n_farmers, p=irrigation_weights),
-        'soil_type': np.random.choice(soil_types, n_farmers, p=soil_weights),
-        'last_subsidy_date': pd.date_range('2024-01-01', '2025-11-01', n_farmers).strftime('%Y-%m-%d'),
-        'farm_category': farm_categories
-    })
-    
-    n_dealers = 500
-    
-    dealer_aadhar = []
-    for _ in range(n_dealers):
-        part1 = str(np.random.randint(2000, 2999)).zfill(4)
-        part2 = str(np.random.randint(100000000, 999999999)).zfill(9)
-        dealer_aadhar.append(part1 + part2)
-    
-    dealer_data = pd.DataFrame({
-        'dealer_id': [f'DEA{i:04d}' for i in range(1, n_dealers+1)],
-        'aadhar_no': dealer_aadhar,
-        'dealer_name': [f'Dealer_{i:03d}_Agri' for i in range(1, n_dealers+1)],
-        'village': np.random.choice(villages, n_dealers),
-        'license_active': np.random.choice([True, False], n_dealers, p=[0.92, 0.08]),
-        'license_expiry': pd.date_range('2025-06-01', '2028-12-31', n_dealers).strftime('%Y-%m-%d')
-    })
-    
-    core_size = 19000
-    
-    dealer_farmer_ids = np.random.choice(farmer_data['farmer_id'], core_size)
-    dealer_ids = []
-    
-    for i, farmer_id in enumerate(dealer_farmer_ids):
-        farmer_row = farmer_data[farmer_data['farmer_id'] == farmer_id].iloc[0]
-        farmer_village = farmer_row['village']
-        
-        same_village_dealers = dealer_data[dealer_data['village'] == farmer_village]['dealer_id'].values
-        
-        if len(same_village_dealers) > 0 and np.random.random() < 0.85:
-            dealer_ids.append(np.random.choice(same_village_dealers))
-        else:
-            dealer_ids.append(np.random.choice(dealer_data['dealer_id']))
-    
-    dealer_ids = np.array(dealer_ids)
-    
-    realistic_qty = []
-    defective_qty = []
-    for i, farmer_id in enumerate(dealer_farmer_ids):
-        row = farmer_data[farmer_data['farmer_id'] == farmer_id].iloc[0]
-        land_acres = row['land_size_acres']
-        kharif_crop = row['kharif_crop']
-        
-        if kharif_crop == 'Paddy':
-            base_qty = land_acres * np.random.uniform(900, 1100)
-        else:
-            base_qty = land_acres * np.random.uniform(400, 600)
-        
-        if np.random.random() < 0.05:
-            defective_qty.append(round(base_qty * np.random.uniform(3, 10)))
-        else:
-            defective_qty.append(round(base_qty))
-    
-    core_dealer_farmer = pd.DataFrame({
-        'dealer_id': dealer_ids,
-        'dealer_aadhar': '',
-        'farmer_id': dealer_farmer_ids,
-        'relationship_date': pd.date_range('2023-01-01', '2025-06-30', core_size).strftime('%Y-%m-%d'),
-        'claimed_fertiliser_qty_kg': defective_qty,
-        'relationship_status': np.random.choice(['Active', 'Inactive'], core_size, p=[0.88, 0.12]),
-        'max_allowed_txns_per_year': np.random.choice([12, 24, 36, 48], core_size, p=[0.3, 0.4, 0.2, 0.1])
-    })
-    
-    for idx in core_dealer_farmer.index:
-        dealer_id = core_dealer_farmer.loc[idx, 'dealer_id']
-        matching_aadhar = dealer_data[dealer_data['dealer_id'] == dealer_id]['aadhar_no'].iloc[0]
-        core_dealer_farmer.loc[idx, 'dealer_aadhar'] = matching_aadhar
-    
-    fraud_size = 1000
-    
-    fraud_qty = []
-    for i in range(fraud_size):
-        land_acres = np.random.uniform(0.25, 61.77)
-        fraud_qty.append(round(land_acres * np.random.uniform(5000, 15000)))
-    
-    fraud_dealer_farmer = pd.DataFrame({
-        'dealer_id': np.random.choice(dealer_data['dealer_id'], fraud_size),
-        'dealer_aadhar': np.random.choice(dealer_data['aadhar_no'].tolist() + ['FAKEAADHAR123456789012'], fraud_size),
-        'farmer_id': [f'FAKEFAR{i:05d}' for i in range(1, fraud_size+1)],
-        'relationship_date': pd.date_range('2024-06-01', '2025-11-01', fraud_size).strftime('%Y-%m-%d'),
-        'claimed_fertiliser_qty_kg': fraud_qty,
-        'relationship_status': np.random.choice(['Active', 'Inactive'], fraud_size, p=[0.3, 0.7]),
-        'max_allowed_txns_per_year': np.random.choice([12, 24], fraud_size)
-    })
-    
-    dealer_farmer_data = pd.concat([core_dealer_farmer, fraud_dealer_farmer], ignore_index=True)
-    
-    farmer_data.to_csv('government_farmers.csv', index=False)
-    dealer_data.to_csv('government_dealers.csv', index=False)
-    dealer_farmer_data.to_csv('dealer_farmer_relationships.csv', index=False)
-    
-    same_village_count = 0
-    for i in range(core_size):
-        farmer_row = farmer_data[farmer_data['farmer_id'] == dealer_farmer_ids[i]].iloc[0]
-        dealer_row = dealer_data[dealer_data['dealer_id'] == dealer_ids[i]].iloc[0]
-        if farmer_row['village'] == dealer_row['village']:
-            same_village_count += 1
-    
-    print("✅ Datasets generated with LOCAL DEALER PREFERENCE!")
-    print(f"   📊 Farmers: {len(farmer_data):,} | 🏪 Dealers: {len(dealer_data):,} | 🤝 Relationships: {len(dealer_farmer_data):,}")
-    print(f"   🏘️ Same village pairs: {same_village_count}/{core_size} ({same_village_count/core_size*100:.1f}%)")
-    
-    return farmer_data, dealer_data, dealer_farmer_data
-
-if __name__ == "__main__":
-    farmer_data, dealer_data, dealer_farmer_data = generate_enhanced_synthetic_datasets()
+import argparse
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import pandas as pd
+import numpy as np
+
+VILLAGES = [
+    'Rampur Village', 'Keshavpur', 'GreenVillage', 'RedSoil Hamlet', 'Balaji Nagar', 
+    'Sundarapuram', 'Neelkamal', 'Gokul Vihar', 'Shivaji Colony', 'Lakshmi Puram',
+    'Hanumantha Nagar', 'Venkatesh Pura', 'Devi Krupa', 'Raja Rajeshwari', 'Anjaneya Layout',
+    'Maruthi Extension', 'Ganesha Nagar', 'Subramanya Swamy', 'Dakshina Mukhi', 'Uttara Phalguni',
+    'Pushpagiri', 'Nandi Hills', 'Skanda Giri', 'Bhoga Nandeeshwara', 'Yelachaguppe'
+]
+
+KHARIF_CROPS = ['Paddy', 'Jowar']
+RABI_CROPS = ['Wheat', 'Oats']
+SOIL_TYPES = ['Alluvial', 'Clay', 'Loamy', 'Red', 'Black (Regur)', 'Sandy Loam']
+IRRIGATION_TYPES = ['Rainfed', 'Borewell', 'Drip', 'Sprinkler', 'Flood', 'Canal']
+
+SOIL_WEIGHTS = np.array([0.25, 0.20, 0.20, 0.15, 0.10, 0.10])
+SOIL_WEIGHTS = SOIL_WEIGHTS / SOIL_WEIGHTS.sum()
+IRRIGATION_WEIGHTS = np.array([0.40, 0.25, 0.12, 0.10, 0.08, 0.05])
+IRRIGATION_WEIGHTS = IRRIGATION_WEIGHTS / IRRIGATION_WEIGHTS.sum()
+
+FARM_CATEGORIES = ['Marginal (<2.47 acres)', 'Small (2.47-4.94 acres)', 'Medium (4.94-12.35 acres)', 'Large (>12.35 acres)']
+LAND_BANDS = np.array([[0.25, 2.47], [2.47, 4.94], [4.94, 12.35], [12.35, 61.77]])
+LOCAL_DEALER_SHARE = 0.85
+
+OUTPUT_NAMES = {'farmers': 'government_farmers', 'dealers': 'government_dealers', 'relationships': 'dealer_farmer_relationships'}
+FORMATS = ('csv', 'parquet')
+# Independent random streams per table (and per chunk) derived from one seed
+DEALER_STREAM, FARMER_STREAM, FRAUD_STREAM = 0, 1, 2
+
+# Ground truth for every relationship row ('genuine' or the scenario that produced it).
+# over_claim (claimed_quantities' defect_rate) and fake_farmer (fraud_size) are always on;
+# the rest are injected into genuine rows at these rates (share of genuine relationships,
+# of farmers for shared_phone, of farmer-dealer pairs for txn_limit_abuse).
+GENUINE = 'genuine'
+FRAUD_SCENARIOS = {
+    'shared_phone': 0.005,        # farmer registered with another farmer's phone number
+    'fake_dealer_aadhar': 0.01,   # claim filed under another dealer's aadhar
+    'cross_village': 0.01,        # dealer forced to one outside the farmer's village
+    'txn_limit_abuse': 0.002,     # pair repeated past max_allowed_txns_per_year
+}
+
+
+def _ids(prefix, start, stop, width):
+    """Vectorized f'{prefix}{i:0{width}d}' for i in start..stop-1."""
+    return np.char.add(prefix, np.char.zfill(np.arange(start, stop).astype(str), width)).astype(object)
+
+
+def _digits(rng, prefix_low, prefix_high, n):
+    """13-digit aadhar-style numbers: a 4-digit prefix then 9 digits (as in the original loop)."""
+    part1 = rng.integers(prefix_low, prefix_high, n, dtype=np.int64)
+    part2 = rng.integers(100000000, 999999999, n, dtype=np.int64)
+    return (part1 * 1_000_000_000 + part2).astype(str).astype(object)
+
+
+def _categorical(rng, values, n, p=None):
+    return pd.Categorical.from_codes(rng.choice(len(values), n, p=p), values)
+
+
+def _dates(start, end, n, rows=None):
+    """
+    'YYYY-MM-DD' strings of pd.date_range(start, end, n), optionally only at
+    positions `rows`, so a chunk can produce its slice of a global range.
+    """
+    rows = np.arange(n) if rows is None else np.asarray(rows)
+    start = np.datetime64(start, 'D')
+    span = (np.datetime64(end, 'D') - start).astype(np.int64)
+    days = start + np.floor(rows * (span / max(n - 1, 1))).astype(np.int64)
+    return np.datetime_as_string(days, unit='D').astype(object)
+
+
+def generate_farmers(rng, n_farmers, start_id=1, total_farmers=None):
+    # Same nested draws as the original loop: 50% marginal, then 35% small,
+    # then 10% medium of what is left, everything else large
+    u = rng.random((n_farmers, 3))
+    band = np.select([u[:, 0] < 0.5, u[:, 1] < 0.35, u[:, 2] < 0.10], [0, 1, 2], 3)
+    low, high = LAND_BANDS[band, 0], LAND_BANDS[band, 1]
+    land_sizes_acres = (low + (high - low) * rng.random(n_farmers)).round(2)
+    
+    category_code = np.searchsorted([2.47, 4.94, 12.35], land_sizes_acres, side='right')
+    farm_categories = np.array(FARM_CATEGORIES, dtype=object)[category_code]
+    sc_st_mask = rng.random(n_farmers) < 0.25
+    farm_categories[sc_st_mask] = 'SC/ST (' + farm_categories[sc_st_mask] + ')'
+    
+    return pd.DataFrame({
+        'farmer_id': _ids('FAR', start_id, start_id + n_farmers, 6),
+        'aadhar_no': _digits(rng, 1000, 9999, n_farmers),
+        'phone_no': np.char.add('9', rng.integers(100000000, 999999999, n_farmers).astype(str)).astype(object),
+        'village': _categorical(rng, VILLAGES, n_farmers),
+        'land_size_acres': land_sizes_acres,
+        'kharif_crop': _categorical(rng, KHARIF_CROPS, n_farmers, p=[0.70, 0.30]),
+        'rabi_crop': _categorical(rng, RABI_CROPS, n_farmers, p=[0.80, 0.20]),
+        'irrigation_type': _categorical(rng, IRRIGATION_TYPES, n_farmers, p=IRRIGATION_WEIGHTS),
+        'soil_type': _categorical(rng, SOIL_TYPES, n_farmers, p=SOIL_WEIGHTS),
+        'last_subsidy_date': _dates('2024-01-01', '2025-11-01', total_farmers or n_farmers, np.arange(start_id - 1, start_id - 1 + n_farmers)),
+        'farm_category': farm_categories
+    })
+
+
+def generate_dealers(rng, n_dealers):
+    return pd.DataFrame({
+        'dealer_id': _ids('DEA', 1, n_dealers + 1, 4),
+        'aadhar_no': _digits(rng, 2000, 2999, n_dealers),
+        'dealer_name': np.char.add(_ids('Dealer_', 1, n_dealers + 1, 3).astype(str), '_Agri').astype(object),
+        'village': _categorical(rng, VILLAGES, n_dealers),
+        'license_active': rng.choice([True, False], n_dealers, p=[0.92, 0.08]),
+        'license_expiry': _dates('2025-06-01', '2028-12-31', n_dealers)
+    })
+
+
+def pick_dealers(rng, farmer_village_codes, dealer_village_codes):
+    """
+    Dealer row for each relationship: 85% from the farmer's own village (when
+    it has dealers), otherwise any dealer. Dealers are grouped by village once
+    (argsort + bincount), so each pick is an index computation, not a scan.
+    """
+    n = len(farmer_village_codes)
+    n_dealers = len(dealer_village_codes)
+    by_village = np.argsort(dealer_village_codes, kind='stable')
+    counts = np.bincount(dealer_village_codes, minlength=len(VILLAGES))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    
+    local_count = counts[farmer_village_codes]
+    local = (local_count > 0) & (rng.random(n) < LOCAL_DEALER_SHARE)
+    offset = (rng.random(n) * local_count).astype(np.int64)
+    local_pick = by_village[np.minimum(starts[farmer_village_codes] + offset, n_dealers - 1)]
+    return np.where(local, local_pick, rng.integers(0, n_dealers, n))
+
+
+def claimed_quantities(rng, land_acres, is_paddy, defect_rate=0.05):
+    """
+    Paddy 900-1100 kg/acre, other crops 400-600; `defect_rate` of claims inflated 3-10x.
+    Returns (quantities, inflated mask).
+    """
+    rate = np.where(is_paddy, rng.uniform(900, 1100, len(land_acres)), rng.uniform(400, 600, len(land_acres)))
+    base_qty = land_acres * rate
+    defective = rng.random(len(land_acres)) < defect_rate
+    return np.round(np.where(defective, base_qty * rng.uniform(3, 10, len(land_acres)), base_qty)).astype(np.int64), defective
+
+
+def generate_core_relationships(rng, farmer_data, dealer_data, core_size, rows=None, total_rows=None):
+    """
+    Genuine dealer-farmer claims (5% inflated) for farmers drawn from `farmer_data`.
+
+    `rows`/`total_rows` place these relationships inside a larger file so that
+    relationship dates stay evenly spread across all chunks.
+    Returns (relationships, same-village pair count).
+    """
+    farmer_rows = rng.integers(0, len(farmer_data), core_size)
+    farmer_village_codes = farmer_data['village'].cat.codes.to_numpy()[farmer_rows]
+    dealer_village_codes = dealer_data['village'].cat.codes.to_numpy()
+    dealer_rows = pick_dealers(rng, farmer_village_codes, dealer_village_codes)
+    
+    land_acres = farmer_data['land_size_acres'].to_numpy()[farmer_rows]
+    is_paddy = (farmer_data['kharif_crop'] == 'Paddy').to_numpy()[farmer_rows]
+    claimed, inflated = claimed_quantities(rng, land_acres, is_paddy)
+    
+    core_dealer_farmer = pd.DataFrame({
+        'dealer_id': dealer_data['dealer_id'].to_numpy()[dealer_rows],
+        'dealer_aadhar': dealer_data['aadhar_no'].to_numpy()[dealer_rows],
+        'farmer_id': farmer_data['farmer_id'].to_numpy()[farmer_rows],
+        'relationship_date': _dates('2023-01-01', '2025-06-30', total_rows or core_size, rows),
+        'claimed_fertiliser_qty_kg': claimed,
+        'relationship_status': rng.choice(np.array(['Active', 'Inactive'], dtype=object), core_size, p=[0.88, 0.12]),
+        'max_allowed_txns_per_year': rng.choice([12, 24, 36, 48], core_size, p=[0.3, 0.4, 0.2, 0.1]),
+        'fraud_label': np.where(inflated, 'over_claim', GENUINE).astype(object)
+    })
+    same_village_count = int((farmer_village_codes == dealer_village_codes[dealer_rows]).sum())
+    return core_dealer_farmer, same_village_count
+
+
+def generate_fraud_relationships(rng, dealer_data, fraud_size):
+    """Ghost farmers: unregistered IDs with 5000-15000 kg/acre on a random land size."""
+    dealer_ids = dealer_data['dealer_id'].to_numpy()
+    fraud_land = rng.uniform(0.25, 61.77, fraud_size)
+    fraud_aadhar = np.append(dealer_data['aadhar_no'].to_numpy(), 'FAKEAADHAR123456789012')
+    return pd.DataFrame({
+        'dealer_id': dealer_ids[rng.integers(0, len(dealer_ids), fraud_size)],
+        'dealer_aadhar': fraud_aadhar[rng.integers(0, len(fraud_aadhar), fraud_size)],
+        'farmer_id': _ids('FAKEFAR', 1, fraud_size + 1, 5),
+        'relationship_date': _dates('2024-06-01', '2025-11-01', fraud_size),
+        'claimed_fertiliser_qty_kg': np.round(fraud_land * rng.uniform(5000, 15000, fraud_size)).astype(np.int64),
+        'relationship_status': rng.choice(np.array(['Active', 'Inactive'], dtype=object), fraud_size, p=[0.3, 0.7]),
+        'max_allowed_txns_per_year': rng.choice([12, 24], fraud_size),
+        'fraud_label': 'fake_farmer'
+    })
+
+
+def _pick_genuine(rng, labels, share):
+    candidates = np.flatnonzero(labels == GENUINE)
+    n = min(int(round(share * len(labels))), len(candidates))
+    return rng.choice(candidates, n, replace=False) if n else candidates[:0]
+
+
+def inject_fraud_scenarios(rng, farmer_data, dealer_data, relationships, scenarios=FRAUD_SCENARIOS):
+    """
+    Rewrites a share of genuine rows into labelled fraud scenarios (see FRAUD_SCENARIOS).
+
+    Each scenario only takes rows still labelled 'genuine', so labels never
+    overlap; `scenarios` maps scenario -> rate and omitted scenarios are off.
+    Returns (farmer_data, relationships), both new frames.
+    """
+    farmer_data = farmer_data.copy()
+    relationships = relationships.copy()
+    labels = relationships['fraud_label'].to_numpy(dtype=object).copy()
+    farmer_pos = pd.Index(farmer_data['farmer_id']).get_indexer(relationships['farmer_id'])
+    dealer_ids = dealer_data['dealer_id'].to_numpy()
+    dealer_aadhar = dealer_data['aadhar_no'].to_numpy()
+    dealer_village = dealer_data['village'].cat.codes.to_numpy()
+    
+    if scenarios.get('shared_phone'):
+        n = int(round(scenarios['shared_phone'] * len(farmer_data)))
+        borrowers = rng.choice(len(farmer_data), n, replace=False)
+        donors = (borrowers + rng.integers(1, len(farmer_data), n)) % len(farmer_data)
+        phones = farmer_data['phone_no'].to_numpy(dtype=object).copy()
+        phones[borrowers] = phones[donors]
+        farmer_data['phone_no'] = phones
+        borrowed = np.zeros(len(farmer_data), dtype=bool)
+        borrowed[borrowers] = True
+        labels[(farmer_pos >= 0) & borrowed[np.maximum(farmer_pos, 0)] & (labels == GENUINE)] = 'shared_phone'
+    
+    dealer_pos = pd.Index(dealer_ids).get_indexer(relationships['dealer_id'])
+    if scenarios.get('fake_dealer_aadhar'):
+        rows = _pick_genuine(rng, labels, scenarios['fake_dealer_aadhar'])
+        other = (dealer_pos[rows] + rng.integers(1, len(dealer_ids), len(rows))) % len(dealer_ids)
+        aadhar = relationships['dealer_aadhar'].to_numpy(dtype=object).copy()
+        aadhar[rows] = dealer_aadhar[other]
+        relationships['dealer_aadhar'] = aadhar
+        labels[rows] = 'fake_dealer_aadhar'
+    
+    if scenarios.get('cross_village'):
+        rows = _pick_genuine(rng, labels, scenarios['cross_village'])
+        rows = rows[farmer_pos[rows] >= 0]
+        farmer_village = farmer_data['village'].cat.codes.to_numpy()[farmer_pos[rows]]
+        chosen = rng.integers(0, len(dealer_ids), len(rows))
+        for _ in range(32):  # redraw the few that landed in the farmer's own village
+            local = dealer_village[chosen] == farmer_village
+            if not local.any():
+                break
+            chosen[local] = rng.integers(0, len(dealer_ids), int(local.sum()))
+        rows, chosen = rows[~local], chosen[~local]
+        relationships.iloc[rows, relationships.columns.get_loc('dealer_id')] = dealer_ids[chosen]
+        relationships.iloc[rows, relationships.columns.get_loc('dealer_aadhar')] = dealer_aadhar[chosen]
+        labels[rows] = 'cross_village'
+    
+    relationships['fraud_label'] = labels
+    if scenarios.get('txn_limit_abuse'):
+        rows = _pick_genuine(rng, labels, scenarios['txn_limit_abuse'])
+        limits = relationships['max_allowed_txns_per_year'].to_numpy()[rows]
+        copies = limits + rng.integers(0, 5, len(rows))  # pair ends up with limit+1 .. limit+5 rows
+        repeated = relationships.iloc[np.repeat(rows, copies)].copy()
+        base = repeated['relationship_date'].to_numpy().astype('datetime64[D]')
+        repeated['relationship_date'] = np.datetime_as_string(base + rng.integers(1, 365, len(repeated)), unit='D').astype(object)
+        repeated['fraud_label'] = 'txn_limit_abuse'
+        relationships.iloc[rows, relationships.columns.get_loc('fraud_label')] = 'txn_limit_abuse'
+        relationships = pd.concat([relationships, repeated], ignore_index=True)
+    return farmer_data, relationships
+
+
+def generate_relationships(rng, farmer_data, dealer_data, core_size, fraud_size):
+    core_dealer_farmer, same_village_count = generate_core_relationships(rng, farmer_data, dealer_data, core_size)
+    fraud_dealer_farmer = generate_fraud_relationships(rng, dealer_data, fraud_size)
+    dealer_farmer_data = pd.concat([core_dealer_farmer, fraud_dealer_farmer], ignore_index=True)
+    return dealer_farmer_data, same_village_count
+
+
+def generate_enhanced_synthetic_datasets(n_farmers=10000, n_dealers=500, core_size=19000, fraud_size=1000, seed=42,
+                                         scenarios=FRAUD_SCENARIOS, out_dir='.'):
+    rng = np.random.default_rng(seed)
+    
+    farmer_data = generate_farmers(rng, n_farmers)
+    dealer_data = generate_dealers(rng, n_dealers)
+    dealer_farmer_data, same_village_count = generate_relationships(rng, farmer_data, dealer_data, core_size, fraud_size)
+    farmer_data, dealer_farmer_data = inject_fraud_scenarios(rng, farmer_data, dealer_data, dealer_farmer_data, scenarios)
+    
+    os.makedirs(out_dir, exist_ok=True)
+    farmer_data.to_csv(os.path.join(out_dir, 'government_farmers.csv'), index=False)
+    dealer_data.to_csv(os.path.join(out_dir, 'government_dealers.csv'), index=False)
+    dealer_farmer_data.to_csv(os.path.join(out_dir, 'dealer_farmer_relationships.csv'), index=False)
+    
+    print("✅ Datasets generated with LOCAL DEALER PREFERENCE!")
+    print(f"   📊 Farmers: {len(farmer_data):,} | 🏪 Dealers: {len(dealer_data):,} | 🤝 Relationships: {len(dealer_farmer_data):,}")
+    print(f"   🏘️ Same village pairs: {same_village_count}/{core_size} ({same_village_count/core_size*100:.1f}%)")
+    print(f"   🏷️ Labels: {dealer_farmer_data['fraud_label'].value_counts().to_dict()}")
+    
+    return farmer_data, dealer_data, dealer_farmer_data
+
+# --- CHUNKED GENERATION (registries larger than RAM) ---
+
+def _stream_rng(seed, *key):
+    """Deterministic generator for one (table, chunk) stream, independent of worker scheduling."""
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=key))
+
+
+def _write_part(df, out_dir, table, part, formats):
+    """One chunk of a table: out_dir/<name>/part-NNNNN.<fmt> for every format."""
+    part_dir = os.path.join(out_dir, OUTPUT_NAMES[table])
+    os.makedirs(part_dir, exist_ok=True)
+    if 'parquet' in formats:
+        df.to_parquet(os.path.join(part_dir, f'part-{part:05d}.parquet'), index=False)
+    if 'csv' in formats:
+        df.to_csv(os.path.join(part_dir, f'part-{part:05d}.csv'), index=False)
+
+
+def _merge_csv_parts(out_dir, table):
+    """Concatenates CSV parts (header once) into out_dir/<name>.csv, streaming bytes."""
+    part_dir = os.path.join(out_dir, OUTPUT_NAMES[table])
+    parts = sorted(f for f in os.listdir(part_dir) if f.endswith('.csv'))
+    with open(os.path.join(out_dir, OUTPUT_NAMES[table] + '.csv'), 'wb') as out:
+        for i, name in enumerate(parts):
+            path = os.path.join(part_dir, name)
+            with open(path, 'rb') as part:
+                header = part.readline()
+                if i == 0:
+                    out.write(header)
+                shutil.copyfileobj(part, out)
+            os.remove(path)
+    if not os.listdir(part_dir):
+        os.rmdir(part_dir)
+
+
+def _generate_chunk(chunk, bounds, out_dir, formats, seed, n_farmers, n_dealers, core_size, scenarios):
+    """
+    Worker: farmers [f0, f1) and their share of relationships [r0, r1).
+
+    Each chunk's relationships only reference its own farmers; since every
+    chunk gets relationships in proportion to its farmers, farmer choice is
+    still uniform over the whole registry. The dealer table is small and is
+    regenerated from its own stream in every worker. Fraud scenarios are
+    injected per chunk (shared phones are borrowed within the chunk).
+    """
+    f0, f1, r0, r1 = bounds
+    dealer_data = generate_dealers(_stream_rng(seed, DEALER_STREAM), n_dealers)
+    rng = _stream_rng(seed, FARMER_STREAM, chunk)
+    farmer_data = generate_farmers(rng, f1 - f0, f0 + 1, n_farmers)
+    relationships, same_village = generate_core_relationships(rng, farmer_data, dealer_data, r1 - r0, np.arange(r0, r1), core_size)
+    farmer_data, relationships = inject_fraud_scenarios(rng, farmer_data, dealer_data, relationships, scenarios)
+    _write_part(farmer_data, out_dir, 'farmers', chunk, formats)
+    _write_part(relationships, out_dir, 'relationships', chunk, formats)
+    return len(farmer_data), len(relationships), same_village
+
+
+def generate_chunked_datasets(out_dir='.', n_farmers=10_000_000, n_dealers=50_000, core_size=19_000_000,
+                              fraud_size=1_000_000, chunk_rows=500_000, workers=None, seed=42, formats=FORMATS,
+                              scenarios=FRAUD_SCENARIOS):
+    """
+    Streams the three registries to disk in chunks of `chunk_rows` farmers.
+
+    Chunks run in parallel worker processes, each seeded from (seed, chunk)
+    so the output is identical for any worker count. Parquet output is a
+    directory of part files per table (columnar, readable with
+    pd.read_parquet(dir)); CSV parts are concatenated into the usual
+    single files. Peak memory is about `workers` chunks.
+    """
+    formats = tuple(formats)
+    for fmt in formats:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported format: {fmt} (expected one of {FORMATS})")
+    os.makedirs(out_dir, exist_ok=True)
+    
+    farmer_edges = np.append(np.arange(0, n_farmers, chunk_rows), n_farmers)
+    rel_edges = farmer_edges * core_size // max(n_farmers, 1)
+    bounds = [(int(f0), int(f1), int(r0), int(r1))
+              for f0, f1, r0, r1 in zip(farmer_edges[:-1], farmer_edges[1:], rel_edges[:-1], rel_edges[1:])]
+    
+    dealer_data = generate_dealers(_stream_rng(seed, DEALER_STREAM), n_dealers)
+    _write_part(dealer_data, out_dir, 'dealers', 0, formats)
+    
+    work = partial(_generate_chunk, out_dir=out_dir, formats=formats, seed=seed,
+                   n_farmers=n_farmers, n_dealers=n_dealers, core_size=core_size, scenarios=scenarios)
+    farmers = relationships = same_village_count = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for i, (n_f, n_r, same) in enumerate(pool.map(work, range(len(bounds)), bounds)):
+            farmers += n_f
+            relationships += n_r
+            same_village_count += same
+            print(f"   ⏳ chunk {i + 1}/{len(bounds)}: {farmers:,} farmers, {relationships:,} relationships", end="\r")
+    print()
+    
+    fraud = generate_fraud_relationships(_stream_rng(seed, FRAUD_STREAM), dealer_data, fraud_size)
+    _write_part(fraud, out_dir, 'relationships', len(bounds), formats)
+    relationships += len(fraud)
+    
+    if 'csv' in formats:
+        for table in OUTPUT_NAMES:
+            _merge_csv_parts(out_dir, table)
+    
+    print("✅ Chunked datasets written to", os.path.abspath(out_dir))
+    print(f"   📊 Farmers: {farmers:,} | 🏪 Dealers: {n_dealers:,} | 🤝 Relationships: {relationships:,}")
+    print(f"   🏘️ Same village pairs: {same_village_count}/{core_size} ({same_village_count/max(core_size, 1)*100:.1f}%)")
+    return {'farmers': farmers, 'dealers': n_dealers, 'relationships': relationships, 'same_village': same_village_count}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic government registries.")
+    parser.add_argument("--chunked", action="store_true", help="stream to disk in parallel chunks (for registries larger than RAM)")
+    parser.add_argument("--farmers", type=int, default=None)
+    parser.add_argument("--dealers", type=int, default=None)
+    parser.add_argument("--relationships", type=int, default=None, help="genuine relationships (fraud rows come on top)")
+    parser.add_argument("--fraud", type=int, default=None)
+    parser.add_argument("--chunk-rows", type=int, default=500_000, help="farmers per chunk")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--format", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--out", default=".")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scenario", action="append", default=[], metavar="NAME=RATE",
+                        help=f"override a fraud scenario rate (0 disables); one of {', '.join(FRAUD_SCENARIOS)}")
+    args = parser.parse_args()
+    
+    scenarios = dict(FRAUD_SCENARIOS)
+    for item in args.scenario:
+        name, _, rate = item.partition('=')
+        if name not in FRAUD_SCENARIOS:
+            parser.error(f"unknown scenario {name!r}")
+        scenarios[name] = float(rate)
+    
+    sizes = {k: v for k, v in [('n_farmers', args.farmers), ('n_dealers', args.dealers),
+                               ('core_size', args.relationships), ('fraud_size', args.fraud)] if v is not None}
+    if args.chunked:
+        generate_chunked_datasets(args.out, chunk_rows=args.chunk_rows, workers=args.workers,
+                                  seed=args.seed, formats=args.format, scenarios=scenarios, **sizes)
+    else:
+        farmer_data, dealer_data, dealer_farmer_data = generate_enhanced_synthetic_datasets(seed=args.seed, scenarios=scenarios, out_dir=args.out, **sizes)